@@ -0,0 +1,233 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+import logging
+from collections import defaultdict
+from pathlib import Path
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from lxml import etree
+from unidecode import unidecode
+
+rollup_levels = ('province', 'county', 'town')
+# Keys the NTV results spell differently from the names (see `special_key_prefix` in ntv_scraper), by the
+# key built from the names. Matched exactly, so other names containing '19' keep their own key.
+special_result_keys = {'samsun_19_mayis': 'samsun_19 mayis',
+                       'tokat_almus_akarcay_gorumlu_belde': 'tokat_almus_akarcay gorumlu_belde'}
+
+def normalize_name(text):
+    return unidecode(text).lower().strip()
+
+def key_part(text):
+    """Name of a province, county or town as it appears in the result keys, e.g. 'Sinanpaşa' -> 'sinanpasa'."""
+    return '_'.join(normalize_name(text).replace('-', ' ').split())
+
+def is_label_column(column):
+    """Names, ids and ballot box numbers are kept as text; every other column holds counts."""
+    return column.endswith((' adi', ' no', ' id', ' turu'))
+
+def parse_count(text):
+    """Turkish formatted number ('1.234,5') to float; an empty cell counts as 0."""
+    text = text.strip()
+    return float(text.replace('.', '').replace(',', '.')) if text else 0.0
+
+def iter_table_rows(file_path):
+    """
+    Yield the rows of an HTML table export (YSK .xls files) one by one, parsing the file incrementally.
+
+    Returns:
+        generator: Lists of (text, colspan, rowspan) tuples per row.
+    """
+    for _, row in etree.iterparse(str(file_path), events=('end',), tag='tr', html=True):
+        yield [(' '.join(''.join(cell.itertext()).split()), int(cell.get('colspan', 1)), int(cell.get('rowspan', 1)))
+               for cell in row if cell.tag in ('td', 'th')]
+        # Drop the parsed rows, so memory stays flat however long the table is
+        row.clear()
+        while row.getprevious() is not None:
+            del row.getparent()[0]
+
+def is_header_row(cells):
+    """The header is found by its content, the YSK exports write it with <td> cells as often as with <th>."""
+    return any(normalize_name(text) == 'il adi' for text, _, _ in cells)
+
+def header_columns(header_rows):
+    """
+    Column names of a one or two row table header.
+
+    A first row cell spanning both rows names its column; the other first row cells are group titles and
+    their columns take the names of the second row cells below them.
+    """
+    first_row = header_rows[0]
+    second_row = iter(header_rows[1] if len(header_rows) > 1 else [])
+    columns = []
+    for text, colspan, rowspan in first_row:
+        if rowspan > 1 or len(header_rows) == 1:
+            columns += [normalize_name(text)] if colspan == 1 else [f'{normalize_name(text)} {i}' for i in range(1, colspan + 1)]
+        else:
+            columns += [normalize_name(next(second_row, (text,))[0]) for _ in range(colspan)]
+    return columns
+
+def result_key(prefix):
+    """A key built from the names, with the NTV exceptions to the slug rules applied (see `get_key_prefix`)."""
+    return special_result_keys.get(prefix, prefix)
+
+def rollup_keys(row):
+    """Province, county and town keys of a row, in the key scheme of the NTV results (see `get_key_prefix`)."""
+    province = key_part(row.get('il adi') or '')
+    county = key_part(row.get('ilce adi') or '')
+    town = key_part(row.get('belde adi') or '')
+    return (result_key(province) if province else None,
+            result_key(f'{province}_{county}') if province and county else None,
+            result_key(f'{province}_{county}_{town}_belde') if province and county and town else None)
+
+class BallotBoxRollup:
+    """
+    Running totals of ballot box counts per province, county and town key.
+
+    Each chunk is grouped with Arrow and only the per-key sums are kept, so the totals grow with the
+    number of municipalities, not with the number of ballot boxes.
+    """
+    def __init__(self):
+        self.totals = {level: defaultdict(lambda: defaultdict(float)) for level in rollup_levels}
+
+    def add(self, table, count_columns):
+        for level in rollup_levels:
+            key_column = f'{level}_key'
+            grouped = table.group_by(key_column).aggregate([(column, 'sum') for column in count_columns])
+            for row in grouped.to_pylist():
+                key = row.pop(key_column)
+                if key is None:
+                    continue
+                totals = self.totals[level][key]
+                for column in count_columns:
+                    totals[column] += row[f'{column}_sum'] or 0.0
+
+    def frames(self):
+        """
+        Returns:
+            dict: One DataFrame per level, indexed by result key, with a column per count.
+        """
+        return {level: pd.DataFrame.from_dict({key: dict(totals) for key, totals in self.totals[level].items()},
+                                              orient='index').fillna(0.0).sort_index()
+                for level in rollup_levels}
+
+def ingest_ballot_box_file(file_path, parquet_path, rollup, chunk_rows=50000):
+    """
+    Stream one ballot box table into a Parquet file and add its counts to `rollup`.
+
+    Rows are collected in chunks of `chunk_rows` and every chunk is written as one row group, so at most
+    one chunk is held in memory. Rows above the header (titles) and rows that do not match the header
+    (totals, notes) are skipped.
+
+    Returns:
+        int: Number of ballot box rows written.
+
+    Raises:
+        ValueError: The file has rows but no header, or none of the rows below the header could be read.
+    """
+    header_rows, header_height, columns, schema, writer = [], 0, None, None, None
+    chunk = defaultdict(list)
+    chunk_size = written = skipped = rows = 0
+
+    def flush():
+        nonlocal writer, chunk, chunk_size, written
+        if chunk_size == 0:
+            return
+        table = pa.Table.from_pydict(dict(chunk), schema=schema)
+        if writer is None:
+            parquet_path.parent.mkdir(parents=True, exist_ok=True)
+            writer = pq.ParquetWriter(parquet_path, schema)
+        writer.write_table(table)
+        rollup.add(table, count_columns)
+        written += chunk_size
+        chunk, chunk_size = defaultdict(list), 0
+
+    try:
+        for cells in iter_table_rows(file_path):
+            if not cells:
+                continue
+            rows += 1
+            if columns is None:
+                if not header_rows:
+                    if not is_header_row(cells):
+                        continue
+                    # Cells spanning two rows mean a two-row header, see `header_columns`
+                    header_height = min(2, max(rowspan for _, _, rowspan in cells))
+                header_rows.append(cells)
+                if len(header_rows) < header_height:
+                    continue
+                columns = header_columns(header_rows)
+                count_columns = [column for column in columns if not is_label_column(column)]
+                schema = pa.schema([(column, pa.string() if is_label_column(column) else pa.float64()) for column in columns]
+                                   + [(f'{level}_key', pa.string()) for level in rollup_levels])
+                continue
+            texts = [text for text, _, _ in cells]
+            if len(texts) != len(columns):
+                skipped += 1
+                continue
+            row = dict(zip(columns, texts))
+            try:
+                for column in count_columns:
+                    row[column] = parse_count(row[column])
+            except ValueError:
+                skipped += 1
+                continue
+            for level, key in zip(rollup_levels, rollup_keys(row)):
+                row[f'{level}_key'] = key
+            for column, value in row.items():
+                chunk[column].append(value)
+            chunk_size += 1
+            if chunk_size >= chunk_rows:
+                flush()
+        flush()
+    finally:
+        if writer is not None:
+            writer.close()
+    if rows and columns is None:
+        raise ValueError(f"{file_path}: no header row with 'İl Adı' in {rows} rows")
+    if skipped and not written:
+        raise ValueError(f"{file_path}: none of the {skipped} rows below the header match its {len(columns)} columns")
+    if skipped:
+        logging.info(f"{file_path}: skipped {skipped} rows that are not ballot boxes")
+    return written
+
+def ingest_ballot_boxes(source_dir, store_dir, chunk_rows=50000):
+    """
+    Ingest YSK ballot box (sandık) result tables into a Parquet store and roll them up to result keys.
+
+    The tables are expected under `<source_dir>/<year>/<election type>/` (any file name, .xls HTML
+    exports as downloaded from YSK). Every table becomes a Parquet file at the same relative path in
+    `store_dir`, and the totals of every election are written next to them as `rollup_<level>.parquet`.
+
+    Args:
+        source_dir (str or Path): Folder with the ballot box tables.
+        store_dir (str or Path): Folder of the Parquet store.
+        chunk_rows (int): Rows per chunk and Parquet row group.
+
+    Returns:
+        dict: '<year>/<election type>' -> level ('province', 'county', 'town') -> DataFrame indexed by result key.
+    """
+    source_dir, store_dir = Path(source_dir), Path(store_dir)
+    rollups = defaultdict(BallotBoxRollup)
+    for file_path in sorted(source_dir.rglob('*.xls')):
+        relative_path = file_path.relative_to(source_dir)
+        election = relative_path.parent.as_posix()
+        try:
+            rows = ingest_ballot_box_file(file_path, (store_dir / relative_path).with_suffix('.parquet'),
+                                          rollups[election], chunk_rows)
+            logging.info(f"Ingested {rows} ballot boxes from {relative_path}")
+        except Exception as e:
+            logging.error(f"Failed to ingest ballot box file {file_path}: {e}")
+    frames = {}
+    for election, rollup in rollups.items():
+        frames[election] = rollup.frames()
+        (store_dir / election).mkdir(parents=True, exist_ok=True)
+        for level, df in frames[election].items():
+            df.to_parquet(store_dir / election / f'rollup_{level}.parquet')
+        logging.info(f"Ballot box rollup for {election}: {len(frames[election]['province'])} provinces, "
+                     f"{len(frames[election]['county'])} counties, {len(frames[election]['town'])} towns")
+    return frames
@@ -35,3 +35,51 @@ missing_results_dict = {'bitlis_adilcevaz_aydinlar_belde_baskanlik_sonuclari':
 known_empty_urls = ['https://secim.ntv.com.tr/adilcevaz-aydinlar-belde-secim-sonuclari',
                     'https://secim.ntv.com.tr/digor-dagpinar-belde-secim-sonuclari']
 
+# Initial and bounding request rates (requests per second) of the shared NTV rate limiter, per scrape engine
+ntv_rate_limits = {'selenium': {'rate': 2.0, 'max_rate': 10.0, 'burst': 5},
+                   'http': {'rate': 5.0, 'max_rate': 50.0, 'burst': 20},
+                   'async': {'rate': 5.0, 'max_rate': 100.0, 'burst': 50}}
+
+# URL patterns blocked through Chrome DevTools (Network.setBlockedURLs) for each scrape target.
+# NTV results are read from the DOM, so fonts, media, stylesheets, ads and trackers are never needed.
+# YSK pages are clicked through, so stylesheets and the map assets are kept to preserve element visibility.
+_third_party_blocklist = ['*googletagmanager.com*', '*google-analytics.com*', '*doubleclick.net*', '*googlesyndication.com*',
+                          '*googleadservices.com*', '*adservice.google.*', '*facebook.net*', '*facebook.com/tr*',
+                          '*hotjar.com*', '*scorecardresearch.com*', '*chartbeat.*', '*criteo.*', '*taboola.com*',
+                          '*outbrain.com*', '*yandex.ru*', '*mc.yandex.*', '*clarity.ms*', '*onesignal.com*',
+                          '*dailymotion.com*', '*youtube.com*', '*ytimg.com*', '*jwplayer*', '*jwpcdn.com*']
+_font_blocklist = ['*.woff', '*.woff2', '*.ttf', '*.otf', '*.eot', '*fonts.googleapis.com*', '*fonts.gstatic.com*']
+_media_blocklist = ['*.mp4', '*.webm', '*.m3u8', '*.ts', '*.mp3']
+_image_blocklist = ['*.png', '*.jpg', '*.jpeg', '*.gif', '*.webp', '*.ico', '*.avif']
+
+blocked_url_presets = {'ntv': _third_party_blocklist + _font_blocklist + _media_blocklist + _image_blocklist + ['*.css', '*.svg'],
+                       'ysk': _third_party_blocklist + _font_blocklist + _media_blocklist + _image_blocklist}
+
+# Folders the YSK result tables of each election year are downloaded to
+ysk_folder_names = {'2019': '2019_verisi', '2024': '2024_verisi'}
+
+# Backend endpoints behind the YSK download buttons, used with SCRAPER_YSK_ENGINE=http. The paths are
+# templates filled with {year}, {folder_type}, {reg_num} (plate number) and {election_id} from
+# `election_ids[year][folder_type]`. A unit whose template or election id is missing, or whose response
+# is not a valid result table, is downloaded through the browser instead. No endpoints are shipped: set
+# SCRAPER_YSK_HTTP_CONFIG to a JSON file that overrides any of these keys, e.g.
+#   {"province_table": "api/<path>?secimId={election_id}&ilId={reg_num}",
+#    "election_ids": {"2024": {"belediye_baskanligi": <id>}}}
+# The README section "YSK over HTTP" shows how to find the paths and ids.
+ysk_http_endpoints = {'base_url': 'https://acikveri.ysk.gov.tr',
+                      'main_table': None,
+                      'province_table': None,
+                      'election_ids': {'2019': {}, '2024': {}}}
+
+# Seconds a YSK worker process may spend in one step before it is killed together with its Chrome
+# processes and its unit is requeued. 'dispatch' runs from handing over a unit to the first step
+# reported back, which includes starting a fresh worker process.
+ysk_step_deadlines = {'dispatch': 60,
+                      'start_browser': 120,
+                      'load_home': 60,
+                      'open_election': 90,
+                      'council_data': 30,
+                      'select_province': 45,
+                      'switch_province': 45,
+                      'download': 60,
+                      'navigate_back': 45}
@@ -9,9 +9,11 @@ import logging
 import gc
 import re
 import operator
+import threading
 import pandas as pd
 import numpy as np
 from collections import defaultdict
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
 from unidecode import unidecode
 
@@ -27,7 +29,14 @@ def drop_columns_if_exists(df, columns_to_drop):
         if column in df.columns:
             df.drop(column, axis=1, inplace=True)
 
-def excel_to_df(path_to_folder='excel_files'):
+def excel_to_df(path_to_folder='excel_files', cache=None):
+    """
+    Read every sheet of the exported workbooks.
+
+    Args:
+        cache (dict): Sheets of the workbooks read before, by path. A workbook is only read again once it
+            changed, so live mode, which rewrites the workbooks of a few provinces per cycle, keeps one.
+    """
     # Adjust the path to always point to the correct location
     script_loc = Path(__file__).resolve().parent.parent
     folder_path = script_loc / path_to_folder
@@ -43,8 +52,13 @@ def excel_to_df(path_to_folder='excel_files'):
     for file_name in file_names_list:
         file_path = folder_path / file_name
         try:
+            state = file_state(file_path)
+            if cache is not None and file_path in cache and cache[file_path][0] == state:
+                df_dict.update({sheet: df.copy() for sheet, df in cache[file_path][1].items()})
+                continue
             excel_file = pd.ExcelFile(file_path)
             sheet_list = excel_file.sheet_names
+            sheets = {}
             for sheet in sheet_list:
                 df = pd.read_excel(excel_file, sheet_name=sheet)
                 
@@ -54,7 +68,11 @@ def excel_to_df(path_to_folder='excel_files'):
                 # Set 'PARTI' column as index if available
                 df = set_index_if_exists(df, 'PARTI', file_path)
 
-                df_dict[sheet] = df
+                sheets[sheet] = df
+            # The reports change the sheets in place, so the cache holds copies
+            if cache is not None:
+                cache[file_path] = (state, {sheet: df.copy() for sheet, df in sheets.items()})
+            df_dict.update(sheets)
         
         except Exception as e:
             logging.error(f"Error reading {file_name}: {e}")
@@ -275,7 +293,69 @@ def df_to_excel(df_dict, df_dict_ilce, df_dict_belde, script_loc):
     logging.info('All DataFrames exported to Excel files successfully!')
     gc.collect()
 
-def excel_to_df_ysk(folder_path):
+def read_ysk_table(file_path):
+    return pd.read_html(file_path, thousands='.', decimal=',')[0]
+
+def file_state(file_path):
+    stat = os.stat(file_path)
+    return stat.st_mtime_ns, stat.st_size
+
+class YskTableParser:
+    """
+    Reads YSK tables with `pd.read_html` in a worker pool as soon as they are downloaded.
+
+    `excel_to_df_ysk` still processes the files one by one in folder order, since the party set it
+    builds depends on that order, but it takes the already parsed tables from here instead of reading
+    them itself. A table is handed out once; a file that changed after it was submitted is read again.
+
+    Args:
+        workers (int): Pool size, defaults to the CPU count.
+        processes (bool): Parse in a process pool instead of a thread pool.
+        keep (bool): Keep every table and hand out copies, so a file is only read again once it changed.
+            Live mode rebuilds the reports with the same parser while a few YSK files are replaced.
+    """
+    def __init__(self, workers=None, processes=True, keep=False):
+        workers = workers or os.cpu_count()
+        self.executor = ProcessPoolExecutor(max_workers=workers) if processes else ThreadPoolExecutor(max_workers=workers)
+        self.keep = keep
+        self.futures = {}
+        self.lock = threading.Lock()
+
+    def submit(self, file_path):
+        file_path = Path(file_path)
+        future = self.executor.submit(read_ysk_table, str(file_path))
+        with self.lock:
+            self.futures[file_path] = (file_state(file_path), future)
+
+    def read(self, file_path):
+        file_path = Path(file_path)
+        with self.lock:
+            entry = self.futures.get(file_path) if self.keep else self.futures.pop(file_path, None)
+        state = file_state(file_path)
+        if entry is not None and entry[0] == state:
+            try:
+                # `excel_to_df_ysk` changes the table in place
+                return entry[1].result().copy() if self.keep else entry[1].result()
+            except Exception as e:
+                logging.warning(f"Parsing {file_path} in the pool failed, reading it again: {e}")
+        table = read_ysk_table(file_path)
+        if self.keep:
+            future = Future()
+            future.set_result(table.copy())
+            with self.lock:
+                self.futures[file_path] = (state, future)
+        return table
+
+    def close(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+def excel_to_df_ysk(folder_path, table_parser=None):
+    """
+    Read the YSK tables of a year folder.
+
+    Args:
+        table_parser (YskTableParser): Source of tables that were parsed while the downloads were running.
+    """
     subfolder_type = ["belediye_baskanligi", "belediye_meclisi", "il_meclisi", "buyuksehir_baskanligi"]
     subfolder_count = ["1", "2", "3", "4", "5"]
     df_dict = {}
@@ -329,8 +409,8 @@ def excel_to_df_ysk(folder_path):
                     if file_path.is_file():
                         dataframe_name = '_'.join(file_path.stem.split('_')[1:-1])
                     try:
-                        dfs = pd.read_html(file_path, thousands='.', decimal=',')
-                        df_processed, stat_df = process_ysk_dataframe(dfs[0], unique_party_set, subfolder, file_path)
+                        df = table_parser.read(file_path) if table_parser is not None else read_ysk_table(file_path)
+                        df_processed, stat_df = process_ysk_dataframe(df, unique_party_set, subfolder, file_path)
                         df_dict[dataframe_name] = df_processed
                         df_dict_statistics[dataframe_name] = stat_df
                         logging.info(f"Successfully read file: {file_path}")
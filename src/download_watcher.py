@@ -0,0 +1,124 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import sys
+import time
+from pathlib import Path
+
+# inotify flags from <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+DOWNLOAD_EVENTS = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+libc = None
+if sys.platform.startswith('linux'):
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        libc.inotify_init1.argtypes = [ctypes.c_int]
+        libc.inotify_add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+    except (OSError, AttributeError) as e:
+        logging.debug(f"inotify is not available, download watching falls back to polling: {e}")
+        libc = None
+
+class InotifyWatcher:
+    """Wakes up on file system events in one directory, using inotify through ctypes."""
+    def __init__(self, directory):
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        if libc.inotify_add_watch(self.fd, os.fsencode(str(directory)), DOWNLOAD_EVENTS) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f'inotify_add_watch failed for {directory}')
+
+    def wait(self, timeout):
+        """Block until an event arrives or `timeout` seconds pass."""
+        readable, _, _ = select.select([self.fd], [], [], max(0.0, timeout))
+        if readable:
+            try:
+                while os.read(self.fd, 4096):
+                    pass
+            except BlockingIOError:
+                pass
+
+    def close(self):
+        os.close(self.fd)
+
+class PollingWatcher:
+    """Fallback for systems without inotify: wakes up every `interval` seconds."""
+    def __init__(self, directory, interval=0.2):
+        self.interval = interval
+
+    def wait(self, timeout):
+        time.sleep(max(0.0, min(self.interval, timeout)))
+
+    def close(self):
+        pass
+
+def create_watcher(directory):
+    if libc is not None:
+        try:
+            return InotifyWatcher(directory)
+        except OSError as e:
+            logging.debug(f"inotify watch on {directory} failed, polling instead: {e}")
+    return PollingWatcher(directory)
+
+def partial_downloads(directory):
+    """Chrome's in-progress download files in a directory."""
+    return list(Path(directory).glob('*.crdownload'))
+
+def clear_partial_downloads(directory):
+    """Remove in-progress files left behind by an interrupted download, so they do not block the next wait."""
+    for path in partial_downloads(directory):
+        try:
+            path.unlink()
+        except OSError as e:
+            logging.warning(f"Could not remove partial download {path}: {e}")
+
+def wait_for_download(directory, file_name, timeout=30):
+    """
+    Wait until Chrome has finished downloading `file_name` into `directory`.
+
+    The download counts as finished once the file exists and no `.crdownload` file is left in the
+    directory. The check runs again on every file system event of the directory (inotify on Linux,
+    polling elsewhere), so the file is returned as soon as it lands.
+
+    Args:
+        directory (str or Path): Download folder of the browser.
+        file_name (str): Name of the finished file.
+        timeout (float): Seconds to wait.
+
+    Returns:
+        Path: The finished file.
+
+    Raises:
+        TimeoutError: If the download has not finished within `timeout` seconds.
+    """
+    directory = Path(directory)
+    downloaded_file = directory / file_name
+    deadline = time.monotonic() + timeout
+    # The watch is in place before the first check, so a download finishing in between is not missed
+    watcher = create_watcher(directory)
+    try:
+        while True:
+            if downloaded_file.exists() and not partial_downloads(directory):
+                return downloaded_file
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutError(f'{file_name} was not downloaded within {timeout} seconds')
+            watcher.wait(remaining)
+    finally:
+        watcher.close()
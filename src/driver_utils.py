@@ -11,7 +11,12 @@ class QuietChromeService(Service):
         base = super().command_line_args()
         return base + ["--log-level=SEVERE", "--append-log"]  # (optional) keep appending
 
+import functools
+import json
+import queue
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
@@ -19,11 +24,62 @@ from webdriver_manager.chrome import ChromeDriverManager
 import logging
 import os
 import psutil
+import requests
 import subprocess
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from src.config import blocked_url_presets
 
 selenium_pids = set()
+chromedriver_lock = threading.Lock()
 
-def create_driver(headless=True, deny_process=False, download_dir=None, chrome_log_path=None, max_retries=3):
+DEFAULT_HTTP_HEADERS = {
+    "User-Agent": ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+                   "(KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36"),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "tr-TR,tr;q=0.9,en;q=0.8",
+}
+
+def create_session(pool_size=20, connect_retries=2):
+    """
+    Create a pooled requests Session for browserless page fetches.
+
+    Args:
+        pool_size (int): Maximum number of keep-alive connections per host.
+        connect_retries (int): Retries for connection-level failures (resets, refused connections).
+
+    Returns:
+        Session: Configured requests Session instance.
+    """
+    session = requests.Session()
+    retry = Retry(total=connect_retries, connect=connect_retries, read=0, status=0, backoff_factor=0.5)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(DEFAULT_HTTP_HEADERS)
+    return session
+
+def resolve_chromedriver_path():
+    """
+    Path of the ChromeDriver binary, resolved by webdriver-manager once per process.
+
+    `SCRAPER_CHROMEDRIVER_PATH` overrides the lookup, e.g. for offline runs. Worker processes get the
+    resolved path as an argument (`create_driver(driver_path=...)`) instead of resolving it again.
+    """
+    # The lock keeps concurrent first calls from running webdriver-manager more than once
+    with chromedriver_lock:
+        return lookup_chromedriver_path()
+
+@functools.lru_cache(maxsize=None)
+def lookup_chromedriver_path():
+    path = os.getenv("SCRAPER_CHROMEDRIVER_PATH")
+    if not path:
+        path = ChromeDriverManager().install()
+        logging.info(f"ChromeDriver resolved to {path}")
+    return path
+
+def create_driver(headless=True, deny_process=False, download_dir=None, chrome_log_path=None, max_retries=3,
+                  block_preset=None, blocked_urls=None, performance_log=False, driver_path=None):
     """
     Create and configure a Chrome WebDriver instance with optional logging and behavior settings.
 
@@ -32,12 +88,17 @@ def create_driver(headless=True, deny_process=False, download_dir=None, chrome_l
         deny_process (bool): Apply restrictions to reduce resource consumption.
         download_dir (str or Path): Directory for downloads.
         chrome_log_path (str or Path): Path to store Chrome logs.
+        block_preset (str): Key of `config.blocked_url_presets` whose URL patterns are blocked in every navigation.
+        blocked_urls (list): Additional URL patterns to block (wildcards allowed).
+        performance_log (bool): Record DevTools network events, needed by `network_usage`.
+        driver_path (str): ChromeDriver binary resolved by the parent process; `resolve_chromedriver_path` when omitted.
 
     Returns:
         WebDriver: Configured WebDriver instance.
     """
     attempt = 0
     while attempt < max_retries:
+        driver = None
         try:
             chrome_options = Options()
 
@@ -75,6 +136,10 @@ def create_driver(headless=True, deny_process=False, download_dir=None, chrome_l
             chrome_options.add_argument("--disable-logging")   # chrome: suppress extra logs
             chrome_options.add_argument("--remote-debugging-pipe")
 
+            # Record network events so transferred bytes can be measured
+            if performance_log:
+                chrome_options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
             # Decide if we should log ChromeDriver output
             if os.getenv("SCRAPER_DRIVER_LOGS", "0") == "1":
                 # Create a log file only if requested
@@ -90,7 +155,7 @@ def create_driver(headless=True, deny_process=False, download_dir=None, chrome_l
                 log_output_path = os.devnull
 
             service = QuietChromeService(
-                ChromeDriverManager().install(),
+                driver_path or resolve_chromedriver_path(),
                 log_output=log_output_path
             )
 
@@ -103,6 +168,11 @@ def create_driver(headless=True, deny_process=False, download_dir=None, chrome_l
             # Track Selenium PID
             selenium_pids.add(driver.service.process.pid)
 
+            # Block unneeded resources for every navigation of this driver
+            url_patterns = list(blocked_url_presets.get(block_preset, [])) + list(blocked_urls or [])
+            if url_patterns:
+                apply_resource_blocking(driver, url_patterns)
+
             logging.info(f"WebDriver started: {driver}")
             if os.getenv("SCRAPER_DRIVER_LOGS", "0") == "1":
                 logging.info(f"ChromeDriver log path: {log_output_path}")
@@ -111,10 +181,140 @@ def create_driver(headless=True, deny_process=False, download_dir=None, chrome_l
         except Exception as e:
             attempt += 1
             logging.error(f"Error initializing WebDriver (attempt {attempt}/{max_retries}): {e}")
+            # A browser that started but could not be set up would otherwise be left running
+            if driver is not None:
+                try:
+                    driver.quit()
+                except Exception as quit_error:
+                    logging.warning(f"Failed to quit the WebDriver of the failed attempt: {quit_error}")
+                selenium_pids.discard(driver.service.process.pid)
             time.sleep(1)
 
     raise RuntimeError("Failed to initialize WebDriver after multiple attempts.")
 
+class DriverPool:
+    """
+    Starts drivers with the same `create_driver` options in the background, ahead of demand.
+
+    The pool keeps `size` drivers started or starting. `acquire` hands out a started driver, waits for
+    one that is still starting, or starts one itself when none is left, and then starts a replacement
+    in the background. A start that fails is logged and retried by `acquire` in the calling thread.
+
+    Args:
+        size (int): Drivers kept ready; they start concurrently.
+        driver_options: Keyword arguments of `create_driver`.
+    """
+    def __init__(self, size=1, **driver_options):
+        self.size = size
+        self.driver_options = driver_options
+        self.ready = queue.Queue()
+        self.claimable = 0
+        self.closed = False
+        self.lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=max(1, size), thread_name_prefix='driver-pool')
+        self.warm()
+
+    def warm(self):
+        """Start drivers in the background until `size` of them are started or starting."""
+        with self.lock:
+            missing = 0 if self.closed else max(0, self.size - self.claimable)
+            self.claimable += missing
+        for _ in range(missing):
+            self.executor.submit(self.start_driver)
+
+    def start_driver(self):
+        # Exactly one entry per start, so every claim in `acquire` gets an answer
+        try:
+            driver = create_driver(**self.driver_options)
+        except Exception as e:
+            logging.warning(f"Background driver start failed: {e}")
+            driver = None
+        self.ready.put(driver)
+
+    def acquire(self, replace=True):
+        """
+        Take a driver out of the pool.
+
+        Args:
+            replace (bool): Start a replacement in the background.
+
+        Returns:
+            WebDriver: A started driver; the caller quits it.
+        """
+        with self.lock:
+            claimed = self.claimable > 0
+            if claimed:
+                self.claimable -= 1
+        driver = self.ready.get() if claimed else None
+        if driver is None:
+            driver = create_driver(**self.driver_options)
+        if replace:
+            self.warm()
+        return driver
+
+    def close(self):
+        """Stop warming and quit the drivers nobody took."""
+        with self.lock:
+            self.closed = True
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        while True:
+            try:
+                driver = self.ready.get_nowait()
+            except queue.Empty:
+                break
+            if driver is not None:
+                driver.quit()
+
+def apply_resource_blocking(driver, url_patterns):
+    """Block requests matching the given wildcard patterns through Chrome DevTools."""
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": url_patterns})
+    logging.debug(f"Blocking {len(url_patterns)} URL patterns for {driver}")
+
+def network_usage(driver):
+    """
+    Summarize the network events recorded since the last call. Requires a driver created with `performance_log=True`.
+
+    Returns:
+        dict: Requests sent, requests blocked and bytes received over the wire.
+    """
+    usage = {"requests": 0, "blocked_requests": 0, "transferred_bytes": 0}
+    for entry in driver.get_log("performance"):
+        message = json.loads(entry["message"])["message"]
+        method = message.get("method")
+        if method == "Network.requestWillBeSent":
+            usage["requests"] += 1
+        elif method == "Network.loadingFinished":
+            usage["transferred_bytes"] += int(message["params"].get("encodedDataLength", 0))
+        elif method == "Network.loadingFailed" and message["params"].get("blockedReason"):
+            usage["blocked_requests"] += 1
+    return usage
+
+def measure_blocking_savings(url, block_preset, wait_seconds=5):
+    """
+    Load a page once without and once with a block preset and report the bytes saved.
+
+    Returns:
+        dict: Network usage of both loads and the difference in transferred bytes.
+    """
+    results = {}
+    for label, preset in (("unblocked", None), ("blocked", block_preset)):
+        driver = create_driver(deny_process=True, block_preset=preset, performance_log=True)
+        try:
+            start = time.perf_counter()
+            driver.get(url)
+            time.sleep(wait_seconds)  # Let late requests (ads, analytics, lazy media) go out
+            usage = network_usage(driver)
+            usage["load_seconds"] = round(time.perf_counter() - start - wait_seconds, 2)
+            results[label] = usage
+        finally:
+            driver.quit()
+    results["bytes_saved"] = results["unblocked"]["transferred_bytes"] - results["blocked"]["transferred_bytes"]
+    logging.info(f"Resource blocking ({block_preset}) for {url}: {results['blocked']['blocked_requests']} requests blocked, "
+                 f"{results['bytes_saved'] / 1024:.0f} KiB saved "
+                 f"({results['unblocked']['transferred_bytes'] / 1024:.0f} KiB -> {results['blocked']['transferred_bytes'] / 1024:.0f} KiB)")
+    return results
+
 def get_child_processes(parent_pid):
     """Get all child processes for a given parent PID."""
     children = []
@@ -126,6 +326,25 @@ def get_child_processes(parent_pid):
             continue
     return children
 
+def kill_process_tree(pid, include_parent=True):
+    """Kill a process and all of its descendants, e.g. a YSK worker with its ChromeDriver and Chrome processes."""
+    try:
+        parent = psutil.Process(pid)
+        # Collected before anything is killed, since orphaned Chrome processes would be re-parented
+        processes = parent.children(recursive=True)
+    except psutil.NoSuchProcess:
+        return
+    if include_parent:
+        processes.append(parent)
+    for process in processes:
+        try:
+            process.kill()
+        except psutil.NoSuchProcess:
+            continue
+        except psutil.AccessDenied:
+            logging.warning(f"Access denied to kill process with PID {process.pid}")
+    psutil.wait_procs(processes, timeout=5)
+
 def terminate_chrome_processes():
     for parent_pid in list(selenium_pids):  # Iterate over tracked parent PIDs.
         try:
@@ -0,0 +1,123 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+
+class NotModified(Exception):
+    """Raised by a conditional fetch when the server reports that the page has not changed."""
+
+def frame_digest(*dfs):
+    """SHA-256 of the content of one or more DataFrames, independent of how the page around them changed."""
+    digest = hashlib.sha256()
+    for df in dfs:
+        digest.update(df.to_json(orient='split', force_ascii=False).encode('utf-8'))
+    return digest.hexdigest()
+
+def file_digest(path, chunk_size=1 << 16):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class FingerprintStore:
+    """
+    Per-source fingerprints of the previous run, used by delta mode to skip unchanged sources.
+
+    A source is an NTV URL or a YSK file path. Its fingerprint holds the SHA-256 of the extracted
+    results and, for HTTP fetches, the ETag / Last-Modified validators used for conditional GETs.
+    Validators are only kept once the page behind them has been parsed and recorded, so a failed
+    page is fetched in full again on the next run.
+
+    Args:
+        path (str or Path): JSON file with the fingerprints, or None to keep them in memory only.
+        reset (bool): Ignore the stored fingerprints, e.g. when the results they refer to are gone.
+    """
+    def __init__(self, path, reset=False):
+        self.path = Path(path) if path is not None else None
+        self.previous = {}
+        if self.path is not None and self.path.exists() and not reset:
+            with open(self.path, encoding='utf-8') as f:
+                self.previous = json.load(f)
+        self.current = {source: dict(fingerprint) for source, fingerprint in self.previous.items()}
+        self.pending_validators = {}
+        self.changed = set()
+        self.changed_sources = set()
+        self.unchanged = set()
+        self.lock = threading.Lock()
+
+    def request_headers(self, source):
+        """Conditional GET headers for a source, empty when nothing is known about it."""
+        fingerprint = self.previous.get(source, {})
+        headers = {}
+        if fingerprint.get('etag'):
+            headers['If-None-Match'] = fingerprint['etag']
+        if fingerprint.get('last_modified'):
+            headers['If-Modified-Since'] = fingerprint['last_modified']
+        return headers
+
+    def remember_validators(self, source, response_headers):
+        """Hold the validators of a fetched page until `record` confirms it was parsed."""
+        with self.lock:
+            self.pending_validators[source] = {'etag': response_headers.get('ETag'),
+                                               'last_modified': response_headers.get('Last-Modified')}
+
+    def mark_unchanged(self, source):
+        with self.lock:
+            self.unchanged.add(source)
+
+    def record(self, source, digest, keys=()):
+        """
+        Store the digest of a source and compare it with the previous run.
+
+        Args:
+            keys (iterable): Result keys fed by the source, added to `changed` when the digest differs.
+
+        Returns:
+            bool: True if the source is new or changed.
+        """
+        with self.lock:
+            fingerprint = self.current.setdefault(source, {})
+            fingerprint.update(self.pending_validators.pop(source, {}))
+            is_changed = self.previous.get(source, {}).get('sha256') != digest
+            fingerprint['sha256'] = digest
+            if is_changed:
+                self.changed.update(keys)
+                self.changed_sources.add(source)
+            else:
+                self.unchanged.add(source)
+            return is_changed
+
+    def record_file(self, source, path, keys=()):
+        return self.record(source, file_digest(path), keys)
+
+    def pop_changes(self):
+        """
+        Return and clear what changed since the last call, for callers that poll repeatedly.
+
+        Returns:
+            tuple: (changed result keys, changed sources)
+        """
+        with self.lock:
+            changes = (self.changed, self.changed_sources)
+            self.changed, self.changed_sources = set(), set()
+            self.unchanged.clear()
+            # What was seen in this round is the baseline of the next one
+            self.previous = {source: dict(fingerprint) for source, fingerprint in self.current.items()}
+            return changes
+
+    def save(self):
+        temp_path = self.path.with_suffix('.tmp')
+        with self.lock:
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.current, f, ensure_ascii=False)
+            os.replace(temp_path, self.path)
+        logging.info(f'Fingerprints saved: {len(self.unchanged)} sources unchanged, {len(self.changed)} result keys changed')
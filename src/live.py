@@ -0,0 +1,237 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+import logging
+import time
+from collections import deque
+from functools import partial
+from unidecode import unidecode
+from src.download_watcher import clear_partial_downloads
+from src.driver_utils import create_driver, create_session
+from src.fingerprints import FingerprintStore, file_digest, frame_digest
+from src.ntv_scraper import (RenderRequired, create_rate_limiter, fetch_page_http, fetch_page_selenium, parse_ntv_page,
+                             parse_server_page, run_worker_pool)
+from src.result_sink import iter_records
+from src.ysk_scraper import (YskBrowserState, YskSession, YskUnit, changed_table_rows, filter_dict_buttons, store_download,
+                             unit_name, unit_target_path)
+
+class NtvPoller:
+    """
+    Re-fetches NTV result pages with a warm HTTP session and warm drivers, within a per-cycle budget.
+
+    Pages whose results changed in the previous cycle are polled first, the remaining budget walks
+    round-robin through all pages. Only pages whose results changed are returned.
+
+    Args:
+        url_list (list): NTV result page URLs.
+        party_list (list): Party names, see `scrape_to_df`.
+        fingerprints (FingerprintStore): Digests of the results seen so far.
+        workers (int): Concurrent HTTP fetches.
+        render_workers (int): Maximum warm drivers for pages that need rendering.
+    """
+    def __init__(self, url_list, party_list, fingerprints, workers=20, render_workers=2):
+        self.party_list = party_list
+        self.fingerprints = fingerprints
+        self.workers = workers
+        self.render_workers = render_workers
+        self.rotation = deque(url_list)
+        self.hot_urls = []
+        self.session = create_session(pool_size=workers)
+        self.http_rate_limiter = create_rate_limiter('http')
+        self.selenium_rate_limiter = create_rate_limiter('selenium')
+        self.drivers = []
+
+    def next_batch(self, budget):
+        batch = list(dict.fromkeys(self.hot_urls))[:budget]
+        while len(batch) < min(budget, len(self.rotation)):
+            url = self.rotation.popleft()
+            self.rotation.append(url)
+            if url not in batch:
+                batch.append(url)
+        return batch
+
+    def fetch_http(self, session, url):
+        content = fetch_page_http(session, url, self.http_rate_limiter, fingerprints=self.fingerprints)
+        if content is None:
+            raise RenderRequired(url)
+        return content
+
+    def fetch_rendered(self, driver, url):
+        return fetch_page_selenium(driver, url, self.selenium_rate_limiter)
+
+    def poll(self, budget):
+        """
+        Returns:
+            dict: Changed results by `data_dict` key.
+        """
+        batch = self.next_batch(budget)
+        data_dict, error_urls, empty_urls, render_urls = run_worker_pool(
+            batch, self.fetch_http, partial(parse_server_page, party_list=self.party_list),
+            [self.session] * self.workers, fingerprints=self.fingerprints)
+        if render_urls:
+            while len(self.drivers) < min(self.render_workers, len(render_urls)):
+                self.drivers.append(create_driver(deny_process=True, block_preset='ntv'))
+            render_data_dict, render_error_urls, render_empty_urls, _ = run_worker_pool(
+                render_urls, self.fetch_rendered, partial(parse_ntv_page, party_list=self.party_list),
+                self.drivers[:len(render_urls)], fingerprints=self.fingerprints)
+            data_dict.update(render_data_dict)
+            error_urls += render_error_urls
+            empty_urls += render_empty_urls
+        if error_urls or empty_urls:
+            logging.warning(f'Live poll: {len(error_urls) + len(empty_urls)} of {len(batch)} pages failed')
+        return data_dict
+
+    def close(self):
+        self.session.close()
+        for driver in self.drivers:
+            driver.quit()
+        self.drivers = []
+
+class YskTableWatcher:
+    """
+    Warm YSK browser session that re-downloads the main table (SecimSonucIl.xls) of one election type,
+    and the province tables of the provinces whose row in it changed.
+
+    The session keeps the results map open between polls and selects the election type again in place
+    to load the current results, instead of starting from the home page every time. Changed tables
+    replace the files written by `download_ysk_units`, so the next `excel_to_df_ysk` picks them up.
+
+    Args:
+        script_loc (Path): Project root holding the year folders.
+        units (list): YskUnit tuples, see `build_ysk_units`; the province tables of this election type are used.
+        council_dict (dict): Councilor counts of the initial run.
+        browser_state (YskBrowserState): Site state shared by the watchers, so only the first one closes the popup.
+    """
+    def __init__(self, script_loc, year, folder_type, units, council_dict, browser_state=None):
+        self.script_loc = script_loc
+        self.year = year
+        self.folder_type = folder_type
+        self.main_unit = YskUnit(year, folder_type, 1, None, None)
+        self.province_units = {unidecode(unit.province).lower(): unit for unit in units
+                               if (unit.year, unit.folder_type) == (year, folder_type) and unit.province is not None}
+        self.council_dict = council_dict
+        self.session = YskSession(f'live-{folder_type}', script_loc / 'live' / f'{year}_{folder_type}', browser_state)
+
+    def fetch(self, unit):
+        """The staged file of a unit with its digest, or None when the download failed."""
+        try:
+            return self.session.fetch_unit(unit, self.council_dict)
+        except Exception as e:
+            logging.error(f'Live poll: YSK download of {unit_name(unit)} failed: {e}')
+            self.session.recover()
+            return None
+
+    def poll(self):
+        """
+        Returns:
+            set: Provinces whose row changed, empty when nothing changed, or None when every province may have changed.
+        """
+        clear_partial_downloads(self.session.staging_dir)
+        try:
+            # The page keeps the results it loaded, so the election type is selected again for every poll
+            self.session.open_election(self.year, self.folder_type, self.council_dict, refresh=True)
+        except Exception as e:
+            logging.error(f'Live poll: YSK results page of {self.year} {self.folder_type} could not be opened: {e}')
+            self.session.recover()
+            return set()
+        download = self.fetch(self.main_unit)
+        if download is None:
+            return set()
+        staged_file, digest = download
+        target_path = unit_target_path(self.main_unit, self.script_loc)
+        if target_path.exists() and file_digest(target_path) == digest:
+            staged_file.unlink()
+            return set()
+        changed = changed_table_rows(target_path, staged_file)
+        store_download(self.main_unit, staged_file, self.script_loc)
+        logging.info(f'Live poll: YSK main table changed for {self.year} {self.folder_type}')
+        self.refresh_provinces(self.province_units if changed is None else changed)
+        return changed
+
+    def refresh_provinces(self, provinces):
+        """Download the tables of `provinces` again, so their municipality results follow the main table."""
+        for province in provinces:
+            unit = self.province_units.get(province)
+            if unit is None:
+                continue
+            download = self.fetch(unit)
+            if download is not None:
+                store_download(unit, download[0], self.script_loc)
+
+    def close(self):
+        self.session.close()
+
+def seed_fingerprints(fingerprints, sink_path, dataframes_raw):
+    """Take the results already in the sink as the baseline, so only real changes trigger a republish."""
+    for record in iter_records(sink_path):
+        key_prefix = record['key_prefix']
+        df_baskan = dataframes_raw.get(f'{key_prefix}_baskanlik_sonuclari')
+        df_meclis = dataframes_raw.get(f'{key_prefix}_meclis_sonuclari')
+        if df_baskan is not None and df_meclis is not None:
+            fingerprints.record(record['url'], frame_digest(df_baskan, df_meclis), keys=[key_prefix])
+    fingerprints.pop_changes()
+
+def run_live(script_loc, url_list, party_list, dataframes_raw, council_dict, publish, sink_path=None, ysk_units=(),
+             refresh_budget=200, refresh_interval=30, ysk_interval=60, workers=20, max_cycles=None):
+    """
+    Poll NTV and the 2024 YSK tables and republish the reports whenever results change.
+
+    Args:
+        dataframes_raw (dict): NTV results of the initial run, before the YSK update.
+        council_dict (dict): Councilor counts of the initial run.
+        publish (callable): `publish(dataframes_full, council_dict, changed_provinces)` rebuilds the reports,
+            see `main.build_reports`.
+        sink_path (Path): Result sink of the initial run, used as the change baseline.
+        ysk_units (list): YskUnit tuples of the initial run; a 2024 province table is downloaded again
+            when the row of its province in the main table changes.
+        refresh_budget (int): NTV pages polled per cycle.
+        refresh_interval (float): Minimum seconds between the starts of two cycles.
+        ysk_interval (float): Minimum seconds between two polls of the YSK tables.
+        max_cycles (int): Stop after this many cycles; None polls until interrupted.
+    """
+    fingerprints = FingerprintStore(None)
+    if sink_path is not None:
+        seed_fingerprints(fingerprints, sink_path, dataframes_raw)
+    ntv_poller = NtvPoller(url_list, party_list, fingerprints, workers)
+    browser_state = YskBrowserState()
+    ysk_watchers = [YskTableWatcher(script_loc, '2024', folder_type, ysk_units, council_dict, browser_state)
+                    for folder_type in filter_dict_buttons['2024']]
+    last_ysk_poll = float('-inf')
+    cycle = 0
+    logging.info(f'Live mode: polling {refresh_budget} of {len(url_list)} NTV pages every {refresh_interval}s, '
+                 f'YSK tables every {ysk_interval}s')
+    try:
+        while max_cycles is None or cycle < max_cycles:
+            cycle += 1
+            cycle_start = time.monotonic()
+            changed_results = ntv_poller.poll(refresh_budget)
+            changed_keys, changed_urls = fingerprints.pop_changes()
+            ntv_poller.hot_urls = list(changed_urls)
+            dataframes_raw.update(changed_results)
+            changed_provinces = {key.split('_')[0] for key in changed_keys}
+            every_province = False
+            if time.monotonic() - last_ysk_poll >= ysk_interval:
+                last_ysk_poll = time.monotonic()
+                for watcher in ysk_watchers:
+                    changed_rows = watcher.poll()
+                    if changed_rows is None:
+                        every_province = True
+                    else:
+                        changed_provinces.update(changed_rows)
+            if changed_provinces or every_province:
+                publish_start = time.monotonic()
+                # The reports update DataFrames in place, so they get copies of the raw results
+                publish({key: df.copy() for key, df in dataframes_raw.items()}, council_dict,
+                        None if every_province else changed_provinces)
+                logging.info(f'Live cycle {cycle}: republished {"all" if every_province else len(changed_provinces)} '
+                             f'provinces in {time.monotonic() - publish_start:.1f}s')
+            else:
+                logging.info(f'Live cycle {cycle}: no changes')
+            time.sleep(max(0.0, refresh_interval - (time.monotonic() - cycle_start)))
+    finally:
+        ntv_poller.close()
+        for watcher in ysk_watchers:
+            watcher.close()
@@ -10,13 +10,16 @@ os.environ.setdefault("GLOG_minloglevel", "3")      # absl/glog verbosity
 os.environ.setdefault("ABSL_LOG_SEVERITY", "3")     # absl severity floor
 
 import sys
+import argparse
+import json
 import logging
 import signal
 import threading
 import gc
+import multiprocessing
 from pathlib import Path
 from datetime import datetime
-from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 
 if getattr(sys, 'frozen', False) and hasattr(sys, '_MEIPASS'):
     # Running in a PyInstaller bundle
@@ -27,13 +30,19 @@ else:
 
 sys.path.append(str(project_root))
 
-from src.config import tum_iller_plaka_dict, missing_results_dict, known_empty_urls
-from src.driver_utils import create_driver, terminate_chrome_processes
-from src.ntv_scraper import get_all_urls, scrape_to_df, remove_known_empty_urls, retry_scraping, replace_empty_dataframes, separate_dictionary
-from src.ysk_scraper import download_rename_ysk, process_province_dict, split_dict
+from src.config import tum_iller_plaka_dict, missing_results_dict, known_empty_urls, ysk_folder_names, ysk_http_endpoints
+from src.driver_utils import create_driver, kill_process_tree, terminate_chrome_processes, measure_blocking_savings
+from src.ntv_scraper import get_all_urls, scrape_to_df, replay_to_df, remove_known_empty_urls, replace_empty_dataframes, separate_dictionary
+from src.page_archive import PageArchive
+from src.result_sink import ResultSink, load_results
+from src.ysk_scraper import YskHttpClient, build_ysk_units, download_ysk_units, process_province_dict, record_ysk_fingerprints
+from src.fingerprints import FingerprintStore
+from src.live import run_live
+from src.telemetry import PhaseTelemetry
+from src.ballot_box import ingest_ballot_boxes
 from src.other_scrapers import belediye_pdf_op, download_and_process_sege_pdfs, get_party_list
 from src.data_processing import (
-    excel_to_df, dataframe_ysk_update, df_subpart_update, df_to_excel, excel_to_df_ysk, remove_empty_province_dfs, 
+    excel_to_df, dataframe_ysk_update, df_subpart_update, df_to_excel, excel_to_df_ysk, remove_empty_province_dfs, YskTableParser,
     find_shortcoming_2019, councilor_dict_update, results_per_municipality_df, summary_election_results
 )
 
@@ -48,6 +57,7 @@ sys.excepthook = handle_uncaught_exceptions
 def signal_handler(sig, frame):
     print("\nTermination signal received. Forcing immediate shutdown...", flush=True)
     terminate_chrome_processes()  # Clean up Chrome processes.
+    kill_process_tree(os.getpid(), include_parent=False)  # YSK worker processes with their browsers
     os._exit(0)  # Immediate termination.
 
 signal.signal(signal.SIGINT, signal_handler)  # Register the new signal handler
@@ -155,143 +165,319 @@ class ElectionSummaryData:
         self.il_meclis_uye_sayilari = il_meclis_uye_sayilari
         self.dataframes_full_pull = dataframes_full_pull
 
+class ReferenceData:
+    def __init__(self, bb_list, il_list, full_list, full_province_list, sege_il, sege_ilce, party_list, belde_list):
+        self.bb_list = bb_list
+        self.il_list = il_list
+        self.full_list = full_list
+        self.full_province_list = full_province_list
+        self.sege_il = sege_il
+        self.sege_ilce = sege_ilce
+        self.party_list = party_list
+        self.belde_list = belde_list
+
+def select_provinces(df_dict, provinces):
+    """Entries of a result dictionary whose key starts with one of the provinces, or all of them when `provinces` is None."""
+    if provinces is None:
+        return df_dict
+    return {key: df for key, df in df_dict.items() if key.split('_')[0] in provinces}
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Scrape, clean and export Turkey's 2019 and 2024 local election results.")
+    parser.add_argument("--archive", action="store_true",
+                        help="Store every fetched page and downloaded file in the compressed page archive.")
+    parser.add_argument("--replay", action="store_true",
+                        help="Rebuild every DataFrame from the page archive, without a browser or network access.")
+    parser.add_argument("--delta", action="store_true",
+                        help="Skip NTV pages and YSK files that are unchanged since the last run and only reprocess "
+                             "the provinces whose sources changed.")
+    parser.add_argument("--live", action="store_true",
+                        help="After the initial run, keep polling NTV and the YSK main tables and republish the "
+                             "summaries whenever results change.")
+    return parser.parse_args()
+
+def load_reference_data(script_loc, args, archive=None):
+    """Municipality lists, SEGE scores and the party list (steps 1-3)."""
+    # Step 1: Perform preliminary data operations
+    logging.info("Initiating relevant data operations...")
+    if args.replay:
+        logging.info(f"Replay mode: reading every page and file from {archive.root}")
+        archive.restore_files('file', script_loc)
+    # Replay only reads the files restored from the archive, it never downloads a missing one
+    results = belediye_pdf_op(script_loc, download=not args.replay)
+    bb_list, il_list, full_list, full_province_list = results['bb_list'], results['il_list'], results['full_list'], results['sehir_listesi']
+
+    # Step 2: Download and process SEGE data
+    sege_il, sege_ilce = download_and_process_sege_pdfs(script_loc, download=not args.replay)
+    logging.debug(f"SEGE province example:\n{sege_il.head()}")
+    logging.debug(f"SEGE county example:\n{sege_ilce.head()}")
+    if args.archive:
+        archive.put_folder('file', script_loc / 'PDF_dosyalari', script_loc)
+        archive.put_folder('file', script_loc / 'SEGE Verisi', script_loc)
+
+    # Step 3: Fetch party list
+    if args.replay:
+        party_list = archive.get('meta', 'party_list')
+    else:
+        party_list = get_party_list()
+    if args.archive:
+        archive.put('meta', 'party_list', party_list)
+    return ReferenceData(bb_list, il_list, full_list, full_province_list, sege_il, sege_ilce, party_list, results['belde_list'])
+
+def plan_ysk_units(il_list):
+    """Every YSK result table of both elections as a unit, see `build_ysk_units`."""
+    # Step 7: Process provinces and create dictionaries
+    il_plaka_dict, buyuksehir_plaka_dict = process_province_dict(tum_iller_plaka_dict, il_list)
+    return build_ysk_units(['2019', '2024'], {'belediye_baskanligi': tum_iller_plaka_dict,
+                                              'belediye_meclisi': tum_iller_plaka_dict,
+                                              'il_meclisi': il_plaka_dict,
+                                              'buyuksehir_baskanligi': buyuksehir_plaka_dict})
+
+def download_ysk(script_loc, ysk_units, archive=None, telemetry=None, table_parser=None):
+    """
+    Download every YSK result table into the year folders (step 8). With `table_parser` every file is
+    parsed as soon as it is stored.
+
+    Returns:
+        dict: Councilor counts by '<year>_<election type>'.
+    """
+    # Step 8: Download YSK data
+    logging.info("Scraping election results - YSK")
+    meclis_uye_sayilari = {}
+    # Every (year, election type, province) file is one unit of a shared queue that all browsers pull from
+    ysk_drivers = int(os.getenv("SCRAPER_YSK_DRIVERS", "5"))
+    # With the http engine the tables come from the backend endpoints and browsers only take what is left
+    http_client = None
+    if os.getenv("SCRAPER_YSK_ENGINE", "browser") == "http":
+        endpoints = dict(ysk_http_endpoints)
+        if os.getenv("SCRAPER_YSK_HTTP_CONFIG"):
+            with open(os.getenv("SCRAPER_YSK_HTTP_CONFIG"), encoding='utf-8') as f:
+                endpoints.update(json.load(f))
+        if endpoints['main_table'] is None and endpoints['province_table'] is None:
+            logging.warning("SCRAPER_YSK_ENGINE=http without endpoints, every YSK file goes through the browsers. "
+                            "Set SCRAPER_YSK_HTTP_CONFIG, see 'YSK over HTTP' in the README.")
+        http_client = YskHttpClient(endpoints)
+    try:
+        download_ysk_units(ysk_units, script_loc, meclis_uye_sayilari, ysk_drivers, archive=archive, telemetry=telemetry,
+                           http_client=http_client, on_file=table_parser.submit if table_parser is not None else None,
+                           navigation=os.getenv("SCRAPER_YSK_NAVIGATION", "script"))
+    finally:
+        if http_client is not None:
+            http_client.close()
+
+    terminate_chrome_processes()
+    return meclis_uye_sayilari
+
+def build_reports(script_loc, reference, dataframes_full, meclis_uye_sayilari, changed_provinces=None, table_parser=None,
+                  workbook_cache=None):
+    """
+    Merge the NTV and YSK results and export the Excel files and summaries (steps 5-14).
+
+    Args:
+        dataframes_full (dict): NTV results by key, updated in place.
+        changed_provinces (set): Only update and export these provinces; None processes all of them.
+        table_parser (YskTableParser): YSK tables parsed during the download, see `excel_to_df_ysk`.
+        workbook_cache (dict): Exported workbooks read by an earlier call, see `excel_to_df`.
+    """
+    bb_list, il_list, party_list = reference.bb_list, reference.il_list, reference.party_list
+    folder_path_2019 = script_loc / ysk_folder_names['2019']
+    folder_path_2024 = script_loc / ysk_folder_names['2024']
+
+    # Step 5: Process missing results
+    for key, items in missing_results_dict.items():
+        dataframes_full[key] = replace_empty_dataframes(votes=items[0], parties=items[1], candidates=items[2])
+
+    # Step 6: Separate data into categories
+    dataframes_il, dataframes_ilce, dataframes_belde, dataframes_list = separate_dictionary(dataframes_full)
+
+    # Step 9: Process 2019 and 2024 YSK data
+    logging.info("Executing excel_to_df_ysk...")
+    dataframes_2019, dataframes_2019_stats, _, party_translation = excel_to_df_ysk(folder_path_2019, table_parser)
+    dataframes_2024, dataframes_2024_stats, unique_party_set, _ = excel_to_df_ysk(folder_path_2024, table_parser)
+    # In delta and live mode only the provinces with a changed NTV page or YSK file are updated and exported
+    if changed_provinces is not None:
+        logging.info(f"{len(changed_provinces)} provinces changed: {sorted(changed_provinces)}")
+    dataframes_delta = select_provinces(dataframes_full, changed_provinces)
+    logging.info("Executing dataframe_ysk_update...")
+    diff_dict_2019 = dataframe_ysk_update(dataframes_delta, dataframes_2019, party_translation, bb_list, '2019')
+    diff_dict_2024 = dataframe_ysk_update(dataframes_delta, dataframes_2024, unique_party_set, bb_list, '2024')
+    dataframes_full.update(dataframes_delta)
+    logging.debug("Results of value updating process:")
+    for key, value in diff_dict_2019.items():
+        logging.debug(f"{key}: {value}")
+    for key, value in diff_dict_2024.items():
+        logging.debug(f"{key}: {value}")
+
+    # Step 10: Update and finalize data
+    logging.info("Executing df_subpart_update...")
+    for df_dict in dataframes_list:
+        df_subpart_update(dataframes_full, df_dict)
+    logging.info("Executing df_to_excel...")
+    df_to_excel(select_provinces(dataframes_il, changed_provinces), select_provinces(dataframes_ilce, changed_provinces),
+                select_provinces(dataframes_belde, changed_provinces), script_loc)
+    logging.info("Executing excel_to_df...")
+    dataframes_full_pull = excel_to_df(cache=workbook_cache)
+    logging.debug("List of all keys found in DataFrame dictionary:")
+    for key in dataframes_full_pull:
+        logging.debug(key)
+    logging.info("Executing remove_empty_province_dfs...")
+    remove_empty_province_dfs(dataframes_full, dataframes_il, il_list)
+    logging.info("Executing find_shortcoming_2019...")
+    find_shortcoming_2019(dataframes_full_pull)
+
+    # Step 11: Update councilor counts
+    logging.info("Executing councilor_dict_update...")
+    yeni_meclis_uye_sayilari, belediye_meclis_uye_sayilari, il_meclis_uye_sayilari = councilor_dict_update(meclis_uye_sayilari)
+
+    # Step 12: Create MunicipalityData class object to simplify parameter entry
+    municipality_data = MunicipalityData(
+        reference.full_list, bb_list, il_list, reference.full_province_list, dataframes_full_pull,
+        dataframes_2019, dataframes_2024, dataframes_2019_stats, dataframes_2024_stats, reference.sege_ilce, reference.sege_il, party_list
+    )
+
+    # Step 13: Generate results summaries
+    logging.info("Exporting full reports...")
+    b_sum_2019, b_ilce_sum_2019, b_buy_sum_2019 = results_per_municipality_df(municipality_data, 'baskanlik', '2019', script_loc, True)
+    m_sum_2019, m_ilce_sum_2019, m_il_sum_2019 = results_per_municipality_df(municipality_data, 'meclis', '2019', script_loc, True)
+    b_sum_2024, b_ilce_sum_2024, b_buy_sum_2024 = results_per_municipality_df(municipality_data, 'baskanlik', '2024', script_loc, True)
+    m_sum_2024, m_ilce_sum_2024, m_il_sum_2024 = results_per_municipality_df(municipality_data, 'meclis', '2024', script_loc, True)
+
+    # Step 14: Create ElectionSummaryData class object to simplify parameter entry
+    election_data = ElectionSummaryData(
+        b_ilce_sum_2024, b_ilce_sum_2019, b_buy_sum_2024, b_buy_sum_2019,
+        m_ilce_sum_2019, m_ilce_sum_2024, m_il_sum_2019, m_il_sum_2024,
+        belediye_meclis_uye_sayilari, il_meclis_uye_sayilari, dataframes_full_pull,
+    )
+
+    # Final step: Export summaries
+    logging.info("Exporting summary reports...")
+    for summary_type in ('genel_ozet', 'belediye_baskanligi', 'buyuksehir_baskanligi', 'belediye_meclisleri', 'il_meclisleri'):
+        summary_election_results(election_data, party_list, summary_type, script_loc, True, bb_list)
+
 def main():
+    args = parse_args()
     # Set up logging
     setup_logging()
     logging.info("Starting the application...")
     # Use project_root as the base directory
     script_loc = project_root
+    archive = PageArchive(script_loc / "page_archive") if args.archive or args.replay else None
+    # Per-URL and per-file timing records of the scrape phases, summarized in the log at the end of each phase
+    telemetry_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    ntv_telemetry = PhaseTelemetry('ntv', script_loc / "logs" / f"telemetry_ntv_{telemetry_timestamp}.ndjson")
+    ysk_telemetry = PhaseTelemetry('ysk', script_loc / "logs" / f"telemetry_ysk_{telemetry_timestamp}.ndjson")
+    # Live mode rebuilds the reports from the same tables, so it keeps them and only reads changed files again
+    ysk_table_parser = YskTableParser(keep=args.live)
 
     try:
-        # Step 1: Perform preliminary data operations
-        logging.info("Initiating relevant data operations...")
-        results = belediye_pdf_op(script_loc)
-        bb_list, il_list, full_list, full_province_list = results['bb_list'], results['il_list'], results['full_list'], results['sehir_listesi']
-
-        # Step 2: Download and process SEGE data
-        sege_il, sege_ilce = download_and_process_sege_pdfs(script_loc)
-        logging.debug(f"SEGE province example:\n{sege_il.head()}")
-        logging.debug(f"SEGE county example:\n{sege_ilce.head()}")
-
-        # Step 3: Fetch party list and URLs
-        party_list = get_party_list()
-        il_urls, tum_ilceler_urls, merkez_ilce_urls, ilce_urls, belde_urls, tum_urls = get_all_urls()
+        reference = load_reference_data(script_loc, args, archive)
+        party_list = reference.party_list
+        if not args.replay:
+            il_urls, tum_ilceler_urls, merkez_ilce_urls, ilce_urls, belde_urls, tum_urls = get_all_urls(reference.belde_list)
+
+        # Optionally measure how much traffic the DevTools block lists save on one page of each site
+        if os.getenv("SCRAPER_REPORT_BLOCKING", "0") == "1" and not args.replay:
+            for url, block_preset in ((tum_urls[0], 'ntv'), ("https://acikveri.ysk.gov.tr/anasayfa", 'ysk')):
+                # Only a report: a failed measurement must not stop the scrape
+                try:
+                    measure_blocking_savings(url, block_preset)
+                except Exception as e:
+                    logging.warning(f"Failed to measure resource blocking savings for {url}: {e}")
 
         # Step 4: Scrape election results
         logging.info("Scraping election results - NTV")
-        dataframes_full, error_urls, empty_urls = {}, [], []
-        dataframes_full, new_error_urls, new_empty_urls = scrape_to_df(tum_urls, party_list)
+        ntv_engine = os.getenv("SCRAPER_NTV_ENGINE", "selenium")
+        ntv_default_workers = {"selenium": "5", "http": "20", "async": "200"}
+        ntv_workers = int(os.getenv("SCRAPER_NTV_WORKERS", ntv_default_workers.get(ntv_engine, "5")))
+        error_urls, empty_urls = [], []
+        # Failed and empty URLs are retried up to 3 times inside the same worker pool
+        ntv_parse_processes = os.getenv("SCRAPER_NTV_PARSE_PROCESSES", "0") == "1"
+        # Each page is appended to the result sink as soon as it is parsed, so an interrupted run can be resumed
+        ntv_resume = os.getenv("SCRAPER_NTV_RESUME", "0") == "1" and not args.replay
+        ntv_sink_path = script_loc / "ntv_results.ndjson"
+        # In delta mode unchanged pages keep their results from the previous run in the sink
+        fingerprints = None
+        if args.delta and not args.replay:
+            fingerprints = FingerprintStore(script_loc / "fingerprints.json", reset=not ntv_sink_path.exists())
+            ntv_resume = True
+        with ResultSink(ntv_sink_path, resume=ntv_resume) as ntv_sink:
+            if args.replay:
+                _, new_error_urls, new_empty_urls = replay_to_df(
+                    archive, party_list, parse_processes=ntv_parse_processes, sink=ntv_sink)
+            else:
+                completed_urls = ntv_sink.completed_urls() if fingerprints is None else set()
+                pending_urls = [url for url in tum_urls if url not in completed_urls]
+                if completed_urls:
+                    logging.info(f"Resuming NTV scrape: {len(completed_urls)} pages already in {ntv_sink_path}, {len(pending_urls)} left")
+                _, new_error_urls, new_empty_urls = scrape_to_df(
+                    pending_urls, party_list, ntv_engine, ntv_workers, max_attempts=4, no_retry_urls=known_empty_urls,
+                    parse_processes=ntv_parse_processes, sink=ntv_sink, archive=archive, fingerprints=fingerprints,
+                    telemetry=ntv_telemetry)
+                ntv_telemetry.log_summary()
         error_urls.extend(new_error_urls)
         empty_urls.extend(new_empty_urls)
-
-        # Step 5: Process missing results
-        for key, items in missing_results_dict.items():
-            dataframes_full[key] = replace_empty_dataframes(votes=items[0], parties=items[1], candidates=items[2])
         remove_known_empty_urls(empty_urls, known_empty_urls)
-        dataframes_full = retry_scraping(dataframes_full, error_urls, empty_urls, party_list)
-
-        # Step 6: Separate data into categories
-        dataframes_il, dataframes_ilce, dataframes_belde, dataframes_list = separate_dictionary(dataframes_full)
-
-        # Step 7: Process provinces and create dictionaries
-        il_plaka_dict, buyuksehir_plaka_dict = process_province_dict(tum_iller_plaka_dict, il_list)
-        tum_iller_plaka_dict_list = split_dict(tum_iller_plaka_dict, 5)
-        il_plaka_dict_list = split_dict(il_plaka_dict, 5)
-        buyuksehir_plaka_dict_list = split_dict(buyuksehir_plaka_dict, 5)
-
-        # Step 8: Download YSK data
-        logging.info("Scraping election results - YSK")
-        meclis_uye_sayilari = {}
-        folder_name_2019 = '2019_verisi'
-        folder_name_2024 = '2024_verisi'
-        folder_path_2019 = script_loc / folder_name_2019
-        folder_path_2024 = script_loc / folder_name_2024
-        execution_dict = {
-            (folder_path_2019, folder_path_2024): {
-                'belediye_baskanligi': tum_iller_plaka_dict_list,
-                'belediye_meclisi': tum_iller_plaka_dict_list,
-                'il_meclisi': il_plaka_dict_list,
-                'buyuksehir_baskanligi': buyuksehir_plaka_dict_list
-            }
-        }
-
-        for folder_paths, exec_dict in execution_dict.items():
-            for f_path in folder_paths:
-                for exec_type, province_list in exec_dict.items():
-                    with ThreadPoolExecutor(max_workers=len(province_list)) as executor:
-                        for i, p_dict in enumerate(province_list, start=1):
-                            executor.submit(download_rename_ysk, p_dict, f_path, i, exec_type, meclis_uye_sayilari)
-
-        terminate_chrome_processes()
-
-        # Step 9: Process 2019 and 2024 YSK data
-        logging.info("Executing excel_to_df_ysk...")
-        dataframes_2019, dataframes_2019_stats, _, party_translation = excel_to_df_ysk(folder_path_2019)
-        dataframes_2024, dataframes_2024_stats, unique_party_set, _ = excel_to_df_ysk(folder_path_2024)
-        logging.info("Executing dataframe_ysk_update...")
-        diff_dict_2019 = dataframe_ysk_update(dataframes_full, dataframes_2019, party_translation, bb_list, '2019')
-        diff_dict_2024 = dataframe_ysk_update(dataframes_full, dataframes_2024, unique_party_set, bb_list, '2024')
-        logging.debug("Results of value updating process:")
-        for key, value in diff_dict_2019.items():
-            logging.debug(f"{key}: {value}")
-        for key, value in diff_dict_2024.items():
-            logging.debug(f"{key}: {value}")
-
-        # Step 10: Update and finalize data
-        logging.info("Executing df_subpart_update...")
-        for df_dict in dataframes_list:
-            df_subpart_update(dataframes_full, df_dict)
-        logging.info("Executing df_to_excel...")
-        df_to_excel(dataframes_il, dataframes_ilce, dataframes_belde, script_loc)
-        logging.info("Executing excel_to_df...")
-        dataframes_full_pull = excel_to_df()
-        logging.debug("List of all keys found in DataFrame dictionary:")
-        for key in dataframes_full_pull:
-            logging.debug(key)
-        logging.info("Executing remove_empty_province_dfs...")
-        remove_empty_province_dfs(dataframes_full, dataframes_il, il_list)
-        logging.info("Executing find_shortcoming_2019...")
-        find_shortcoming_2019(dataframes_full_pull)
-
-        # Step 11: Update councilor counts
-        logging.info("Executing councilor_dict_update...")
-        yeni_meclis_uye_sayilari, belediye_meclis_uye_sayilari, il_meclis_uye_sayilari = councilor_dict_update(meclis_uye_sayilari)
-
-        # Step 12: Create MunicipalityData class object to simplify parameter entry
-        municipality_data = MunicipalityData(
-            full_list, bb_list, il_list, full_province_list, dataframes_full_pull,
-            dataframes_2019, dataframes_2024, dataframes_2019_stats, dataframes_2024_stats, sege_ilce, sege_il, party_list
-        )
-
-        # Step 13: Generate results summaries
-        logging.info("Exporting full reports...")
-        b_sum_2019, b_ilce_sum_2019, b_buy_sum_2019 = results_per_municipality_df(municipality_data, 'baskanlik', '2019', script_loc, True)
-        m_sum_2019, m_ilce_sum_2019, m_il_sum_2019 = results_per_municipality_df(municipality_data, 'meclis', '2019', script_loc, True)
-        b_sum_2024, b_ilce_sum_2024, b_buy_sum_2024 = results_per_municipality_df(municipality_data, 'baskanlik', '2024', script_loc, True)
-        m_sum_2024, m_ilce_sum_2024, m_il_sum_2024 = results_per_municipality_df(municipality_data, 'meclis', '2024', script_loc, True)
-
-        # Step 14: Create ElectionSummaryData class object to simplify parameter entry
-        election_data = ElectionSummaryData(
-            b_ilce_sum_2024, b_ilce_sum_2019, b_buy_sum_2024, b_buy_sum_2019,
-            m_ilce_sum_2019, m_ilce_sum_2024, m_il_sum_2019, m_il_sum_2024,
-            belediye_meclis_uye_sayilari, il_meclis_uye_sayilari, dataframes_full_pull,
-        )
-
-        # Final step: Export summaries
-        logging.info("Exporting summary reports...")
-        genel_ozet, genel_ozet_list = summary_election_results(election_data, party_list, 'genel_ozet', script_loc, True, bb_list)
-        belediye_baskanligi, belediye_baskanligi_list = summary_election_results(election_data, party_list, 'belediye_baskanligi', script_loc, True, bb_list)
-        buyuksehir_baskanligi, buyuksehir_baskanligi_list = summary_election_results(election_data, party_list, 'buyuksehir_baskanligi', script_loc, True, bb_list)
-        belediye_meclisleri, belediye_meclisleri_list = summary_election_results(election_data, party_list, 'belediye_meclisleri', script_loc, True, bb_list)
-        il_meclisleri, il_meclisleri_list = summary_election_results(election_data, party_list, 'il_meclisleri', script_loc, True, bb_list)
+        if error_urls or empty_urls:
+            logging.warning(f"Some URLs could not be scraped after 4 attempts: {error_urls + empty_urls}")
+        # The later steps update the DataFrames in place, so they are loaded from the sink once scraping is done
+        dataframes_full = load_results(ntv_sink_path)
+
+        # Steps 7-8: Download YSK data
+        # YSK tables are parsed in a process pool while the remaining files are still downloading
+        ysk_units = plan_ysk_units(reference.il_list)
+        if args.replay:
+            archive.restore_files('ysk', script_loc)
+            for year in ('2019', '2024'):
+                for file_path in (script_loc / ysk_folder_names[year]).rglob('*.xls'):
+                    ysk_table_parser.submit(file_path)
+            meclis_uye_sayilari = {key: archive.get('council', key) for key in archive.keys('council')}
+        else:
+            meclis_uye_sayilari = download_ysk(script_loc, ysk_units, archive, ysk_telemetry, ysk_table_parser)
+            ysk_telemetry.log_summary()
+
+        # In delta mode only the provinces with a changed NTV page or YSK file are reprocessed
+        changed_provinces = None
+        if fingerprints is not None:
+            record_ysk_fingerprints(fingerprints, script_loc / ysk_folder_names['2019'], script_loc)
+            record_ysk_fingerprints(fingerprints, script_loc / ysk_folder_names['2024'], script_loc)
+            changed_provinces = {key.split('_')[0] for key in fingerprints.changed}
+            if '*' in changed_provinces:
+                changed_provinces = None
+
+        # Steps 5-14: Merge the sources and export the reports
+        build_reports(script_loc, reference, dataframes_full, meclis_uye_sayilari, changed_provinces, ysk_table_parser)
+
+        # Optional ballot box level results, streamed into a Parquet store and rolled up to the result keys
+        if os.getenv("SCRAPER_BALLOT_BOX_DIR"):
+            ingest_ballot_boxes(os.getenv("SCRAPER_BALLOT_BOX_DIR"), script_loc / "ballot_box_store")
+
+        # Fingerprints are only saved after every output was written, so a failed run is fully redone next time
+        if fingerprints is not None:
+            fingerprints.save()
+
+        # Keep polling the sources and republish the reports whenever they change
+        if args.live and not args.replay:
+            run_live(script_loc, tum_urls, party_list, load_results(ntv_sink_path), meclis_uye_sayilari,
+                     partial(build_reports, script_loc, reference, table_parser=ysk_table_parser, workbook_cache={}),
+                     sink_path=ntv_sink_path, ysk_units=ysk_units,
+                     refresh_budget=int(os.getenv("SCRAPER_LIVE_BUDGET", "200")),
+                     refresh_interval=float(os.getenv("SCRAPER_LIVE_INTERVAL", "30")),
+                     ysk_interval=float(os.getenv("SCRAPER_LIVE_YSK_INTERVAL", "60")),
+                     workers=int(os.getenv("SCRAPER_NTV_WORKERS", "20")))
 
     except Exception as e:
         logging.critical(f"Unhandled exception in main: {e}")
     finally:
         logging.info("Execution completed.")
+        ntv_telemetry.close()
+        ysk_telemetry.close()
+        ysk_table_parser.close()
         terminate_chrome_processes()
         gc.collect()
 
 if __name__ == "__main__":
+    # The YSK workers and the YskTableParser pool start child processes, which re-run
+    # this executable when it is frozen by PyInstaller
+    multiprocessing.freeze_support()
     main()
 
@@ -4,34 +4,158 @@
 # In[ ]:
 
 
+import aiohttp
+import asyncio
 import requests
 import os
 import bs4
 import logging
-import random
 import time
-import re
 import io
 import pandas as pd
-from selenium.webdriver.common.by import By
+import lxml.etree
+import lxml.html
+from pandas.io.parsers import TextParser
+from collections import defaultdict, namedtuple
 from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from queue import Queue
-from threading import Lock
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from threading import BoundedSemaphore, Lock
 from unidecode import unidecode
-from src.driver_utils import create_driver
+from src.config import ntv_rate_limits
+from src.driver_utils import DriverPool, create_session, DEFAULT_HTTP_HEADERS
+from src.rate_limiter import AdaptiveRateLimiter
+from src.fingerprints import NotModified, frame_digest
+from src.telemetry import PhaseTelemetry, pop_sleep, timed_call
+from src.work_queue import RetryWorkQueue, retry_backoff
 
-def get_all_urls():
+UrlRecord = namedtuple('UrlRecord', ['url', 'level', 'province', 'county', 'town', 'key_prefix'])
+
+# Records of the sitemap URLs by URL, filled by `get_all_urls`. `get_key_prefix` reads town provinces from here
+# and only falls back to the page's breadcrumb links for URLs that are missing or could not be resolved.
+url_registry = {}
+
+def iter_sitemap_locs(sitemap_url):
+    """Stream the <loc> entries of a sitemap without building the whole document tree."""
+    with requests.get(sitemap_url, stream=True, timeout=60) as response:
+        response.raise_for_status()
+        response.raw.decode_content = True
+        for _, element in lxml.etree.iterparse(response.raw, events=('end',), tag='{*}loc'):
+            yield element.text.strip()
+            # Drop the parsed <url> entries to keep memory flat
+            parent = element.getparent()
+            element.clear()
+            if parent is not None:
+                parent.clear()
+                while parent.getprevious() is not None:
+                    del parent.getparent()[0]
+
+def special_key_prefix(prefix):
+    """Key prefixes that do not follow the slug rules."""
+    if "akarcay_gorumlu" in prefix:
+        return "tokat_almus_akarcay gorumlu_belde"
+    elif '19' in prefix:
+        return "samsun_19 mayis"
+    return None
+
+def build_url_registry(urls, town_provinces=None):
+    """
+    Classify NTV result URLs by their slug.
+
+    Province pages have a single-word slug ('adana'), county pages start with their province ('adana-seyhan')
+    and town pages end with '-belde' and start with their county ('seyhan-xyz-belde'). A town's province is
+    resolved through `town_provinces` when the (county, town) pair belongs to a single province, otherwise
+    through its county when the county name belongs to a single province. Towns left unresolved get no key
+    prefix, so `get_key_prefix` reads their province from the page.
+
+    Args:
+        urls (iterable): Sitemap URLs; entries that are not result pages are skipped.
+        town_provinces (dict): Optional (county, town) -> set of provinces lookup, names as in `belediye_pdf_op`.
+
+    Returns:
+        dict: UrlRecord by URL, in province, county, town order.
+    """
+    slugs = {}
+    for url in urls:
+        slug = url.rstrip('/').split('/')[-1]
+        if slug.endswith('-secim-sonuclari'):
+            slugs[url] = slug[:-len('-secim-sonuclari')]
+    provinces = {slug for slug in slugs.values() if '-' not in slug}
+    town_provinces = town_provinces or {}
+    county_provinces = defaultdict(set)
+    records = {'il': [], 'ilce': [], 'belde': []}
+    unresolved = []
+
+    for url, slug in slugs.items():
+        parts = slug.split('-')
+        prefix = slug.replace('-', '_')
+        if slug.endswith('-belde'):
+            continue
+        if slug in provinces:
+            records['il'].append(UrlRecord(url, 'il', slug, None, None, special_key_prefix(prefix) or prefix))
+        elif parts[0] in provinces:
+            county = ' '.join(parts[1:])
+            county_provinces['-'.join(parts[1:])].add(parts[0])
+            records['ilce'].append(UrlRecord(url, 'ilce', parts[0], county, None, special_key_prefix(prefix) or prefix))
+        else:
+            unresolved.append(url)
+
+    for url, slug in slugs.items():
+        if not slug.endswith('-belde'):
+            continue
+        parts = slug.split('-')[:-1]
+        prefix = slug.replace('-', '_')
+        province, county, town = None, None, None
+        for split_at in range(len(parts) - 1, 0, -1):
+            county_slug, town_name = '-'.join(parts[:split_at]), ' '.join(parts[split_at:])
+            candidates = county_provinces.get(county_slug, set())
+            county_name = county_slug.replace('-', ' ')
+            provinces_of_town = town_provinces.get((county_name, town_name), set())
+            if len(provinces_of_town) > 1:
+                # e.g. a town name under 'merkez' in two provinces; only the page can tell them apart
+                logging.warning(f'Town page {url} matches {county_name} / {town_name} in several provinces: '
+                                f'{sorted(provinces_of_town)}')
+                break
+            if provinces_of_town:
+                province = next(iter(provinces_of_town))
+            elif len(candidates) == 1:
+                province = next(iter(candidates))
+            else:
+                continue
+            county, town = county_name, town_name
+            break
+        key_prefix = special_key_prefix(prefix) or (f'{province}_{prefix}' if province else None)
+        records['belde'].append(UrlRecord(url, 'belde', province, county, town, key_prefix))
+        if key_prefix is None:
+            logging.warning(f'Province of town page {url} could not be resolved from the sitemap')
+
+    if unresolved:
+        logging.warning(f'{len(unresolved)} sitemap URLs could not be classified: {unresolved}')
+    return {record.url: record for level in ('il', 'ilce', 'belde') for record in records[level]}
+
+def get_all_urls(belde_list=None):
+    """
+    Read the NTV sitemap and fill `url_registry`.
+
+    Args:
+        belde_list (list): Optional (province, county, town) tuples of `belediye_pdf_op`, used for towns whose
+            county name exists in more than one province.
+
+    Returns:
+        tuple: Province, county, central county, non-central county, town and all URLs.
+    """
     sitemap_url = 'https://secim.ntv.com.tr/sitemap.xml'
-    response = requests.get(sitemap_url)
-    sitemap_soup = bs4.BeautifulSoup(response.content, 'xml')
-    urls = [loc.text for loc in sitemap_soup.find_all('loc')]
-    il_urls = urls[1:82]
-    tum_ilceler_urls = urls[82:1055]
-    merkez_ilce_urls = [url for url in tum_ilceler_urls if re.search(r'-merkez-', url)]
-    ilce_urls = list(filter(lambda url: url not in merkez_ilce_urls, tum_ilceler_urls))
-    belde_urls = [url for url in urls if re.search(r'-belde-', url)]
+    town_provinces = defaultdict(set)
+    for il, ilce, belde in belde_list or []:
+        town_provinces[(ilce, belde)].add(il)
+    url_registry.clear()
+    url_registry.update(build_url_registry(iter_sitemap_locs(sitemap_url), town_provinces))
+    records = list(url_registry.values())
+    il_urls = [record.url for record in records if record.level == 'il']
+    tum_ilceler_urls = [record.url for record in records if record.level == 'ilce']
+    merkez_ilce_urls = [record.url for record in records if record.level == 'ilce' and '-merkez-' in record.url]
+    ilce_urls = [url for url in tum_ilceler_urls if url not in merkez_ilce_urls]
+    belde_urls = [record.url for record in records if record.level == 'belde']
     tum_urls = il_urls + tum_ilceler_urls + belde_urls
     logging.info(f'Total province URLs: {len(il_urls)}')
     logging.info(f'Total county URLs: {len(tum_ilceler_urls)}')
@@ -41,100 +165,714 @@ def get_all_urls():
     logging.info(f'Total URLs: {len(tum_urls)}')
     return il_urls, tum_ilceler_urls, merkez_ilce_urls, ilce_urls, belde_urls, tum_urls
 
-def scrape_to_df(url_list, party_list):
-    
-    def process_dataframe(df, party_list):
-        if not df.empty:
-            if 'OY ORANI' in df.columns:
-                df['OY ORANI'] = df['OY ORANI'].str.replace('%', '').astype(float)
-            if '2019 OY ORANI' in df.columns:
-                df['2019 OY ORANI'] = df['2019 OY ORANI'].str.replace('%', '').astype(float)
-            df.set_index('PARTİ', inplace=True)
-            if 'SIRA' in df.columns:
-                df.drop('SIRA', axis=1, inplace=True)
-            df.rename(index=lambda x: unidecode(x).lower(), inplace=True)
-            df.loc['bagimsiz toplam oy'] = 0
-            for index in list(df.index):
-                if index not in party_list:
-                    df.loc['bagimsiz toplam oy', 'ALINAN OY'] += df.loc[index, 'ALINAN OY']
-                    df.loc['bagimsiz toplam oy', 'OY ORANI'] += df.loc[index, 'OY ORANI']
-                    if '2019 ALINAN OY' in df.columns and '2019 OY ORANI' in df.columns:
-                        df.loc['bagimsiz toplam oy', '2019 ALINAN OY'] += df.loc[index, '2019 ALINAN OY']
-                        df.loc['bagimsiz toplam oy', '2019 OY ORANI'] += df.loc[index, '2019 OY ORANI']
-                    df.drop(index, inplace=True)
-            df.rename(columns={'ALINAN OY': '2024 ALINAN OY', 'OY ORANI': '2024 OY ORANI'}, inplace=True)
-        return df
-    
-    def scrape_single_url(url, driver_queue, lock, party_list):
-        driver = driver_queue.get()
-        try:
-            driver.get(url)
-            time.sleep(random.uniform(2, 4))
-            wait = WebDriverWait(driver, 10)
-            app_root = wait.until(EC.presence_of_element_located((By.TAG_NAME, "app-root")))
-            content = app_root.get_attribute("innerHTML")
-            dfs = pd.read_html(io.StringIO(content), thousands='.', decimal=',')
-            prefix = url.split('/')[-1].replace('-secim-sonuclari', '').replace('-', '_')
-            if "akarcay_gorumlu" in prefix:
-                key_prefix = "tokat_almus_akarcay gorumlu_belde"
-            elif '19' in prefix:
-                key_prefix = "samsun_19 mayis"
-            elif "-belde-" in url:
-                try:
-                    wait.until(EC.presence_of_all_elements_located((By.TAG_NAME, 'a')))
-                    soup = bs4.BeautifulSoup(content, "lxml")
-                    elements = soup.find_all('a')
-                    if len(elements) > 9:
-                        il_name = unidecode(elements[9].getText()).lower()
-                        key_prefix = il_name + "_" + prefix
-                    else:
-                        raise ValueError(f'Not enough elements found for {url}')
-                except Exception as e:
-                    logging.error(f'Error processing elements for {url}: {e}')
-                    return url, None, None
+def process_dataframe(df, party_list):
+    if not df.empty:
+        if 'OY ORANI' in df.columns:
+            df['OY ORANI'] = df['OY ORANI'].str.replace('%', '').astype(float)
+        if '2019 OY ORANI' in df.columns:
+            df['2019 OY ORANI'] = df['2019 OY ORANI'].str.replace('%', '').astype(float)
+        df.set_index('PARTİ', inplace=True)
+        if 'SIRA' in df.columns:
+            df.drop('SIRA', axis=1, inplace=True)
+        df.rename(index=lambda x: unidecode(x).lower(), inplace=True)
+        # Every row that is not a party is an independent candidate, summed into a single row
+        summed_columns = ['ALINAN OY', 'OY ORANI']
+        if '2019 ALINAN OY' in df.columns and '2019 OY ORANI' in df.columns:
+            summed_columns += ['2019 ALINAN OY', '2019 OY ORANI']
+        independent_mask = ~df.index.isin(party_list)
+        # skipna=False: a missing count makes the total missing instead of counting as 0, as in the row by row sum
+        independent_totals = df.loc[independent_mask, summed_columns].sum(skipna=False)
+        independent_labels = df.index[independent_mask]
+        df.loc['bagimsiz toplam oy'] = 0
+        for column in summed_columns:
+            df.loc['bagimsiz toplam oy', column] = independent_totals[column]
+        df.drop(independent_labels, inplace=True)
+        df.rename(columns={'ALINAN OY': '2024 ALINAN OY', 'OY ORANI': '2024 OY ORANI'}, inplace=True)
+    return df
+
+# Runs inside the NTV page and returns what `parse_ntv_page` needs: the rows of the presidency and council
+# tables and the text of the 10th link, which holds the province name on town pages. The tables are picked
+# and read the way `pd.read_html` (lxml) reads the server HTML: tables without text or with a hidden style are
+# skipped, hidden cells and <style> are left out, header cells and colspan/rowspan are expanded, and tables
+# that end up without data do not count. Only the 3rd and 4th table found leave the browser.
+EXTRACT_RESULTS_SCRIPT = """
+const root = document.querySelector('app-root');
+if (!root) { return null; }
+const isHidden = element => (element.getAttribute('style') || '').replace(/ /g, '').includes('display:none');
+const textOf = node => Array.from(node.childNodes).map(child => {
+    if (child.nodeType === Node.TEXT_NODE) { return child.data; }
+    if (child.nodeType !== Node.ELEMENT_NODE || child.tagName === 'STYLE' || isHidden(child)) { return ''; }
+    return child.tagName === 'BR' ? '\\n' : textOf(child);
+}).join('');
+const isShown = (element, table) => {
+    for (; element !== table; element = element.parentElement) {
+        if (isHidden(element)) { return false; }
+    }
+    return true;
+};
+const rowsOf = (table, selector) => Array.from(table.querySelectorAll(selector))
+    .filter(row => row.closest('table') === table && isShown(row, table))
+    .map(row => Array.from(row.children).filter(cell => ['TD', 'TH'].includes(cell.tagName) && !isHidden(cell)));
+// Same as pandas' _expand_colspan_rowspan
+const expand = rows => {
+    const allTexts = [];
+    let remainder = [];
+    for (const cells of rows) {
+        const texts = [];
+        const nextRemainder = [];
+        let index = 0;
+        for (const cell of cells) {
+            while (remainder.length && remainder[0][0] <= index) {
+                const [prevIndex, prevText, prevRowspan] = remainder.shift();
+                texts.push(prevText);
+                if (prevRowspan > 1) { nextRemainder.push([prevIndex, prevText, prevRowspan - 1]); }
+                index += 1;
+            }
+            const text = textOf(cell).replace(/[\\r\\n]+|\\s{2,}/g, ' ');
+            const rowspan = parseInt(cell.getAttribute('rowspan') || 1, 10) || 1;
+            const colspan = parseInt(cell.getAttribute('colspan') || 1, 10) || 1;
+            for (let i = 0; i < colspan; i++) {
+                texts.push(text);
+                if (rowspan > 1) { nextRemainder.push([index, text, rowspan - 1]); }
+                index += 1;
+            }
+        }
+        for (const [prevIndex, prevText, prevRowspan] of remainder) {
+            texts.push(prevText);
+            if (prevRowspan > 1) { nextRemainder.push([prevIndex, prevText, prevRowspan - 1]); }
+        }
+        allTexts.push(texts);
+        remainder = nextRemainder;
+    }
+    while (remainder.length) {
+        const nextRemainder = [];
+        const texts = [];
+        for (const [prevIndex, prevText, prevRowspan] of remainder) {
+            texts.push(prevText);
+            if (prevRowspan > 1) { nextRemainder.push([prevIndex, prevText, prevRowspan - 1]); }
+        }
+        allTexts.push(texts);
+        remainder = nextRemainder;
+    }
+    return allTexts;
+};
+const readTable = table => {
+    const head = rowsOf(table, 'thead > tr');
+    const body = rowsOf(table, 'tbody tr').concat(rowsOf(table, ':scope > tr'));
+    const foot = rowsOf(table, 'tfoot tr');
+    if (!head.length) {
+        while (body.length && body[0].every(cell => cell.tagName === 'TH')) { head.push(body.shift()); }
+    }
+    return {head: expand(head), body: expand(body), foot: expand(foot)};
+};
+// pandas gives up on a table without cells, or with a single column of blank cells
+const isEmpty = table => {
+    const rows = table.head.concat(table.body, table.foot);
+    return Math.max(0, ...rows.map(row => row.length)) <= 1 && rows.every(row => row.every(text => !/\\S/.test(text)));
+};
+const tables = [];
+for (const table of root.querySelectorAll('table')) {
+    if (!/[^ \\t\\n\\r\\f]/.test(table.textContent) || isHidden(table)) { continue; }
+    const rows = readTable(table);
+    if (!isEmpty(rows)) { tables.push(rows); }
+    if (tables.length === 4) {
+        const links = root.querySelectorAll('a');
+        return {tables: tables.slice(2), province_link: links.length > 9 ? links[9].textContent : null};
+    }
+}
+return null;
+"""
+
+def get_key_prefix(url, content):
+    record = url_registry.get(url)
+    if record is not None and record.key_prefix is not None:
+        return record.key_prefix
+    prefix = url.split('/')[-1].replace('-secim-sonuclari', '').replace('-', '_')
+    if special_key_prefix(prefix):
+        return special_key_prefix(prefix)
+    elif "-belde-" in url:
+        # Town pages do not carry the province in their slug, it is read from the breadcrumb links instead
+        if isinstance(content, dict):
+            province_link = content['province_link']
+        else:
+            elements = bs4.BeautifulSoup(content, "lxml").find_all('a')
+            province_link = elements[9].getText() if len(elements) > 9 else None
+        if province_link is None:
+            raise ValueError(f'Not enough elements found for {url}')
+        il_name = unidecode(province_link).lower()
+        return il_name + "_" + prefix
+    return prefix
+
+def read_result_tables(content):
+    """The presidency and council tables of server HTML: the 3rd and 4th table `pd.read_html` finds in it."""
+    # lxml only: without tables pandas would retry with bs4/html5lib, which is not installed
+    dfs = pd.read_html(io.StringIO(content), flavor='lxml', thousands='.', decimal=',')
+    return dfs[2], dfs[3]
+
+def frame_from_rows(table):
+    """
+    Build a DataFrame from a table returned by `EXTRACT_RESULTS_SCRIPT`, the way `pd.read_html` builds one.
+
+    Args:
+        table (dict): The expanded 'head', 'body' and 'foot' rows of the table.
+
+    Returns:
+        pd.DataFrame: The same frame `read_result_tables` gives for the table.
+    """
+    head = table['head']
+    # Payloads archived before the footer was extracted have no 'foot'
+    rows = head + table['body'] + table.get('foot', [])
+    header = None
+    if head:
+        header = 0 if len(head) == 1 else [i for i, row in enumerate(head) if any(row)]
+    width = max(len(row) for row in rows)
+    rows = [row + [''] * (width - len(row)) for row in rows]
+    with TextParser(rows, header=header, thousands='.', decimal=',') as parser:
+        return parser.read()
+
+def parse_ntv_page(url, content, party_list, tables=None):
+    """
+    Build the presidency and council DataFrames of an NTV result page.
+
+    Args:
+        content (str or dict): The `app-root` inner HTML, or the payload returned by `EXTRACT_RESULTS_SCRIPT`.
+        tables (tuple): The raw (presidency, council) tables when they were already read from `content`.
+
+    Returns:
+        tuple: (key_prefix, df_baskan, df_meclis)
+    """
+    if tables is not None:
+        df_baskan, df_meclis = tables
+    elif isinstance(content, dict):
+        df_baskan, df_meclis = (frame_from_rows(table) for table in content['tables'])
+    else:
+        df_baskan, df_meclis = read_result_tables(content)
+    key_prefix = get_key_prefix(url, content)
+    df_baskan = process_dataframe(df_baskan, party_list)
+    df_meclis = process_dataframe(df_meclis, party_list)
+    return key_prefix, df_baskan, df_meclis
+
+def fetch_page_selenium(driver, url, rate_limiter):
+    rate_limiter.acquire()
+    try:
+        driver.get(url)
+    except Exception:
+        rate_limiter.record_failure()
+        raise
+    rate_limiter.record_success()
+    # Wait for Angular to render the result tables instead of sleeping for a fixed time,
+    # then pull only the needed cells out of the page instead of the whole app-root HTML
+    return WebDriverWait(driver, 10).until(lambda d: d.execute_script(EXTRACT_RESULTS_SCRIPT))
+
+def extract_app_root(page_content):
+    """
+    Return the inner HTML of the `app-root` element of a server-rendered NTV page.
+
+    Returns None when the page does not contain the result tables yet,
+    meaning the page has to be rendered by a browser.
+    """
+    tree = lxml.html.fromstring(page_content, parser=lxml.html.HTMLParser(encoding='utf-8'))
+    app_root = tree.find('.//app-root')
+    if app_root is None or len(app_root.findall('.//table')) < 4:
+        return None
+    inner_html = app_root.text or ''
+    inner_html += ''.join(lxml.html.tostring(child, encoding='unicode') for child in app_root)
+    return inner_html
+
+def is_throttling_status(status_code):
+    return status_code == 429 or status_code >= 500
+
+def fetch_page_http(session, url, rate_limiter, timeout=15, fingerprints=None):
+    """
+    Fetch a page with the pooled session. With `fingerprints` the request is conditional and
+    `NotModified` is raised when the server answers 304.
+    """
+    headers = fingerprints.request_headers(url) if fingerprints is not None else None
+    rate_limiter.acquire()
+    try:
+        response = session.get(url, timeout=timeout, headers=headers)
+    except requests.RequestException:
+        rate_limiter.record_failure()
+        raise
+    if is_throttling_status(response.status_code):
+        rate_limiter.record_failure()
+    else:
+        rate_limiter.record_success()
+    if response.status_code == 304:
+        fingerprints.mark_unchanged(url)
+        raise NotModified(url)
+    response.raise_for_status()
+    if fingerprints is not None:
+        fingerprints.remember_validators(url, response.headers)
+    return extract_app_root(response.content)
+
+def check_not_modified(session, url, rate_limiter, fingerprints, timeout=15):
+    """
+    Conditional HEAD request for a page the browser is about to render in delta mode. Raises `NotModified`
+    when the server answers 304, so the page is not rendered; otherwise the validators of the answer are
+    kept for the rendered result. A failed request only means that the page gets rendered.
+    """
+    rate_limiter.acquire()
+    try:
+        response = session.head(url, timeout=timeout, headers=fingerprints.request_headers(url), allow_redirects=True)
+    except requests.RequestException as e:
+        rate_limiter.record_failure()
+        logging.debug(f'Conditional HEAD request for {url} failed, rendering the page: {e}')
+        return
+    if is_throttling_status(response.status_code):
+        rate_limiter.record_failure()
+    else:
+        rate_limiter.record_success()
+    if response.status_code == 304:
+        fingerprints.mark_unchanged(url)
+        raise NotModified(url)
+    if response.ok:
+        fingerprints.remember_validators(url, response.headers)
+
+async def fetch_page_async(session, url, rate_limiter, timeout=15, fingerprints=None):
+    headers = fingerprints.request_headers(url) if fingerprints is not None else None
+    await rate_limiter.acquire_async()
+    try:
+        async with session.get(url, timeout=aiohttp.ClientTimeout(total=timeout), headers=headers) as response:
+            if is_throttling_status(response.status):
+                rate_limiter.record_failure()
             else:
-                key_prefix = prefix
-            df_baskan = process_dataframe(dfs[2], party_list)
-            df_meclis = process_dataframe(dfs[3], party_list)
-            with lock:
-                logging.info(f'{key_prefix} DataFrame created!')
-            return key_prefix, df_baskan, df_meclis
+                rate_limiter.record_success()
+            if response.status == 304:
+                fingerprints.mark_unchanged(url)
+                raise NotModified(url)
+            response.raise_for_status()
+            if fingerprints is not None:
+                fingerprints.remember_validators(url, response.headers)
+            page_content = await response.read()
+    except aiohttp.ClientResponseError:
+        # Already counted by its status above
+        raise
+    except (aiohttp.ClientError, asyncio.TimeoutError):
+        rate_limiter.record_failure()
+        raise
+    return extract_app_root(page_content)
+
+def create_rate_limiter(engine):
+    return AdaptiveRateLimiter(**ntv_rate_limits[engine])
+
+class RenderRequired(Exception):
+    """Raised by browserless fetches when a page can only be parsed after browser rendering."""
+
+def create_parse_executor(parse_processes=False, parse_workers=None):
+    """
+    Executor for the CPU-bound parse stage. With `parse_processes` the pages are parsed in a process
+    pool sized to the core count, so `pd.read_html`, BeautifulSoup and the pandas work in
+    `process_dataframe` are not serialized by the GIL. Workers receive the raw HTML string and
+    send back only the two small result DataFrames.
+    """
+    parse_workers = parse_workers or os.cpu_count()
+    if parse_processes:
+        return ProcessPoolExecutor(max_workers=parse_workers)
+    return ThreadPoolExecutor(max_workers=parse_workers)
+
+def is_changed_result(fingerprints, url, key_prefix, df_baskan, df_meclis):
+    """In delta mode, record the digest of a parsed page and tell whether its results changed since the last run."""
+    if fingerprints is None:
+        return True
+    return fingerprints.record(url, frame_digest(df_baskan, df_meclis), keys=[key_prefix])
+
+def store_result(data_dict, sink, url, key_prefix, df_baskan, df_meclis):
+    """Write a parsed page to the sink, or keep it in `data_dict` when scraping without one."""
+    if sink is not None:
+        sink.write(url, key_prefix, df_baskan, df_meclis)
+    else:
+        data_dict[f'{key_prefix}_baskanlik_sonuclari'] = df_baskan
+        data_dict[f'{key_prefix}_meclis_sonuclari'] = df_meclis
+
+def scrape_to_df(url_list, party_list, engine='selenium', max_workers=5, rate_limiter=None, max_attempts=1, no_retry_urls=(),
+                 parse_processes=False, sink=None, archive=None, fingerprints=None, telemetry=None):
+    """
+    Scrape NTV result pages into presidency and council DataFrames.
+
+    Args:
+        url_list (list): NTV result page URLs.
+        party_list (list): Party names; any other row is summed into 'bagimsiz toplam oy'.
+        engine (str): 'selenium' renders every page in headless Chrome. 'http' fetches pages with a
+            pooled requests Session and only renders the pages that come back without result tables.
+            'async' does the same on a single asyncio event loop.
+        max_workers (int): Concurrent fetches. Drivers are heavy, sessions are not, so the
+            'http' engine can run with far more workers than 'selenium', and the 'async'
+            engine can keep hundreds of requests in flight.
+        rate_limiter (AdaptiveRateLimiter): Limiter shared by all fetches of the engine. A new one with
+            the engine defaults from `config.ntv_rate_limits` is created when omitted.
+        max_attempts (int): Attempts per URL. Failed and empty URLs are put back on the live work
+            queue with a per-URL backoff and picked up again by the already running workers.
+        no_retry_urls (iterable): URLs that are known to be empty and are never retried.
+        parse_processes (bool): Parse pages in a process pool instead of a thread pool.
+        sink (ResultSink): Write each page to this sink as soon as it is parsed instead of collecting it in
+            `data_dict`, which then stays empty.
+        archive (PageArchive): Store the content of every successfully parsed page for `replay_to_df`.
+        fingerprints (FingerprintStore): Delta mode. HTTP fetches are conditional, the 'selenium' engine sends
+            a conditional HEAD request before rendering a page, and pages whose results match the previous
+            run are neither stored nor returned. Changed key prefixes are collected in
+            `fingerprints.changed`.
+        telemetry (PhaseTelemetry): Collects a timing record for every attempt at a URL and the busy time of
+            every worker. The caller logs its summary once the phase is done.
+
+    Returns:
+        tuple: (data_dict, error_urls, empty_urls)
+    """
+    if engine not in ntv_rate_limits:
+        raise ValueError(f"Unknown NTV scrape engine: {engine}")
+    if rate_limiter is None:
+        rate_limiter = create_rate_limiter(engine)
+    if engine == 'selenium':
+        data_dict, error_urls, empty_urls, _ = scrape_to_df_selenium(
+            url_list, party_list, max_workers, rate_limiter, max_attempts, no_retry_urls, parse_processes, sink, archive, fingerprints,
+            telemetry)
+        logging.info(rate_limiter.describe())
+        return data_dict, error_urls, empty_urls
+    browserless_scraper = scrape_to_df_http if engine == 'http' else scrape_to_df_async
+    data_dict, error_urls, empty_urls, render_urls = browserless_scraper(
+        url_list, party_list, max_workers, rate_limiter, max_attempts, no_retry_urls, parse_processes, sink, archive, fingerprints,
+        telemetry)
+    logging.info(rate_limiter.describe())
+    if render_urls:
+        logging.info(f'{len(render_urls)} URLs need rendering, falling back to Selenium for them...')
+        render_data_dict, render_error_urls, render_empty_urls = scrape_to_df(
+            render_urls, party_list, 'selenium', max_attempts=max_attempts, no_retry_urls=no_retry_urls,
+            parse_processes=parse_processes, sink=sink, archive=archive, fingerprints=fingerprints, telemetry=telemetry)
+        data_dict.update(render_data_dict)
+        error_urls.extend(render_error_urls)
+        empty_urls.extend(render_empty_urls)
+    return data_dict, error_urls, empty_urls
+
+def parse_server_page(url, content, party_list):
+    """
+    `parse_ntv_page` for server HTML. Only missing result tables mean that the page has to be rendered;
+    any other error is a parse failure and is raised as such.
+    """
+    try:
+        tables = read_result_tables(content)
+    except (ValueError, IndexError) as e:
+        raise RenderRequired(f'Result tables missing from the server HTML of {url}: {e}') from e
+    return parse_ntv_page(url, content, party_list, tables)
+
+def run_worker_pool(url_list, fetch_page, parse_page, resources, max_attempts=1, no_retry_urls=(),
+                    parse_processes=False, parse_workers=None, parse_queue_size=None, sink=None, archive=None,
+                    fingerprints=None, telemetry=None):
+    """
+    Scrape URLs with a two-stage pipeline fed by a retry work queue.
+
+    The fetch stage runs one thread per resource (a driver or a shared session). Each fetched page is
+    handed to a bounded parse stage, so the resource is free to load the next page while the previous
+    one is still being parsed. A full parse stage blocks the fetchers instead of buffering pages.
+
+    Args:
+        fetch_page (callable): `fetch_page(resource, url)` returns the page content.
+        parse_page (callable): `parse_page(url, content)` returns (key_prefix, df_baskan, df_meclis).
+            Must be picklable when `parse_processes` is set.
+        resources (list): One entry per fetch worker.
+        parse_processes (bool): Run the parse stage in a process pool, see `create_parse_executor`.
+        parse_workers (int): Parse stage workers, defaults to the CPU count.
+        parse_queue_size (int): Pages that may wait for or be in parsing, defaults to twice the parse workers.
+        sink (ResultSink): Destination for parsed pages, see `scrape_to_df`.
+        archive (PageArchive): Archive for the content of parsed pages, see `scrape_to_df`.
+        fingerprints (FingerprintStore): Delta mode fingerprints, see `scrape_to_df`.
+        telemetry (PhaseTelemetry): Receives the timing record of every attempt, see `scrape_to_df`.
+
+    Failed fetches and parses are retried until they run out of attempts and then reported as empty.
+    `RenderRequired` raised by either stage sets the URL aside without retrying, and `NotModified`
+    raised by the fetch stage finishes it without parsing.
+
+    Returns:
+        tuple: (data_dict, error_urls, empty_urls, render_urls)
+    """
+    data_dict, error_urls, empty_urls, render_urls = {}, [], [], []
+    if not url_list:
+        return data_dict, error_urls, empty_urls, render_urls
+    work_queue = RetryWorkQueue(url_list, max_attempts, no_retry=no_retry_urls)
+    lock = Lock()
+    parse_workers = parse_workers or os.cpu_count()
+    parse_slots = BoundedSemaphore(parse_queue_size or 2 * parse_workers)
+    parse_executor = create_parse_executor(parse_processes, parse_workers)
+    telemetry = telemetry or PhaseTelemetry('ntv')
+    for url in url_list:
+        telemetry.queued(url)
+
+    def record_attempt(url, attempt, outcome, timings, parse=None):
+        telemetry.record(url, attempt, outcome, timings['worker'], queue_wait=timings['queue_wait'], sleep=timings['sleep'],
+                         fetch=timings['fetch'], parse=parse, total=time.perf_counter() - timings['picked_at'])
+
+    def set_aside_for_rendering(url):
+        with lock:
+            render_urls.append(url)
+        work_queue.done(url)
+
+    def retry_or_give_up(url, attempt):
+        telemetry.queued(url, time.monotonic() + retry_backoff(attempt, work_queue.base_backoff, work_queue.max_backoff))
+        if work_queue.retry(url, attempt):
+            logging.info(f'{url} requeued for attempt {attempt + 1}/{max_attempts}')
+            return 'retry'
+        telemetry.dequeued(url)
+        with lock:
+            empty_urls.append(url)
+        return 'empty'
+
+    def finish_parse(url, attempt, content, timings, future):
+        parse_slots.release()
+        try:
+            (key_prefix, df_baskan, df_meclis), parse_seconds = future.result()
+        except RenderRequired as e:
+            logging.debug(e)
+            set_aside_for_rendering(url)
+            record_attempt(url, attempt, 'render', timings)
+            return
         except Exception as e:
+            logging.error(f'Error processing elements for {url}: {e}')
+            record_attempt(url, attempt, retry_or_give_up(url, attempt), timings)
+            return
+        try:
+            if df_baskan is not None and not df_baskan.empty:
+                if is_changed_result(fingerprints, url, key_prefix, df_baskan, df_meclis):
+                    with lock:
+                        store_result(data_dict, sink, url, key_prefix, df_baskan, df_meclis)
+                        logging.info(f'DataFrames for {url} added!')
+                    outcome = 'stored'
+                else:
+                    logging.debug(f'Results for {url} are unchanged')
+                    outcome = 'unchanged'
+                if archive is not None:
+                    archive.put('ntv', url, content)
+                work_queue.done(url)
+            else:
+                outcome = retry_or_give_up(url, attempt)
+        except Exception as exc:
             with lock:
-                logging.error(f'Error scraping {url}: {e}')
-            return url, None, None
+                error_urls.append(url)
+                logging.error(f'URL generated an exception: {url}: {exc}')
+            work_queue.done(url)
+            outcome = 'error'
+        record_attempt(url, attempt, outcome, timings, parse_seconds)
+
+    def fetch_worker(worker, resource):
+        telemetry.worker_started(worker)
+        try:
+            while True:
+                job = work_queue.get()
+                if job is None:
+                    return
+                url, attempt = job
+                timings = {'worker': worker, 'queue_wait': telemetry.dequeued(url), 'picked_at': time.perf_counter()}
+                pop_sleep()
+                try:
+                    content = fetch_page(resource, url)
+                    outcome = None
+                except RenderRequired:
+                    set_aside_for_rendering(url)
+                    outcome = 'render'
+                except NotModified:
+                    logging.debug(f'{url} not modified since the last run')
+                    work_queue.done(url)
+                    outcome = 'not_modified'
+                except Exception as e:
+                    logging.error(f'Error scraping {url}: {e}')
+                    outcome = retry_or_give_up(url, attempt)
+                # Time spent waiting on the rate limiter is not load time
+                timings['sleep'] = pop_sleep()
+                timings['fetch'] = time.perf_counter() - timings['picked_at'] - timings['sleep']
+                telemetry.add_busy(worker, timings['fetch'])
+                if outcome is not None:
+                    record_attempt(url, attempt, outcome, timings)
+                    continue
+                parse_slots.acquire()
+                try:
+                    future = parse_executor.submit(timed_call, parse_page, url, content)
+                except Exception as e:
+                    parse_slots.release()
+                    logging.error(f'Error submitting {url} for parsing: {e}')
+                    record_attempt(url, attempt, retry_or_give_up(url, attempt), timings)
+                    continue
+                future.add_done_callback(partial(finish_parse, url, attempt, content, timings))
         finally:
-            driver_queue.put(driver)
+            telemetry.worker_stopped(worker)
 
-    data_dict, error_urls, empty_urls = {}, [], []
-    driver_queue = Queue(maxsize=5)
-    for _ in range(5):
-        driver_queue.put(create_driver(deny_process=True))
-    lock = Lock()
+    try:
+        with ThreadPoolExecutor(max_workers=len(resources)) as executor:
+            workers = [executor.submit(fetch_worker, f'{type(resource).__name__}-{index}', resource)
+                       for index, resource in enumerate(resources)]
+            for future in workers:
+                future.result()
+    finally:
+        parse_executor.shutdown(wait=True)
+    return data_dict, error_urls, empty_urls, render_urls
+
+def scrape_to_df_selenium(url_list, party_list, max_workers, rate_limiter, max_attempts=1, no_retry_urls=(),
+                          parse_processes=False, sink=None, archive=None, fingerprints=None, telemetry=None):
+    # In delta mode a conditional HEAD request tells whether a page changed before a browser renders it
+    session = create_session(pool_size=max_workers) if fingerprints is not None else None
+    head_rate_limiter = create_rate_limiter('http')
 
-    executor = ThreadPoolExecutor(max_workers=5)  # Initialize executor
+    def fetch_page(driver, url):
+        if session is not None:
+            check_not_modified(session, url, head_rate_limiter, fingerprints)
+        return fetch_page_selenium(driver, url, rate_limiter)
+
+    drivers = []
     try:
-        future_to_url = {executor.submit(scrape_single_url, url, driver_queue, lock, party_list): url for url in url_list}
-        for future in as_completed(future_to_url):
-            try:
-                key_prefix, df_baskan, df_meclis = future.result()
-                if df_baskan is not None and not df_baskan.empty:
-                    data_dict[f'{key_prefix}_baskanlik_sonuclari'] = df_baskan
-                    data_dict[f'{key_prefix}_meclis_sonuclari'] = df_meclis
-                    with lock:
-                        logging.info(f'DataFrames for {future_to_url[future]} added!')
-                else:
-                    empty_urls.append(future_to_url[future])
-            except Exception as exc:
-                error_urls.append(future_to_url[future])
-                with lock:
-                    logging.error(f'URL generated an exception: {future_to_url[future]}: {exc}')
+        # The browsers start concurrently instead of one after the other
+        driver_count = min(max_workers, len(url_list))
+        driver_pool = DriverPool(driver_count, deny_process=True, block_preset='ntv')
+        try:
+            for _ in range(driver_count):
+                drivers.append(driver_pool.acquire(replace=False))
+        finally:
+            driver_pool.close()
+        return run_worker_pool(url_list, fetch_page, partial(parse_ntv_page, party_list=party_list),
+                               drivers, max_attempts, no_retry_urls, parse_processes, sink=sink, archive=archive,
+                               fingerprints=fingerprints, telemetry=telemetry)
     finally:
-        executor.shutdown(wait=True)  # Ensure all threads are terminated
-        while not driver_queue.empty():
-            driver = driver_queue.get()
+        for driver in drivers:
             driver.close()
             driver.quit()
+        if session is not None:
+            session.close()
+
+def scrape_to_df_http(url_list, party_list, max_workers, rate_limiter, max_attempts=1, no_retry_urls=(),
+                      parse_processes=False, sink=None, archive=None, fingerprints=None, telemetry=None):
+    """
+    Browserless counterpart of `scrape_to_df_selenium`.
+
+    Returns:
+        tuple: (data_dict, error_urls, empty_urls, render_urls) where render_urls lists the pages
+        whose HTML could not be parsed without a browser.
+    """
+    def fetch_page(session, url):
+        content = fetch_page_http(session, url, rate_limiter, fingerprints=fingerprints)
+        if content is None:
+            raise RenderRequired(url)
+        return content
+
+    session = create_session(pool_size=max_workers)
+    try:
+        return run_worker_pool(url_list, fetch_page, partial(parse_server_page, party_list=party_list),
+                               [session] * max_workers, max_attempts, no_retry_urls, parse_processes, sink=sink, archive=archive,
+                               fingerprints=fingerprints, telemetry=telemetry)
+    finally:
+        session.close()
+
+def scrape_to_df_async(url_list, party_list, max_concurrency, rate_limiter, max_attempts=1, no_retry_urls=(),
+                       parse_processes=False, sink=None, archive=None, fingerprints=None, telemetry=None):
+    """
+    Asyncio counterpart of `scrape_to_df_http`. All fetches share one event loop and one connection
+    pool, and a semaphore caps how many of them are in flight. Parsing is CPU-bound, so it runs in a
+    thread or process pool to keep the event loop responsive. Failed URLs wait out their backoff outside the
+    semaphore, so they do not hold a fetch slot while waiting.
+
+    Returns:
+        tuple: (data_dict, error_urls, empty_urls, render_urls)
+    """
+    return asyncio.run(crawl_ntv(url_list, party_list, max_concurrency, rate_limiter, max_attempts, no_retry_urls,
+                                 parse_processes, sink, archive, fingerprints, telemetry))
+
+async def crawl_ntv(url_list, party_list, max_concurrency, rate_limiter, max_attempts=1, no_retry_urls=(),
+                    parse_processes=False, sink=None, archive=None, fingerprints=None, telemetry=None):
+    data_dict, error_urls, empty_urls, render_urls = {}, [], [], []
+    no_retry_urls = set(no_retry_urls)
+    semaphore = asyncio.Semaphore(max_concurrency)
+    loop = asyncio.get_running_loop()
+    parse_executor = create_parse_executor(parse_processes)
+    telemetry = telemetry or PhaseTelemetry('ntv')
+
+    async def scrape_attempt(session, url, timings):
+        # Every URL runs in its own task, so the sleep counter only sees this URL's rate limiter waits
+        waiting_since = time.perf_counter()
+        async with semaphore:
+            timings['queue_wait'] = time.perf_counter() - waiting_since
+            fetch_start = time.perf_counter()
+            pop_sleep()
+            try:
+                content = await fetch_page_async(session, url, rate_limiter, fingerprints=fingerprints)
+            finally:
+                timings['sleep'] = pop_sleep()
+                timings['fetch'] = time.perf_counter() - fetch_start - timings['sleep']
+        if content is None:
+            raise RenderRequired(url)
+        result, timings['parse'] = await loop.run_in_executor(parse_executor, timed_call, parse_server_page, url, content, party_list)
+        if archive is not None and result[1] is not None and not result[1].empty:
+            archive.put('ntv', url, content)
+        return result
+
+    async def scrape_single_url(session, url):
+        attempt = 1
+        while True:
+            timings = {}
+            attempt_start = time.perf_counter()
+
+            def record_attempt(outcome):
+                telemetry.record(url, attempt, outcome, total=time.perf_counter() - attempt_start, **timings)
+
+            failed = False
+            try:
+                result = await scrape_attempt(session, url, timings)
+            except RenderRequired as e:
+                logging.debug(e)
+                render_urls.append(url)
+                record_attempt('render')
+                return
+            except NotModified:
+                logging.debug(f'{url} not modified since the last run')
+                record_attempt('not_modified')
+                return
+            except Exception as e:
+                # Network errors, timeouts and parse failures get the same attempts and backoff as empty pages
+                logging.error(f'Error scraping {url} (attempt {attempt}/{max_attempts}): {e}')
+                failed = True
+            if not failed and result[1] is not None and not result[1].empty:
+                key_prefix, df_baskan, df_meclis = result
+                if is_changed_result(fingerprints, url, key_prefix, df_baskan, df_meclis):
+                    store_result(data_dict, sink, url, key_prefix, df_baskan, df_meclis)
+                    logging.info(f'DataFrames for {url} added!')
+                    record_attempt('stored')
+                else:
+                    record_attempt('unchanged')
+                return
+            if attempt >= max_attempts or url in no_retry_urls:
+                if failed:
+                    error_urls.append(url)
+                    record_attempt('error')
+                else:
+                    empty_urls.append(url)
+                    record_attempt('empty')
+                return
+            record_attempt('retry')
+            await asyncio.sleep(retry_backoff(attempt))
+            attempt += 1
+            logging.info(f'{url} requeued for attempt {attempt}/{max_attempts}')
+
+    connector = aiohttp.TCPConnector(limit=max_concurrency, ttl_dns_cache=300)
+    try:
+        async with aiohttp.ClientSession(connector=connector, headers=DEFAULT_HTTP_HEADERS) as session:
+            results = await asyncio.gather(*(scrape_single_url(session, url) for url in url_list), return_exceptions=True)
+        for url, result in zip(url_list, results):
+            if isinstance(result, Exception):
+                error_urls.append(url)
+                logging.error(f'URL generated an exception: {url}: {result}')
+    finally:
+        parse_executor.shutdown(wait=True)
+    return data_dict, error_urls, empty_urls, render_urls
+
+def replay_to_df(archive, party_list, parse_processes=False, sink=None, read_workers=4):
+    """
+    Rebuild the NTV DataFrames from the pages stored in a `PageArchive`, without a browser or network.
+    The archived content runs through the same parse stage as a live scrape.
+
+    Returns:
+        tuple: (data_dict, error_urls, empty_urls)
+    """
+    def fetch_page(archive, url):
+        return archive.get('ntv', url)
+
+    url_list = archive.keys('ntv')
+    logging.info(f'Replaying {len(url_list)} archived NTV pages from {archive.root}')
+    data_dict, error_urls, empty_urls, _ = run_worker_pool(url_list, fetch_page, partial(parse_ntv_page, party_list=party_list),
+                                                           [archive] * read_workers, parse_processes=parse_processes, sink=sink)
     return data_dict, error_urls, empty_urls
 
 def remove_known_empty_urls(empty_urls, known_empty_urls):
@@ -142,14 +880,14 @@ def remove_known_empty_urls(empty_urls, known_empty_urls):
         if url in empty_urls:
             empty_urls.remove(url)
 
-def retry_scraping(data_dict, error_urls, empty_urls, party_list, max_attempts=3):
+def retry_scraping(data_dict, error_urls, empty_urls, party_list, max_attempts=3, engine='selenium', max_workers=5):
     all_urls = error_urls + empty_urls
-    attempt = 0
-    while all_urls and attempt < max_attempts:
-        new_data_dict, new_error_urls, new_empty_urls = scrape_to_df(all_urls, party_list)
+    if all_urls:
+        # A single pass with in-pool retries, so the workers are only started once
+        new_data_dict, new_error_urls, new_empty_urls = scrape_to_df(
+            all_urls, party_list, engine, max_workers, max_attempts=max_attempts)
         data_dict.update(new_data_dict)
         all_urls = new_error_urls + new_empty_urls
-        attempt += 1
     if all_urls:
         logging.warning(f"Some URLs could not be scraped after {max_attempts} attempts: {all_urls}")
     return data_dict
@@ -188,4 +926,3 @@ def separate_dictionary(data_dict):
     logging.info(f'Town count: {belde_count/2} ({belde_count} DataFrames in total, presidency & council results)')
     df_aggregate_dict = [df_il, df_ilce, df_belde]
     return df_il, df_ilce, df_belde, df_aggregate_dict
-
@@ -9,7 +9,6 @@ import logging
 import requests
 import fitz
 import camelot
-import time
 import bs4
 import pandas as pd
 from unidecode import unidecode
@@ -17,9 +16,10 @@ from itertools import groupby
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
+from src.download_watcher import wait_for_download
 from src.driver_utils import create_driver
 
-def belediye_pdf_op(script_loc):
+def belediye_pdf_op(script_loc, download=True):
     il_merkez = []
     filter_dictionary = {"bb_bld": ["ctl00$cph1$CografiBirimControl$imgBtnBuyuksehirSayisi", 
                                     "Buyuksehir_Belediyeleri.pdf", 
@@ -69,20 +69,24 @@ def belediye_pdf_op(script_loc):
             pdf_button = WebDriverWait(driver, 10).until(
                 EC.element_to_be_clickable((By.NAME, button_name)))
             pdf_button.click()
-            time.sleep(3)
-            downloaded_file = os.path.join(download_dir, 'Belediye_Listesi.pdf')
             new_file_path = os.path.join(download_dir, new_filename)
-            if os.path.exists(downloaded_file):
-                os.rename(downloaded_file, new_file_path)
-                logging.info(f"{new_filename} download complete.")
-            else:
-                logging.warning(f"{new_filename} download failed.")
+            try:
+                downloaded_file = wait_for_download(download_dir, 'Belediye_Listesi.pdf', timeout=60)
+            except TimeoutError as e:
+                logging.warning(f"{new_filename} download failed: {e}")
+                return
+            os.rename(downloaded_file, new_file_path)
+            logging.info(f"{new_filename} download complete.")
         except FileExistsError:
             logging.warning(f'File {new_filename} already exists.')
         except Exception as e:
             logging.error(f"Unhandled error: {e}")
 
-    if len(os.listdir(folder_path)) == 0:
+    if not download:
+        missing_files = [value[1] for value in filter_dictionary.values() if not (folder_path / value[1]).exists()]
+        if missing_files:
+            raise FileNotFoundError(f"Municipality PDFs missing from {folder_path} and downloading is off: {', '.join(missing_files)}")
+    elif len(os.listdir(folder_path)) == 0:
         logging.info('Driver initiated')
         driver = create_driver(download_dir=folder_path)
         driver.get(url)
@@ -145,7 +149,7 @@ def belediye_pdf_op(script_loc):
             'il_ilce_belde_sozluk': il_ilce_belde_sozluk, 
             'full_list': full_list}
 
-def download_and_process_sege_pdfs(script_loc):
+def download_and_process_sege_pdfs(script_loc, download=True):
     sege_folder_name = 'SEGE Verisi'
     il_page_areas = {1: [('45', ['50,660,230,530'])],
                      2: [('45', ['50,530,230,300'])],
@@ -199,7 +203,10 @@ def download_and_process_sege_pdfs(script_loc):
 
     for key, (url, file_name, _) in sege_filter_dict.items():
         full_path = script_loc / sege_folder_name / file_name
-        download_sege_pdf(url, full_path)
+        if download:
+            download_sege_pdf(url, full_path)
+        elif not full_path.exists():
+            raise FileNotFoundError(f"SEGE PDF {full_path} is missing and downloading is off")
     sege_dfs = {key: pd.concat([df for sege, page_areas in page_areas_dict.items()
                                 for df in process_all_pages(script_loc / sege_folder_name / file_name, page_areas, sege)])
                 for key, (_, file_name, page_areas_dict) in sege_filter_dict.items()}
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+from pathlib import Path
+
+class PageArchive:
+    """
+    Compressed, content-addressed archive of everything the scrapers fetch.
+
+    Each payload is gzipped into `blobs/<first two hex digits>/<sha256>.gz`, so identical pages and
+    files are stored once. `index.ndjson` maps (kind, key) pairs to blobs; a key written again keeps
+    its last blob. The archive lets the parsing stages be re-run offline with `--replay`.
+
+    Kinds used by the pipeline:
+        'ntv': NTV page content by URL (server HTML or the JSON extracted from the rendered page).
+        'ysk': YSK .xls downloads by path relative to the project root.
+        'file': Other downloaded files (municipality and SEGE PDFs) by path relative to the project root.
+        'council': YSK councilor counts by '<year>_<election type>'.
+        'meta': Small lookups such as the party list.
+
+    Args:
+        root (str or Path): Archive folder.
+    """
+    def __init__(self, root):
+        self.root = Path(root)
+        self.blob_dir = self.root / 'blobs'
+        self.index_path = self.root / 'index.ndjson'
+        self.blob_dir.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        self.index = {}
+        if self.index_path.exists():
+            with open(self.index_path, encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        self.index[(entry['kind'], entry['key'])] = entry
+
+    def blob_path(self, digest):
+        return self.blob_dir / digest[:2] / f'{digest}.gz'
+
+    def put(self, kind, key, content):
+        """
+        Store a payload. `content` may be bytes, a string or a JSON-serializable object.
+
+        Returns:
+            str: SHA-256 digest of the stored bytes.
+        """
+        if isinstance(content, bytes):
+            encoding, data = 'bytes', content
+        elif isinstance(content, str):
+            encoding, data = 'text', content.encode('utf-8')
+        else:
+            encoding, data = 'json', json.dumps(content, ensure_ascii=False).encode('utf-8')
+        digest = hashlib.sha256(data).hexdigest()
+        path = self.blob_path(digest)
+        entry = {'kind': kind, 'key': key, 'sha256': digest, 'encoding': encoding, 'size': len(data)}
+        if not path.exists():
+            # Compress outside the lock; concurrent writers of the same blob produce identical files
+            path.parent.mkdir(exist_ok=True)
+            temp_path = path.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
+            with gzip.open(temp_path, 'wb') as f:
+                f.write(data)
+            os.replace(temp_path, path)
+        with self.lock:
+            if self.index.get((kind, key)) != entry:
+                self.index[(kind, key)] = entry
+                with open(self.index_path, 'a', encoding='utf-8') as f:
+                    f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        return digest
+
+    def put_file(self, kind, path, base_dir):
+        """Store a file on disk under its path relative to `base_dir`."""
+        path = Path(path)
+        self.put(kind, path.relative_to(base_dir).as_posix(), path.read_bytes())
+
+    def put_folder(self, kind, folder, base_dir):
+        """Store every file directly inside `folder`."""
+        for path in sorted(Path(folder).iterdir()):
+            if path.is_file():
+                self.put_file(kind, path, base_dir)
+
+    def keys(self, kind):
+        return [key for (entry_kind, key) in self.index if entry_kind == kind]
+
+    def get(self, kind, key):
+        """Return a stored payload decoded to the type it was stored with."""
+        entry = self.index[(kind, key)]
+        with gzip.open(self.blob_path(entry['sha256']), 'rb') as f:
+            data = f.read()
+        if entry['encoding'] == 'text':
+            return data.decode('utf-8')
+        if entry['encoding'] == 'json':
+            return json.loads(data)
+        return data
+
+    def restore_files(self, kind, base_dir):
+        """
+        Write every file of a kind back under `base_dir`.
+
+        Returns:
+            int: Number of files written.
+        """
+        keys = self.keys(kind)
+        for key in keys:
+            path = Path(base_dir) / key
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(self.get(kind, key))
+        logging.info(f"Restored {len(keys)} '{kind}' files from {self.root}")
+        return len(keys)
@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from src.telemetry import add_sleep, sleep
+
+class AdaptiveRateLimiter:
+    """
+    Token-bucket rate limiter shared by all workers that hit the same server.
+
+    The refill rate grows additively while requests succeed and is divided on every failure
+    (AIMD). Consecutive failures also open an exponentially growing pause for every caller,
+    which lets connection-reset bursts calm down before the next request goes out.
+
+    Args:
+        rate (float): Initial requests per second.
+        min_rate (float): Lower bound for the request rate.
+        max_rate (float): Upper bound for the request rate.
+        burst (int): Bucket capacity, i.e. how many requests may go out back-to-back.
+        increase_step (float): Requests per second added after each success.
+        decrease_factor (float): Divisor applied to the rate after each failure.
+        base_backoff (float): Pause in seconds after the first failure, doubled for each consecutive one.
+        max_backoff (float): Upper bound for the pause.
+        window (int): Number of recent outcomes used for the error rate.
+        log_every (int): Log the limiter state every N recorded outcomes (0 disables).
+    """
+    def __init__(self, rate=2.0, min_rate=0.2, max_rate=10.0, burst=5, increase_step=0.05,
+                 decrease_factor=2.0, base_backoff=2.0, max_backoff=60.0, window=100, log_every=100):
+        self.rate = rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.log_every = log_every
+        self.outcomes = deque(maxlen=window)
+        self.consecutive_failures = 0
+        self.total_outcomes = 0
+        self.backoff_until = 0.0
+        self.last_refill = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    def reserve(self):
+        """Take a token and return how many seconds the caller has to wait before using it."""
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens -= 1
+            delay = -self.tokens / self.rate if self.tokens < 0 else 0.0
+            return max(delay, self.backoff_until - now)
+
+    def acquire(self):
+        delay = self.reserve()
+        sleep(delay)
+        return delay
+
+    async def acquire_async(self):
+        delay = self.reserve()
+        if delay > 0:
+            await asyncio.sleep(delay)
+            add_sleep(delay)
+        return delay
+
+    def record_success(self):
+        with self.lock:
+            self.outcomes.append(True)
+            self.consecutive_failures = 0
+            self.rate = min(self.max_rate, self.rate + self.increase_step)
+            self._count_outcome()
+
+    def record_failure(self):
+        with self.lock:
+            self.outcomes.append(False)
+            self.consecutive_failures += 1
+            self.rate = max(self.min_rate, self.rate / self.decrease_factor)
+            backoff = min(self.max_backoff, self.base_backoff * 2 ** (self.consecutive_failures - 1))
+            self.backoff_until = max(self.backoff_until, time.monotonic() + backoff)
+            self._count_outcome()
+
+    def _count_outcome(self):
+        self.total_outcomes += 1
+        if self.log_every and self.total_outcomes % self.log_every == 0:
+            logging.info(self.describe())
+
+    @property
+    def current_delay(self):
+        """Average spacing between requests in seconds, including any active backoff pause."""
+        return 1 / self.rate + max(0.0, self.backoff_until - time.monotonic())
+
+    @property
+    def error_rate(self):
+        """Share of failures among the most recent outcomes."""
+        if not self.outcomes:
+            return 0.0
+        return self.outcomes.count(False) / len(self.outcomes)
+
+    def stats(self):
+        return {'rate': round(self.rate, 3),
+                'current_delay': round(self.current_delay, 3),
+                'error_rate': round(self.error_rate, 3),
+                'consecutive_failures': self.consecutive_failures,
+                'total_outcomes': self.total_outcomes}
+
+    def describe(self):
+        stats = self.stats()
+        return (f"Rate limiter: {stats['rate']} req/s, delay {stats['current_delay']}s, "
+                f"error rate {stats['error_rate']:.1%} over the last {len(self.outcomes)} requests")
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+import io
+import json
+import logging
+import threading
+from pathlib import Path
+import pandas as pd
+
+class ResultSink:
+    """
+    Append-only NDJSON store for scraped NTV pages.
+
+    Every successfully parsed page is written as one line holding its URL, key prefix and both result
+    DataFrames (pandas 'table' JSON, which keeps the index name and dtypes), and flushed right away,
+    so a crashed run can be resumed by skipping the URLs already in the file. The later steps update
+    all results in place and read the whole file back with `load_results`.
+
+    Args:
+        path (str or Path): NDJSON file to append to.
+        resume (bool): Keep the results of a previous run instead of starting an empty file.
+    """
+    def __init__(self, path, resume=False):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.Lock()
+        if not resume:
+            self.path.write_text('', encoding='utf-8')
+        self.file = open(self.path, 'a', encoding='utf-8')
+        # A line cut short by a crash has no newline; end it so the next record starts on its own line
+        if self.file.tell() > 0 and not self.ends_with_newline():
+            self.file.write('\n')
+
+    def ends_with_newline(self):
+        with open(self.path, 'rb') as f:
+            f.seek(-1, 2)
+            return f.read(1) == b'\n'
+
+    def write(self, url, key_prefix, df_baskan, df_meclis):
+        record = {'url': url,
+                  'key_prefix': key_prefix,
+                  'baskanlik_sonuclari': df_baskan.to_json(orient='table', force_ascii=False),
+                  'meclis_sonuclari': df_meclis.to_json(orient='table', force_ascii=False)}
+        line = json.dumps(record, ensure_ascii=False)
+        with self.lock:
+            self.file.write(line + '\n')
+            self.file.flush()
+
+    def completed_urls(self):
+        """URLs that already have results in the sink."""
+        return {record['url'] for record in iter_records(self.path)}
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+def iter_records(path):
+    """
+    Yield the raw records of a sink file one line at a time. A line cut short by a crash is skipped.
+    """
+    path = Path(path)
+    if not path.exists():
+        return
+    with open(path, encoding='utf-8') as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield json.loads(line)
+            except json.JSONDecodeError:
+                logging.warning(f'Skipping incomplete line {line_number} in {path}')
+
+def iter_results(path):
+    """Yield (key, DataFrame) pairs from a sink file, using the `data_dict` keys of `scrape_to_df`."""
+    for record in iter_records(path):
+        for suffix in ('baskanlik_sonuclari', 'meclis_sonuclari'):
+            df = pd.read_json(io.StringIO(record[suffix]), orient='table')
+            yield f"{record['key_prefix']}_{suffix}", df
+
+def load_results(path):
+    """
+    Rebuild the `data_dict` of `scrape_to_df` from a sink file. A page written twice keeps its last result.
+    """
+    return dict(iter_results(path))
@@ -0,0 +1,162 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+import contextvars
+import json
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+
+# Seconds slept by the current thread or asyncio task since the last `pop_sleep`
+slept = contextvars.ContextVar('slept', default=0.0)
+
+def add_sleep(seconds):
+    if seconds > 0:
+        slept.set(slept.get() + seconds)
+
+def sleep(seconds):
+    """`time.sleep` that is counted in the sleep time of the current telemetry record."""
+    if seconds > 0:
+        time.sleep(seconds)
+        add_sleep(seconds)
+
+def pop_sleep():
+    seconds = slept.get()
+    slept.set(0.0)
+    return seconds
+
+def timed_call(func, *args):
+    """Run `func(*args)` and return (result, seconds). Module level so it can be sent to a process pool."""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+class PhaseTelemetry:
+    """
+    Per-item timing records of one scrape phase and the busy time of its workers.
+
+    A record is written for every attempt at an item (an NTV URL or a YSK province file) with the seconds
+    it waited in the work queue, slept (rate limiter and fixed pauses), spent fetching (`driver.get`,
+    HTTP GET or YSK download, without the sleeps) and parsing, together with the attempt number and
+    the outcome. Workers report the time they were active and the time they spent on items, which
+    gives the driver-busy ratio of the phase.
+
+    Args:
+        phase (str): Phase name written into every record, e.g. 'ntv' or 'ysk'.
+        path (str or Path): NDJSON file for the records, truncated on start. None keeps them in memory only.
+    """
+    timings = ('queue_wait', 'sleep', 'fetch', 'parse', 'total')
+
+    def __init__(self, phase, path=None):
+        self.phase = phase
+        self.records = []
+        self.ready_at = {}
+        self.worker_busy = defaultdict(float)
+        self.worker_active = defaultdict(float)
+        self.worker_started_at = {}
+        self.started_at = time.monotonic()
+        self.lock = threading.Lock()
+        self.file = None
+        if path is not None:
+            path = Path(path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self.file = open(path, 'w', encoding='utf-8')
+
+    def queued(self, item, ready_at=None):
+        """Note when an item becomes available to the workers; defaults to now."""
+        with self.lock:
+            self.ready_at[item] = time.monotonic() if ready_at is None else ready_at
+
+    def dequeued(self, item):
+        """Return the seconds an item waited between becoming available and being picked up."""
+        with self.lock:
+            ready_at = self.ready_at.pop(item, None)
+        return max(0.0, time.monotonic() - ready_at) if ready_at is not None else 0.0
+
+    def worker_started(self, worker):
+        with self.lock:
+            self.worker_started_at[worker] = time.monotonic()
+
+    def worker_stopped(self, worker):
+        with self.lock:
+            started_at = self.worker_started_at.pop(worker, None)
+            if started_at is not None:
+                self.worker_active[worker] += time.monotonic() - started_at
+
+    def add_busy(self, worker, seconds):
+        with self.lock:
+            self.worker_busy[worker] += seconds
+
+    def record(self, item, attempt, outcome, worker=None, **timings):
+        """
+        Store the record of one attempt.
+
+        Args:
+            outcome (str): e.g. 'stored', 'unchanged', 'not_modified', 'render', 'retry', 'empty' or 'error'.
+            timings: Seconds by name, see `PhaseTelemetry.timings`.
+        """
+        record = {'phase': self.phase, 'item': item, 'attempt': attempt, 'outcome': outcome, 'worker': worker}
+        record.update({name: round(seconds, 4) for name, seconds in timings.items() if seconds is not None})
+        with self.lock:
+            self.records.append(record)
+            if self.file is not None:
+                self.file.write(json.dumps(record, ensure_ascii=False) + '\n')
+                self.file.flush()
+
+    def summary(self):
+        """
+        Returns:
+            dict: Item and attempt counts, outcome counts, percentiles of every timing and worker busy ratios.
+        """
+        with self.lock:
+            records = list(self.records)
+            busy_ratios = {worker: self.worker_busy[worker] / active
+                           for worker, active in self.worker_active.items() if active > 0}
+        result = {'phase': self.phase,
+                  'elapsed': time.monotonic() - self.started_at,
+                  'attempts': len(records),
+                  'items': len({record['item'] for record in records}),
+                  'retries': sum(1 for record in records if record['attempt'] > 1),
+                  'outcomes': dict(Counter(record['outcome'] for record in records)),
+                  'busy_ratios': busy_ratios}
+        for name in self.timings:
+            values = sorted(record[name] for record in records if name in record)
+            result[name] = {'sum': sum(values), 'p50': percentile(values, 50), 'p90': percentile(values, 90),
+                            'p99': percentile(values, 99), 'max': values[-1] if values else None}
+        return result
+
+    def log_summary(self):
+        summary = self.summary()
+        outcomes = ', '.join(f'{outcome} {count}' for outcome, count in sorted(summary['outcomes'].items()))
+        logging.info(f"{self.phase.upper()} telemetry: {summary['items']} items, {summary['attempts']} attempts "
+                     f"({summary['retries']} retries) in {summary['elapsed']:.1f}s; {outcomes}")
+        for name in self.timings:
+            stats = summary[name]
+            if stats['max'] is not None:
+                logging.info(f"  {name}: total {stats['sum']:.1f}s, p50 {stats['p50']:.3f}s, p90 {stats['p90']:.3f}s, "
+                             f"p99 {stats['p99']:.3f}s, max {stats['max']:.3f}s")
+        busy_ratios = summary['busy_ratios']
+        if busy_ratios:
+            least_busy = min(busy_ratios, key=busy_ratios.get)
+            logging.info(f"  worker busy ratio: mean {sum(busy_ratios.values()) / len(busy_ratios):.0%} over "
+                         f"{len(busy_ratios)} workers, lowest {busy_ratios[least_busy]:.0%} ({least_busy}), "
+                         f"highest {max(busy_ratios.values()):.0%}")
+        return summary
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+# coding: utf-8
+
+# In[ ]:
+
+
+import heapq
+import itertools
+import threading
+import time
+
+def retry_backoff(attempt, base_backoff=5.0, max_backoff=60.0):
+    """Delay in seconds before retrying an item that failed on its `attempt`-th try."""
+    return min(max_backoff, base_backoff * 2 ** (attempt - 1))
+
+class RetryWorkQueue:
+    """
+    Thread-safe work queue that puts failed items back with a per-item backoff.
+
+    Items are handed out in readiness order. A retried item becomes available again after
+    `base_backoff * 2 ** (attempt - 1)` seconds (capped at `max_backoff`), so the same warm
+    workers pick it up while the rest of the pass is still running.
+
+    Args:
+        items (iterable): Initial work items.
+        max_attempts (int): Total attempts allowed per item, including the first one.
+        base_backoff (float): Delay in seconds before the first retry.
+        max_backoff (float): Upper bound for the retry delay.
+        no_retry (iterable): Items that are never retried.
+    """
+    def __init__(self, items, max_attempts=4, base_backoff=5.0, max_backoff=60.0, no_retry=()):
+        self.max_attempts = max_attempts
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.no_retry = set(no_retry)
+        self.counter = itertools.count()
+        self.heap = [(0.0, next(self.counter), item, 1) for item in items]
+        heapq.heapify(self.heap)
+        self.unfinished = len(self.heap)
+        self.condition = threading.Condition()
+
+    def get(self):
+        """
+        Block until an item is ready and return it as (item, attempt).
+
+        Returns None once every item has been finished, meaning the worker can exit.
+        """
+        with self.condition:
+            while True:
+                if self.unfinished == 0:
+                    return None
+                now = time.monotonic()
+                if self.heap and self.heap[0][0] <= now:
+                    _, _, item, attempt = heapq.heappop(self.heap)
+                    return item, attempt
+                timeout = self.heap[0][0] - now if self.heap else None
+                self.condition.wait(timeout)
+
+    def done(self, item):
+        """Mark an item handed out by `get` as finished."""
+        with self.condition:
+            self.unfinished -= 1
+            self.condition.notify_all()
+
+    def retry(self, item, attempt):
+        """
+        Put a failed item back with backoff.
+
+        Returns:
+            bool: False if the item is out of attempts; it is then marked as finished.
+        """
+        if attempt >= self.max_attempts or item in self.no_retry:
+            self.done(item)
+            return False
+        with self.condition:
+            ready_at = time.monotonic() + retry_backoff(attempt, self.base_backoff, self.max_backoff)
+            heapq.heappush(self.heap, (ready_at, next(self.counter), item, attempt + 1))
+            self.condition.notify_all()
+        return True
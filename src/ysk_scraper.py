@@ -4,326 +4,999 @@
 # In[ ]:
 
 
+import hashlib
+import multiprocessing
 import os
 import shutil
+import signal
 import logging
-import bs4
 import time
 import threading
+import pandas as pd
+import requests
+from collections import defaultdict, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from logging.handlers import QueueHandler, QueueListener
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from unidecode import unidecode
-from src.driver_utils import create_driver
-
-thread_local = threading.local()
-
-file_operation_lock = threading.Lock()
-
-def download_rename_ysk(province_dict, download_dir, driver_id, folder_type, council_dict, main_max_retries=3):
-    inner_dict = {}
-    year = download_dir.name.split('_')[0]
-    
-    close_popup_xpath = '//*[@id="myModalClose"]/span'
-    dropdown_xpath = '//*[@id="navbarDropdown"]'
-    municipal_presidency_2019 = '//div[@id="collapse0"]//div[contains(text(), "Mart 2019")]'
-    municipal_presidency_2024 = '//div[@id="collapse0"]//div[contains(text(), "Mart 2024")]'
-    council_specific_dropdown_xpath = '//*[@id="heading1"]/h5/a'
-    council_specific_xpath_2019 = '//div[@id="collapse1"]//div[contains(text(), "Mart 2019")]'
-    council_specific_xpath_2024 = '//div[@id="collapse1"]//div[contains(text(), "Mart 2024")]'
-    council_general_dropdown_xpath = '//*[@id="heading2"]/h5/a'
-    council_general_xpath_2019 = '//div[@id="collapse2"]//div[contains(text(), "Mart 2019")]'
-    council_general_xpath_2024 = '//div[@id="collapse2"]//div[contains(text(), "Mart 2024")]'
-    metropolis_dropdown_xpath = '//*[@id="heading3"]/h5/a'
-    metropolis_presidency_xpath_2019 = '//*[@id="collapse3"]//div[contains(text(), "Mart 2019")]'
-    metropolis_presidency_xpath_2024 = '//*[@id="collapse3"]//div[contains(text(), "Mart 2024")]'
-    election_results_xpath_2019 = '//*[@id="accordionSidebar"]/li[14]/a'
-    election_results_xpath_2024 = '//*[@id="accordionSidebar"]/li[13]/a'
-    download_xpath = '//*[@id="kadinErkekOraniBar"]/div[3]/div/button[1]'   
-    metropolis_download_button = '//*[@id="kadinErkekOraniBar"]/div[2]/div/button[1]'
-    back_button_xpath = '//*[@id="content"]/div/div[2]/div/div/div[1]/button'
-    election_quit_xpath = '//*[@id="content"]/app-topbar/nav/div[1]/div/button'
-    election_results_il_meclisi_xpath_2019 = '//*[@id="accordionSidebar"]/li[13]/a'
-    election_results_buyuksehir_xpath_2019 = '//*[@id="accordionSidebar"]/li[12]/a'
-    election_results_il_meclisi_xpath_2024 = '//*[@id="accordionSidebar"]/li[12]/a'
-    election_results_buyuksehir_xpath_2024 = '//*[@id="accordionSidebar"]/li[11]/a'
-    language_button = '//*[@id="dropdownMenuButton"]'
-    turkish_button = '//*[@id="tr"]'
-    filter_dict_buttons = {'2019': {
-        'belediye_baskanligi': [close_popup_xpath, language_button, turkish_button, dropdown_xpath, municipal_presidency_2019, election_results_xpath_2019, download_xpath, False], 
-        'belediye_meclisi': [close_popup_xpath, language_button, turkish_button, dropdown_xpath, council_specific_dropdown_xpath, council_specific_xpath_2019, election_results_xpath_2019, download_xpath, True], 
-        'il_meclisi': [close_popup_xpath, language_button, turkish_button, dropdown_xpath, council_general_dropdown_xpath, council_general_xpath_2019, election_results_il_meclisi_xpath_2019, download_xpath, True], 
-        'buyuksehir_baskanligi': [close_popup_xpath, language_button, turkish_button, dropdown_xpath, metropolis_dropdown_xpath, metropolis_presidency_xpath_2019, election_results_buyuksehir_xpath_2019, metropolis_download_button, False]},
-                           '2024': {
-        'belediye_baskanligi': [close_popup_xpath, language_button, turkish_button, dropdown_xpath, municipal_presidency_2024, election_results_xpath_2024, download_xpath, False], 
-        'belediye_meclisi': [close_popup_xpath, language_button, turkish_button, dropdown_xpath, council_specific_dropdown_xpath, council_specific_xpath_2024, election_results_xpath_2024, download_xpath, True], 
-        'il_meclisi': [close_popup_xpath, language_button, turkish_button, dropdown_xpath, council_general_dropdown_xpath, council_general_xpath_2024, election_results_il_meclisi_xpath_2024, download_xpath, True], 
-        'buyuksehir_baskanligi': [close_popup_xpath, language_button, turkish_button, dropdown_xpath, metropolis_dropdown_xpath, metropolis_presidency_xpath_2024, election_results_buyuksehir_xpath_2024, metropolis_download_button, False]}}
-
-    # Initialize thread-local variables for retry counts
-    if not hasattr(thread_local, 'retry_count'):
-        thread_local.retry_count = 0
-    if not hasattr(thread_local, 'max_retry'):
-        thread_local.max_retry = main_max_retries
-    
-    unique_download_dir = download_dir / folder_type / str(driver_id)
-    unique_download_dir.mkdir(parents=True, exist_ok=True)
-    
-    driver = create_driver(headless=True, download_dir=unique_download_dir)
-
-    buttons_to_click_list = filter_dict_buttons[year][folder_type][:-2]
-    council_scraping_confirmation = filter_dict_buttons[year][folder_type][-1]
-    download_button_path = filter_dict_buttons[year][folder_type][-2]
-
-    previous_file_content = None
-    
-    def download_main_table(driver, unique_download_dir, folder_type):
-        thread_local.retry_count = 0
-        while thread_local.retry_count < thread_local.max_retry:
+from src.config import ysk_folder_names, ysk_step_deadlines
+from src.download_watcher import clear_partial_downloads, wait_for_download
+from src.driver_utils import DriverPool, create_driver, create_session, kill_process_tree, resolve_chromedriver_path
+from src.telemetry import PhaseTelemetry, pop_sleep, sleep
+from src.work_queue import RetryWorkQueue, retry_backoff
+
+# Returns [party, councilor count] pairs from the council cards of the YSK page, with the
+# same exact class matching and text stripping as BeautifulSoup's find(class_=...).get_text(strip=True)
+EXTRACT_COUNCIL_SCRIPT = """
+const strippedText = element => {
+    if (!element) { return null; }
+    const walker = document.createTreeWalker(element, NodeFilter.SHOW_TEXT);
+    const parts = [];
+    while (walker.nextNode()) {
+        const text = walker.currentNode.nodeValue.trim();
+        if (text) { parts.push(text); }
+    }
+    return parts.join('');
+};
+return Array.from(document.querySelectorAll('app-root [class="col-2 mb-3"]')).map(item => [
+    strippedText(item.querySelector('[class="mt-2 mb-0 font-weight-bold d-block"]')),
+    strippedText(item.querySelector('[class="mt-2 font-weight-light mb-0"]'))
+]);
+"""
+
+# Opens a province and starts its download in one WebDriver call: goes back to the map if a province is
+# open, clicks the city and clicks the download button once it is enabled, each after the loading overlay
+# is gone. Calls back with null on success or an error message.
+SWITCH_PROVINCE_SCRIPT = """
+const [regNum, backXpath, downloadXpath, timeoutMs, done] = arguments;
+const deadline = Date.now() + timeoutMs;
+const byXpath = xpath => document.evaluate(xpath, document, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+const visible = element => {
+    if (!element || element.getClientRects().length === 0) { return false; }
+    const style = window.getComputedStyle(element);
+    return style.display !== 'none' && style.visibility !== 'hidden';
+};
+const overlayGone = () => !Array.from(document.getElementsByClassName('ngx-overlay')).some(visible);
+const waitFor = (find, label) => new Promise((resolve, reject) => {
+    const poll = () => {
+        const element = find();
+        if (element) { return resolve(element); }
+        if (Date.now() > deadline) { return reject(new Error(`timed out waiting for ${label}`)); }
+        setTimeout(poll, 50);
+    };
+    poll();
+});
+const clickable = xpath => () => {
+    const element = byXpath(xpath);
+    return visible(element) && !element.disabled && overlayGone() ? element : null;
+};
+const cityXpath = `//*[@class="city" and @il_id="${regNum}"]`;
+(async () => {
+    const backButton = byXpath(backXpath);
+    if (visible(backButton)) {
+        (await waitFor(clickable(backXpath), 'the back button')).click();
+    }
+    const city = await waitFor(() => !visible(byXpath(backXpath)) && document.getElementById('map') ? clickable(cityXpath)() : null,
+                               `province ${regNum} on the map`);
+    city.dispatchEvent(new MouseEvent('click', { bubbles: true, cancelable: true, view: window }));
+    const downloadButton = await waitFor(() => visible(byXpath(backXpath)) ? clickable(downloadXpath)() : null,
+                                         'the download button');
+    downloadButton.scrollIntoView();
+    downloadButton.click();
+})().then(() => done(null), error => done(String(error && error.message || error)));
+"""
+
+# Navigation XPaths of the YSK results site, and per year and election type the buttons that open the
+# result map, followed by the download button and whether councilor counts are shown
+ysk_home_url = "https://acikveri.ysk.gov.tr/anasayfa"
+close_popup_xpath = '//*[@id="myModalClose"]/span'
+dropdown_xpath = '//*[@id="navbarDropdown"]'
+municipal_presidency_2019 = '//div[@id="collapse0"]//div[contains(text(), "Mart 2019")]'
+municipal_presidency_2024 = '//div[@id="collapse0"]//div[contains(text(), "Mart 2024")]'
+council_specific_dropdown_xpath = '//*[@id="heading1"]/h5/a'
+council_specific_xpath_2019 = '//div[@id="collapse1"]//div[contains(text(), "Mart 2019")]'
+council_specific_xpath_2024 = '//div[@id="collapse1"]//div[contains(text(), "Mart 2024")]'
+council_general_dropdown_xpath = '//*[@id="heading2"]/h5/a'
+council_general_xpath_2019 = '//div[@id="collapse2"]//div[contains(text(), "Mart 2019")]'
+council_general_xpath_2024 = '//div[@id="collapse2"]//div[contains(text(), "Mart 2024")]'
+metropolis_dropdown_xpath = '//*[@id="heading3"]/h5/a'
+metropolis_presidency_xpath_2019 = '//*[@id="collapse3"]//div[contains(text(), "Mart 2019")]'
+metropolis_presidency_xpath_2024 = '//*[@id="collapse3"]//div[contains(text(), "Mart 2024")]'
+election_results_xpath_2019 = '//*[@id="accordionSidebar"]/li[14]/a'
+election_results_xpath_2024 = '//*[@id="accordionSidebar"]/li[13]/a'
+download_xpath = '//*[@id="kadinErkekOraniBar"]/div[3]/div/button[1]'   
+metropolis_download_button = '//*[@id="kadinErkekOraniBar"]/div[2]/div/button[1]'
+back_button_xpath = '//*[@id="content"]/div/div[2]/div/div/div[1]/button'
+election_quit_xpath = '//*[@id="content"]/app-topbar/nav/div[1]/div/button'
+election_results_il_meclisi_xpath_2019 = '//*[@id="accordionSidebar"]/li[13]/a'
+election_results_buyuksehir_xpath_2019 = '//*[@id="accordionSidebar"]/li[12]/a'
+election_results_il_meclisi_xpath_2024 = '//*[@id="accordionSidebar"]/li[12]/a'
+election_results_buyuksehir_xpath_2024 = '//*[@id="accordionSidebar"]/li[11]/a'
+language_button = '//*[@id="dropdownMenuButton"]'
+turkish_button = '//*[@id="tr"]'
+filter_dict_buttons = {'2019': {
+    'belediye_baskanligi': [close_popup_xpath, language_button, turkish_button, dropdown_xpath, municipal_presidency_2019, election_results_xpath_2019, download_xpath, False], 
+    'belediye_meclisi': [close_popup_xpath, language_button, turkish_button, dropdown_xpath, council_specific_dropdown_xpath, council_specific_xpath_2019, election_results_xpath_2019, download_xpath, True], 
+    'il_meclisi': [close_popup_xpath, language_button, turkish_button, dropdown_xpath, council_general_dropdown_xpath, council_general_xpath_2019, election_results_il_meclisi_xpath_2019, download_xpath, True], 
+    'buyuksehir_baskanligi': [close_popup_xpath, language_button, turkish_button, dropdown_xpath, metropolis_dropdown_xpath, metropolis_presidency_xpath_2019, election_results_buyuksehir_xpath_2019, metropolis_download_button, False]},
+                       '2024': {
+    'belediye_baskanligi': [close_popup_xpath, language_button, turkish_button, dropdown_xpath, municipal_presidency_2024, election_results_xpath_2024, download_xpath, False], 
+    'belediye_meclisi': [close_popup_xpath, language_button, turkish_button, dropdown_xpath, council_specific_dropdown_xpath, council_specific_xpath_2024, election_results_xpath_2024, download_xpath, True], 
+    'il_meclisi': [close_popup_xpath, language_button, turkish_button, dropdown_xpath, council_general_dropdown_xpath, council_general_xpath_2024, election_results_il_meclisi_xpath_2024, download_xpath, True], 
+    'buyuksehir_baskanligi': [close_popup_xpath, language_button, turkish_button, dropdown_xpath, metropolis_dropdown_xpath, metropolis_presidency_xpath_2024, election_results_buyuksehir_xpath_2024, metropolis_download_button, False]}}
+
+def wait_for_overlay_to_disappear(driver):
+    try:
+        WebDriverWait(driver, 10).until(EC.invisibility_of_element_located((By.CLASS_NAME, "ngx-overlay")))
+    except Exception as e:
+        logging.warning(f"Overlay did not disappear: {e}")
+        raise
+
+def wait_until_clickable_xpath(driver, xpath, click=True):
+    try:
+        wait_for_overlay_to_disappear(driver)
+        element = WebDriverWait(driver, 10).until(EC.element_to_be_clickable((By.XPATH, xpath)))
+        if click:
+            element.click()
+        return element
+    except Exception as e:
+        logging.error(f"Error clicking button {xpath}: {e}")
+        raise
+
+YskUnit = namedtuple('YskUnit', ['year', 'folder_type', 'chunk', 'reg_num', 'province'])
+
+def build_ysk_units(years, province_dicts, chunk_count=5):
+    """
+    List every YSK file to download as one work unit.
+
+    Provinces keep the plate-order chunk folders (1-5) that `excel_to_df_ysk` reads in order; the main
+    table of an election type is a unit of its own (province None) and goes into chunk folder 1.
+
+    Args:
+        years (list): Election years, e.g. ['2019', '2024'].
+        province_dicts (dict): Election type -> {plate number: province}.
+        chunk_count (int): Number of chunk folders per election type.
+
+    Returns:
+        list: YskUnit tuples grouped by year and election type, so the workers mostly stay on the page they have open.
+    """
+    units = []
+    for year in years:
+        for folder_type, province_dict in province_dicts.items():
+            units.append(YskUnit(year, folder_type, 1, None, None))
+            for chunk, chunk_dict in enumerate(split_dict(province_dict, chunk_count), start=1):
+                for reg_num, province in chunk_dict.items():
+                    units.append(YskUnit(year, folder_type, chunk, reg_num, province))
+    return units
+
+def unit_name(unit):
+    return f"{unit.year}/{unit.folder_type}/{unit.province or 'genel'}"
+
+def unit_target_path(unit, base_dir):
+    """Final location of a unit's file, `<year folder>/<election type>/<chunk>/<name>.xls`."""
+    if unit.province is None:
+        file_name = f"{unit.year}_{unit.folder_type}_genel_sonuclari.xls"
+    else:
+        file_name = f"{unit.year}_{unit.province}_{unit.folder_type}_sonuclari.xls"
+    return base_dir / ysk_folder_names[unit.year] / unit.folder_type / str(unit.chunk) / file_name
+
+# Every non-empty YSK result table has a two-row header
+RESULTS_MARKER = b'rowspan="2"'
+
+def scan_download(file_path, chunk_size=1 << 16):
+    """
+    Hash a downloaded table and look for `RESULTS_MARKER` in the same single read.
+
+    Returns:
+        tuple: (SHA-256 hex digest, whether the table has results)
+    """
+    digest = hashlib.sha256()
+    has_results = False
+    tail = b''
+    with open(file_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+            if not has_results:
+                # Keep the end of the previous chunk, so a marker split between two chunks is found
+                has_results = RESULTS_MARKER in tail + chunk
+                tail = chunk[-(len(RESULTS_MARKER) - 1):]
+    return digest.hexdigest(), has_results
+
+class YskDigestIndex:
+    """
+    Digests of the files accepted so far, per (year, election type) job.
+
+    The site sometimes serves the table of an earlier province again. Such a file has the digest of a
+    file already accepted for another unit of the job, which is caught with one dictionary lookup.
+    """
+    def __init__(self):
+        self.digests = defaultdict(dict)
+        self.lock = threading.Lock()
+
+    def claim(self, unit, digest):
+        """
+        Accept a digest for a unit.
+
+        Returns:
+            YskUnit: The other unit that already owns the digest, or None if the file was accepted.
+        """
+        with self.lock:
+            owner = self.digests[(unit.year, unit.folder_type)].setdefault(digest, unit)
+        return owner if owner != unit else None
+
+def store_download(unit, content_path, base_dir, archive=None):
+    """Move an accepted file to the target path of its unit and archive it."""
+    target_path = unit_target_path(unit, base_dir)
+    target_path.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(content_path, target_path)
+    # Keyed by the path below the project root, so `--replay` can put the file back in place
+    if archive is not None:
+        archive.put_file('ysk', target_path, base_dir)
+    return target_path
+
+def scrape_council_data(driver, year, folder_type, council_dict, archive=None):
+    """
+    Read the councilor count per party from the results page into `council_dict['<year>_<folder_type>']`.
+    """
+    try:
+        # Wait for the required elements to load
+        WebDriverWait(driver, 10).until(EC.visibility_of_element_located((By.CSS_SELECTOR, ".col-2.mb-3")))
+        logging.info("Scraping council data...")
+
+        # Read only the council cards in the page instead of parsing the whole page source
+        council_items = driver.execute_script(EXTRACT_COUNCIL_SCRIPT)
+        inner_dict = {}
+        for key, value in council_items:
+            inner_dict[unidecode(key).lower()] = value
+
+        council_dict[f'{year}_{folder_type}'] = inner_dict
+        if archive is not None:
+            archive.put('council', f'{year}_{folder_type}', inner_dict)
+        logging.info(f"Council data for {folder_type} in {year} scraped successfully.")
+    except Exception as e:
+        logging.error(f"Error while scraping council data: {e}")
+
+def click_if_present(driver, xpath, timeout=3):
+    """Click an element that may or may not show up, such as a popup that was already dismissed."""
+    try:
+        WebDriverWait(driver, timeout).until(EC.element_to_be_clickable((By.XPATH, xpath))).click()
+        return True
+    except Exception:
+        return False
+
+class YskBrowserState:
+    """
+    Cookies and localStorage of the YSK site, taken from the first browser that dismissed the popup and
+    chose the language. Browsers started later load them, so they skip the popup and language steps.
+    """
+    def __init__(self):
+        self.cookies = None
+        self.local_storage = None
+        self.lock = threading.Lock()
+
+    def snapshot(self):
+        with self.lock:
+            return self.cookies, self.local_storage
+
+    def load(self, snapshot):
+        """Take over a snapshot from another process."""
+        with self.lock:
+            self.cookies, self.local_storage = snapshot
+
+    def capture(self, driver):
+        cookies = driver.get_cookies()
+        local_storage = driver.execute_script("return Object.assign({}, window.localStorage);")
+        with self.lock:
+            self.cookies, self.local_storage = cookies, local_storage
+
+    def restore(self, driver):
+        """
+        Load the captured state into a new browser. The site has to be open to set its cookies.
+
+        Returns:
+            bool: False if nothing was captured yet.
+        """
+        with self.lock:
+            cookies, local_storage = self.cookies, self.local_storage
+        if cookies is None:
+            return False
+        driver.get(ysk_home_url)
+        for cookie in cookies:
             try:
-                download_button = wait_until_clickable_xpath(driver, download_xpath, click=False)
-                driver.execute_script("arguments[0].scrollIntoView();", download_button)
-                driver.execute_script("arguments[0].click();", download_button)
+                driver.add_cookie(cookie)
             except Exception as e:
-                logging.error(f"Error during main table download action: {e}")
-                thread_local.retry_count += 1
-                continue
-            logging.info(f'Driver no {driver_id}: {folder_type}: Ana tablo indiriliyor...')
-            time.sleep(1)
-            downloaded_file = unique_download_dir / "SecimSonucIl.xls"
-            if os.path.exists(downloaded_file):
-                if is_file_empty(downloaded_file):
-                    logging.warning(f"Driver no {driver_id}: Main table file is empty. Retrying download... (Attempt {thread_local.retry_count + 1}/{thread_local.max_retry})")
-                    os.remove(downloaded_file)
-                    thread_local.retry_count += 1
-                else:
-                    new_file_name = unique_download_dir / f"{year}_{folder_type}_genel_sonuclari.xls"
-                    os.rename(downloaded_file, new_file_name)
-                    return True
+                logging.debug(f"Cookie {cookie.get('name')} could not be restored: {e}")
+        driver.execute_script("for (const [key, value] of Object.entries(arguments[0])) { window.localStorage.setItem(key, value); }",
+                              local_storage or {})
+        return True
+
+class YskSession:
+    """
+    One long-lived headless browser of the YSK download scheduler, running inside a worker process.
+
+    The browser downloads into its own staging folder; the supervisor checks every finished file and
+    moves it into the chunk folder of its unit, so sessions can take any unit of any election type. The
+    results page of the last election type stays open, and another election type is opened in place
+    through the navigation menus. A browser that fails twice in a row is quit and replaced; the
+    replacement starts with the cookies and localStorage of `browser_state`. Use the session as a
+    context manager so the browser is always quit.
+
+    With the 'script' navigation a province is opened and its download started by `SWITCH_PROVINCE_SCRIPT`
+    in a single WebDriver call, and the province stays open until the next one goes back to the map from
+    inside the page. The 'clicks' navigation waits for and clicks every element from here, which costs
+    more than ten WebDriver calls per province; a session falls back to it when the script fails.
+
+    Args:
+        worker_id (int): Number of the session, used in logs and telemetry.
+        staging_dir (Path): Download folder of the browser.
+        browser_state (YskBrowserState): Site state shared by all sessions.
+        heartbeat (callable): Called with the name of every step the session starts, see `ysk_step_deadlines`.
+        navigation (str): 'script' or 'clicks'.
+        driver_pool (DriverPool): Source of pre-started browsers downloading into `staging_dir`.
+        driver_path (str): ChromeDriver binary for browsers started without the pool.
+    """
+    def __init__(self, worker_id, staging_dir, browser_state=None, heartbeat=None, navigation='script', driver_pool=None,
+                 driver_path=None):
+        self.worker_id = worker_id
+        self.name = f'ysk-{worker_id}'
+        self.staging_dir = staging_dir
+        self.staging_dir.mkdir(parents=True, exist_ok=True)
+        self.browser_state = browser_state or YskBrowserState()
+        self.heartbeat = heartbeat
+        self.navigation = navigation
+        self.driver_pool = driver_pool
+        self.driver_path = driver_path
+        self.driver = None
+        self.has_site_state = False
+        self.election = None
+        self.province_open = False
+        self.consecutive_failures = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def step(self, name):
+        if self.heartbeat is not None:
+            self.heartbeat(name)
+
+    def load_home(self):
+        """Open the home page, starting a browser when there is none, with the popup closed and the language set."""
+        if self.driver is None:
+            self.step('start_browser')
+            if self.driver_pool is not None:
+                self.driver = self.driver_pool.acquire()
             else:
-                logging.error("Main table file not found after download attempt.")
-                thread_local.retry_count += 1
-        return False
+                self.driver = create_driver(headless=True, download_dir=self.staging_dir, block_preset='ysk',
+                                            driver_path=self.driver_path)
+            self.has_site_state = self.browser_state.restore(self.driver)
+        self.step('load_home')
+        self.driver.get(ysk_home_url)
+        self.province_open = False
+        if self.has_site_state:
+            click_if_present(self.driver, close_popup_xpath)
+        else:
+            for button_xpath in (close_popup_xpath, language_button, turkish_button):
+                wait_until_clickable_xpath(self.driver, button_xpath)
+            self.browser_state.capture(self.driver)
+            self.has_site_state = True
 
-    def wait_for_overlay_to_disappear(driver):
-        try:
-            WebDriverWait(driver, 10).until(EC.invisibility_of_element_located((By.CLASS_NAME, "ngx-overlay")))
-        except Exception as e:
-            logging.warning(f"Overlay did not disappear: {e}")
-            raise
-    
-    def wait_until_clickable_xpath(driver, xpath, click=True):
-        try:
-            wait_for_overlay_to_disappear(driver)
-            element = WebDriverWait(driver, 10).until(EC.element_to_be_clickable((By.XPATH, xpath)))
-            if click:
-                element.click()
-            return element
-        except Exception as e:
-            logging.error(f"Error clicking button {xpath}: {e}")
-            raise
+    def open_election(self, year, folder_type, council_dict, archive=None, refresh=False):
+        """
+        Show the results map of an election type. With `refresh` an election type that is already open is
+        selected again in place, so the page loads its current results without going back to the home page.
+        """
+        if self.election == (year, folder_type) and not refresh:
+            return
+        # The first three buttons dismiss the popup and set the language, the rest select the election
+        election_buttons = filter_dict_buttons[year][folder_type][3:-2]
+        switched = False
+        if self.election is not None:
+            logging.info(f"Driver no {self.worker_id}: Switching to {year} {folder_type}...")
+            self.election = None
+            self.step('open_election')
+            try:
+                self.leave_province()
+                for button_xpath in election_buttons:
+                    wait_until_clickable_xpath(self.driver, button_xpath)
+                switched = True
+            except Exception as e:
+                logging.warning(f"Driver no {self.worker_id}: Switching in place failed, reloading the site: {e}")
+        if not switched:
+            logging.info(f"Driver no {self.worker_id}: Opening {year} {folder_type}...")
+            self.load_home()
+            self.step('open_election')
+            for button_xpath in election_buttons:
+                wait_until_clickable_xpath(self.driver, button_xpath)
+        # Councilor counts are shown next to the map; one session per election type reads them
+        if filter_dict_buttons[year][folder_type][-1] and f'{year}_{folder_type}' not in council_dict:
+            self.step('council_data')
+            scrape_council_data(self.driver, year, folder_type, council_dict, archive)
+            if f'{year}_{folder_type}' not in council_dict:
+                # Left unopened, so the next unit loads the page again and retries them
+                logging.warning(f"Driver no {self.worker_id}: Councilor counts for {year} {folder_type} were not read")
+                return
+        self.election = (year, folder_type)
 
-    def is_file_empty(file_path):
-        try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                content = file.read()
-                return 'rowspan="2"' not in content
-        except Exception as e:
-            logging.error(f"Error reading file {file_path}: {e}")
-            return True
+    def select_province(self, reg_num, province):
+        logging.debug(f'Driver no {self.worker_id}: Selecting province "{province}"...')
+        self.step('select_province')
+        province_button = wait_until_clickable_xpath(self.driver, f'//*[@class="city" and @il_id="{reg_num}"]', click=False)
+        sleep(0.1)
+        self.driver.execute_script("arguments[0].dispatchEvent(new MouseEvent('click', { bubbles: true, cancelable: true, view: window }));", province_button)
+        self.province_open = True
+
+    def navigate_back_to_map(self):
+        logging.debug(f"Driver no {self.worker_id}: Navigating back to the map...")
+        self.step('navigate_back')
+        back_button = wait_until_clickable_xpath(self.driver, back_button_xpath, click=False)
+        self.driver.execute_script("arguments[0].scrollIntoView();", back_button)
+        self.driver.execute_script("arguments[0].click();", back_button)
+        WebDriverWait(self.driver, 10).until(EC.presence_of_element_located((By.ID, "map")))
+        self.province_open = False
+
+    def leave_province(self):
+        """Go back to the map if the script navigation left a province open."""
+        if self.province_open:
+            self.navigate_back_to_map()
 
-    def read_file_content(file_path):
+    def click_download(self, button_xpath):
+        download_button = wait_until_clickable_xpath(self.driver, button_xpath, click=False)
+        self.driver.execute_script("arguments[0].scrollIntoView();", download_button)
+        self.driver.execute_script("arguments[0].click();", download_button)
+
+    def switch_province(self, reg_num, button_xpath, timeout=30):
+        """Open a province and click its download button with `SWITCH_PROVINCE_SCRIPT`."""
+        self.driver.set_script_timeout(timeout + 5)
+        self.province_open = True
+        error = self.driver.execute_async_script(SWITCH_PROVINCE_SCRIPT, str(reg_num), back_button_xpath, button_xpath,
+                                                 timeout * 1000)
+        if error:
+            logging.warning(f"Driver no {self.worker_id}: In-page province switch failed, clicking through the map "
+                            f"from now on: {error}")
+            self.navigation = 'clicks'
+            raise RuntimeError(f"Province {reg_num} could not be opened: {error}")
+
+    def download_file(self, button_xpath, file_name, unit, timeout=30, reg_num=None):
+        """
+        Click a download button and return the downloaded file in the staging folder with its digest, or
+        None when the file does not arrive within `timeout` seconds or is empty. With `reg_num` the
+        province is opened and the button clicked by `switch_province`.
+        """
+        label = unit.province or 'the main table'
+        downloaded_file = self.staging_dir / file_name
+        if downloaded_file.exists():
+            downloaded_file.unlink()
+        clear_partial_downloads(self.staging_dir)
+        if reg_num is None:
+            self.step('download')
+            self.click_download(button_xpath)
+        else:
+            self.step('switch_province')
+            self.switch_province(reg_num, button_xpath)
+            self.step('download')
+        logging.info(f"Driver no {self.worker_id}: Initiated download for {label}.")
         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                return file.read()
-        except Exception as e:
-            logging.error(f"Error reading file {file_path}: {e}")
+            wait_for_download(self.staging_dir, file_name, timeout)
+        except TimeoutError as e:
+            logging.error(f"Driver no {self.worker_id}: File for {label} not found: {e}")
+            return None
+        digest, has_results = scan_download(downloaded_file)
+        if not has_results:
+            logging.warning(f"Driver no {self.worker_id}: File for {label} is empty.")
+            downloaded_file.unlink()
             return None
+        return downloaded_file, digest
 
-    def validate_and_rename_file(downloaded_file, new_file_name, current_file_content, unique_download_dir, previous_file_content, driver_id, province):
-        if (driver_id == 1 and len(os.listdir(str(unique_download_dir))) == 2) or len(os.listdir(str(unique_download_dir))) == 1:
-            previous_file_content = current_file_content
-        
-        if os.path.exists(downloaded_file):
-            if is_file_empty(downloaded_file):
-                logging.warning(f"Driver no {driver_id}: File for {province} is empty. Retrying...")
-                os.remove(downloaded_file)
-                return False, previous_file_content
-            elif current_file_content == previous_file_content and len(os.listdir(str(unique_download_dir))) > 2:
-                logging.warning(f"Driver no {driver_id}: File for {province} is a duplicate. Retrying...")
-                os.remove(downloaded_file)
-                return False, previous_file_content
-            else:
-                os.rename(downloaded_file, new_file_name)
-                logging.info(f"Driver no {driver_id}: File for {province} successfully downloaded.")
-                return True, current_file_content
+    def fetch_unit(self, unit, council_dict, archive=None):
+        """
+        Download the file of one unit into the staging folder.
+
+        Returns:
+            tuple: (staged file, SHA-256 digest), or None if no valid file arrived.
+        """
+        self.open_election(unit.year, unit.folder_type, council_dict, archive)
+        if unit.province is None:
+            self.leave_province()
+            download = self.download_file(download_xpath, "SecimSonucIl.xls", unit)
+        elif self.navigation == 'script':
+            download = self.download_file(filter_dict_buttons[unit.year][unit.folder_type][-2], "SecimSonucIlce.xls",
+                                          unit, reg_num=unit.reg_num)
         else:
-            logging.error(f"Driver no {driver_id}: File for {province} not found.")
-            return False, previous_file_content
-
-    def select_province(driver, province_xpath, province, driver_id):
-        logging.debug(f'Driver no {driver_id}: Selecting province "{province}"...')
-        province_button = wait_until_clickable_xpath(driver, province_xpath, click=False)
-        time.sleep(0.1)
-        driver.execute_script("arguments[0].dispatchEvent(new MouseEvent('click', { bubbles: true, cancelable: true, view: window }));", province_button)
-
-    def navigate_back_to_map(driver, back_button_xpath, driver_id):
-        logging.debug(f"Driver no {driver_id}: Navigating back to the map...")
-        back_button = wait_until_clickable_xpath(driver, back_button_xpath, click=False)
-        driver.execute_script("arguments[0].scrollIntoView();", back_button)
-        driver.execute_script("arguments[0].click();", back_button)
-        WebDriverWait(driver, 10).until(EC.presence_of_element_located((By.ID, "map")))
-
-    def download_action(driver, download_button_path, unique_download_dir, province, driver_id, previous_file_content, year, folder_type):
+            self.leave_province()
+            self.select_province(unit.reg_num, unit.province)
+            try:
+                download = self.download_file(filter_dict_buttons[unit.year][unit.folder_type][-2],
+                                              "SecimSonucIlce.xls", unit)
+            finally:
+                self.navigate_back_to_map()
+        if download is not None:
+            self.consecutive_failures = 0
+        return download
+
+    def recover(self):
         """
-        Perform the download action: click the button, read the file, validate and rename.
+        Prepare for the next unit after an error. The page is reloaded, and the browser is kept unless it
+        stopped responding or failed the unit before as well.
         """
+        self.election = None
+        self.consecutive_failures += 1
+        if self.driver is None:
+            return
         try:
-            # Click the download button
-            download_button = wait_until_clickable_xpath(driver, download_button_path, click=False)
-            driver.execute_script("arguments[0].click();", download_button)
-            logging.info(f"Driver no {driver_id}: Initiated download for {province}.")
-            time.sleep(1)  # Allow time for the download to start
-            
-            # Define file paths
-            downloaded_file = unique_download_dir / "SecimSonucIlce.xls"
-            new_file_name = unique_download_dir / f"{year}_{province}_{folder_type}_sonuclari.xls"
-            
-            # Read the content of the downloaded file
-            current_file_content = read_file_content(downloaded_file)
-            
-            # Validate and rename the file
-            file_valid, updated_file_content = validate_and_rename_file(
-                downloaded_file, new_file_name, current_file_content, unique_download_dir, 
-                previous_file_content, driver_id, province
-            )
-            return file_valid, updated_file_content
+            self.driver.current_url
         except Exception as e:
-            logging.error(f"Driver no {driver_id}: Error during download action for {province}: {e}")
-            return False, previous_file_content
+            logging.warning(f"Driver no {self.worker_id}: Browser stopped responding: {e}")
+            self.close()
+            return
+        if self.consecutive_failures >= 2:
+            logging.info(f"Driver no {self.worker_id}: Restarting the browser after {self.consecutive_failures} failures in a row")
+            self.close()
 
-    def scrape_council_data(driver, council_scraping_confirmation, year, folder_type, council_dict):
-        """
-        Scrape council data from the page if confirmation is enabled.
-    
-        Args:
-            driver (webdriver): Selenium WebDriver instance.
-            council_scraping_confirmation (bool): Whether council scraping is enabled.
-            year (str): Election year.
-            folder_type (str): Folder type (e.g., 'belediye_meclisi').
-            council_dict (dict): Dictionary to store council data.
-        """
-        if council_scraping_confirmation:
+    def close(self):
+        if self.driver is not None:
             try:
-                # Wait for the required elements to load
-                WebDriverWait(driver, 10).until(EC.visibility_of_element_located((By.CSS_SELECTOR, ".col-2.mb-3")))
-                logging.info("Scraping council data...")
-                
-                # Parse the page source
-                page_source = driver.page_source
-                soup = bs4.BeautifulSoup(page_source, 'html.parser')
-                app_root = soup.find('app-root')
-    
-                # Extract data from the council elements
-                inner_dict = {}
-                for item in app_root.find_all(class_='col-2 mb-3'):
-                    key = unidecode(item.find(class_='mt-2 mb-0 font-weight-bold d-block').get_text(strip=True)).lower()
-                    value = item.find(class_='mt-2 font-weight-light mb-0').get_text(strip=True)
-                    inner_dict[key] = value
-                
-                # Update the council dictionary
-                council_dict[f'{year}_{folder_type}'] = inner_dict
-                logging.info(f"Council data for {folder_type} in {year} scraped successfully.")
+                self.driver.quit()
             except Exception as e:
-                logging.error(f"Error while scraping council data: {e}")
+                logging.warning(f"Driver no {self.worker_id}: Error while quitting the browser: {e}")
+        self.driver = None
+        self.has_site_state = False
+        self.election = None
+        self.province_open = False
+
+class YskWorkerHung(Exception):
+    """Raised when a YSK worker process misses the deadline of its current step or dies."""
+
+def run_ysk_worker(worker_id, staging_dir, connection, browser_snapshot, log_queue, log_levels, navigation='script',
+                   driver_path=None):
+    """
+    Entry point of a YSK worker process, see `YskWorkerProcess`.
+
+    Runs units received through `connection` in one `YskSession` and sends back, per unit, the staged
+    file with its digest, the councilor counts read on the way and the seconds slept. Every step the
+    session starts is reported first, so the supervisor can tell a slow step from a hung one.
+    """
+    # Ctrl+C reaches the whole process group; the supervisor handles it and cleans up the workers
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    root_logger = logging.getLogger()
+    root_logger.handlers = [QueueHandler(log_queue)]
+    for name, level in log_levels.items():
+        logging.getLogger(name).setLevel(level)
+    browser_state = YskBrowserState()
+    browser_state.load(browser_snapshot)
 
-    def retry_logic(operation, *args, **kwargs):
+    def heartbeat(step):
+        connection.send(('step', step))
+
+    def work_through_tasks(session):
+        while True:
+            try:
+                task = connection.recv()
+            except EOFError:
+                return
+            if task is None:
+                return
+            unit, council_dict = task
+            known_councils = set(council_dict)
+            had_site_state = browser_state.cookies is not None
+            pop_sleep()
+            try:
+                download = session.fetch_unit(unit, council_dict)
+            except Exception as e:
+                logging.error(f"Driver no {worker_id}: Error while downloading {unit_name(unit)}: {e}")
+                session.recover()
+                download = None
+            if not had_site_state and browser_state.cookies is not None:
+                connection.send(('state', browser_state.snapshot()))
+            councils = {key: value for key, value in council_dict.items() if key not in known_councils}
+            connection.send(('result', (download, councils, pop_sleep())))
+
+    # Browsers started ahead of need: the first one while the worker waits for its first unit, then a
+    # replacement whenever the session takes one. Each spare is one more live Chrome per worker process.
+    spare_drivers = int(os.getenv("SCRAPER_YSK_SPARE_DRIVERS", "1"))
+    driver_pool = DriverPool(spare_drivers, headless=True, download_dir=staging_dir, block_preset='ysk',
+                             driver_path=driver_path) if spare_drivers > 0 else None
+    try:
+        with YskSession(worker_id, staging_dir, browser_state, heartbeat, navigation, driver_pool, driver_path) as session:
+            work_through_tasks(session)
+    finally:
+        if driver_pool is not None:
+            driver_pool.close()
+
+class YskWorkerProcess:
+    """
+    Supervisor side of one YSK browser running in a child process.
+
+    The child (`run_ysk_worker`) reports every step it starts, such as starting the browser, opening an
+    election, selecting a province or waiting for a download. Each step has a deadline in
+    `config.ysk_step_deadlines`; when the child misses it or dies, the child is killed together with its
+    ChromeDriver and Chrome processes and `run_unit` raises `YskWorkerHung`, so the unit is requeued like
+    any failed download. The next unit starts a fresh child.
+
+    Args:
+        worker_id (int): Number of the worker, used in logs and telemetry.
+        staging_dir (Path): Download folder of the child's browser.
+        browser_state (YskBrowserState): Site state handed to new children and updated by them.
+        log_queue (Queue): Receives the log records of the child.
+        log_levels (dict): Logger levels of the parent, applied in the child.
+        navigation (str): Province navigation of the child's session, see `YskSession`.
+        driver_path (str): ChromeDriver binary resolved by the parent, so children do not resolve it again.
+    """
+    context = multiprocessing.get_context('spawn')
+
+    def __init__(self, worker_id, staging_dir, browser_state, log_queue, log_levels, navigation='script', driver_path=None):
+        self.worker_id = worker_id
+        self.name = f'ysk-{worker_id}'
+        self.staging_dir = staging_dir
+        self.browser_state = browser_state
+        self.log_queue = log_queue
+        self.log_levels = log_levels
+        self.navigation = navigation
+        self.driver_path = driver_path
+        self.process = None
+        self.connection = None
+
+    def start(self):
+        self.connection, child_connection = self.context.Pipe()
+        self.process = self.context.Process(
+            target=run_ysk_worker, name=self.name, daemon=True,
+            args=(self.worker_id, self.staging_dir, child_connection, self.browser_state.snapshot(), self.log_queue,
+                  self.log_levels, self.navigation, self.driver_path))
+        self.process.start()
+        # Only the child holds the other end now, so its death shows up as EOF on our end
+        child_connection.close()
+
+    def run_unit(self, unit, council_dict):
         """
-        Retry logic for a given operation using thread-local retry variables.
+        Download one unit in the child process.
+
+        Returns:
+            tuple: ((staged file, digest) or None, councilor counts read by the child, seconds slept)
+
+        Raises:
+            YskWorkerHung: If the child missed a step deadline or died; it has been killed by then.
         """
-        while thread_local.retry_count < thread_local.max_retry:
+        if self.process is None:
+            self.start()
+        self.connection.send((unit, dict(council_dict)))
+        step = 'dispatch'
+        deadline = time.monotonic() + ysk_step_deadlines[step]
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                self.kill()
+                raise YskWorkerHung(f"{self.name} exceeded the {ysk_step_deadlines[step]}s deadline of step '{step}' "
+                                    f"on {unit_name(unit)}")
             try:
-                logging.info(f"Driver {driver_id} - Attempt {thread_local.retry_count + 1}/{thread_local.max_retry} for operation: {operation.__name__}")
-                result = operation(*args, **kwargs)
-                if result:  # Success is determined by the operation
-                    return result
-            except Exception as e:
-                logging.error(f"Driver {driver_id} - Error during {operation.__name__} (Attempt {thread_local.retry_count + 1}): {e}")
-            thread_local.retry_count += 1  # Ensure retry count increments
-            logging.debug(f"Driver {driver_id} - Retry count incremented to {thread_local.retry_count}.")
-            time.sleep(1)  # Pause before the next attempt
-        logging.error(f"Operation {operation.__name__} failed after {thread_local.max_retry} attempts.")
-        return None
+                if not self.connection.poll(min(remaining, 1.0)):
+                    if self.process.is_alive():
+                        continue
+                    raise EOFError
+                kind, payload = self.connection.recv()
+            except (EOFError, OSError):
+                exit_code = self.process.exitcode
+                self.kill()
+                raise YskWorkerHung(f"{self.name} died during step '{step}' on {unit_name(unit)} (exit code {exit_code})")
+            if kind == 'step':
+                step = payload
+                deadline = time.monotonic() + ysk_step_deadlines[step]
+            elif kind == 'state':
+                self.browser_state.load(payload)
+            else:
+                return payload
+
+    def kill(self):
+        """Kill the child with its ChromeDriver and Chrome processes."""
+        if self.process is None:
+            return
+        kill_process_tree(self.process.pid)
+        self.process.join(5)
+        self.connection.close()
+        self.process = None
+        self.connection = None
+
+    def stop(self, timeout=30):
+        """Let the child quit its browser and exit; kill it if it does not within `timeout` seconds."""
+        if self.process is None:
+            return
+        try:
+            self.connection.send(None)
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            logging.warning(f"{self.name} did not exit within {timeout}s, killing it")
+        self.kill()
+
+class YskHttpClient:
+    """
+    Downloads YSK result tables straight from the backend endpoints behind the download buttons, with a
+    pooled HTTP session instead of a browser.
+
+    Args:
+        endpoints (dict): Base URL, path templates and election ids, see `config.ysk_http_endpoints`.
+        session (Session): HTTP session; a pooled one is created when omitted.
+        timeout (float): Seconds per request.
+    """
+    def __init__(self, endpoints, session=None, timeout=30, digest_index=None):
+        self.base_url = endpoints['base_url'].rstrip('/')
+        self.templates = {'main_table': endpoints.get('main_table'), 'province_table': endpoints.get('province_table')}
+        self.election_ids = endpoints.get('election_ids', {})
+        self.session = session or create_session()
+        self.timeout = timeout
+        self.digest_index = digest_index or YskDigestIndex()
+
+    def url_for(self, unit):
+        """Endpoint of a unit, or None when it is not configured."""
+        template = self.templates['main_table' if unit.province is None else 'province_table']
+        election_id = self.election_ids.get(unit.year, {}).get(unit.folder_type)
+        if template is None or ('{election_id}' in template and election_id is None):
+            return None
+        path = template.format(year=unit.year, folder_type=unit.folder_type, reg_num=unit.reg_num, election_id=election_id)
+        return f"{self.base_url}/{path.lstrip('/')}"
 
-    def cleanup_and_retry(province_dict, download_dir, driver_id, folder_type, council_dict, unique_download_dir):
+    def fetch_unit(self, unit, base_dir, archive=None):
         """
-        Handles cleanup and retries for the `download_rename_ysk` function.
+        Download the table of one unit to the file the browser would have written.
+
+        Returns:
+            bool: False when the unit has no endpoint or the response is not a non-empty result table.
         """
+        url = self.url_for(unit)
+        if url is None:
+            return False
         try:
-            logging.info(f"Retry count = {thread_local.retry_count}")
-            logging.info(f"Max retries = {thread_local.max_retry}")
-    
-            if thread_local.retry_count >= thread_local.max_retry:
-                logging.warning('Maximum retry attempts reached, process is abandoned.')
-                return  # Stop further retries
-    
-            logging.info("Attempting retry...")
-            logging.info(f"Deleting folder: {unique_download_dir}")
-            try:
-                shutil.rmtree(str(unique_download_dir))  # Remove incomplete download folder
-            except Exception as shutil_error:
-                logging.error(f"CRITICAL ERROR: Error during folder deletion: {shutil_error}")
-    
-            # Retry the main function with incremented thread-local retry count
-            thread_local.retry_count += 1
-            download_rename_ysk(province_dict, download_dir, driver_id, folder_type, council_dict)
-    
-        except Exception as cleanup_error:
-            logging.error(f"CRITICAL ERROR: Error during retry or cleanup: {cleanup_error}")
-    
-    try:
-        # Navigate to the main page and close pop-ups
-        logging.info(f"Driver no {driver_id}: Navigating to the main page...")
-        driver.get("https://acikveri.ysk.gov.tr/anasayfa")
-        logging.info(f"Driver no {driver_id}: Closing the initial pop-up window...")
-        for button_xpath in buttons_to_click_list:
-            wait_until_clickable_xpath(driver, button_xpath)
-    
-        # Download main table for driver 1
-        if driver_id == 1:
-            if not download_main_table(driver, unique_download_dir, folder_type):
-                logging.error(f"Driver no {driver_id}: Failed to download a non-empty main table file after multiple attempts.")
+            response = self.session.get(url, timeout=self.timeout)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            logging.warning(f"HTTP download of {unit_name(unit)} failed: {e}")
+            return False
+        # The download buttons return HTML tables saved as .xls; an empty result has no two-row header
+        if b'<table' not in response.content.lower() or RESULTS_MARKER not in response.content:
+            logging.warning(f"HTTP download of {unit_name(unit)} is not a result table")
+            return False
+        owner = self.digest_index.claim(unit, hashlib.sha256(response.content).hexdigest())
+        if owner is not None:
+            logging.warning(f"HTTP download of {unit_name(unit)} is a duplicate of {unit_name(owner)}")
+            return False
+        temp_path = unit_target_path(unit, base_dir).with_suffix('.tmp')
+        temp_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path.write_bytes(response.content)
+        store_download(unit, temp_path, base_dir, archive)
+        return True
+
+    def close(self):
+        self.session.close()
+
+def download_ysk_units_http(client, units, base_dir, council_dict, workers=8, archive=None, telemetry=None, on_file=None):
+    """
+    Fetch YSK units over HTTP and return the ones the browsers still have to handle.
+
+    Units without an endpoint or with an invalid response are returned for the browser queue. Councilor
+    counts are only shown on the results page, so the main table unit of every election type that has
+    them is always returned as well.
+    """
+    telemetry = telemetry or PhaseTelemetry('ysk')
+    http_units = [unit for unit in units if client.url_for(unit) is not None]
+    browser_units = [unit for unit in units if client.url_for(unit) is None]
+    if not http_units:
+        return browser_units
+
+    def fetch(unit):
+        start = time.perf_counter()
+        fetched = client.fetch_unit(unit, base_dir, archive)
+        if fetched and on_file is not None:
+            on_file(unit_target_path(unit, base_dir))
+        telemetry.record(unit_name(unit), 1, 'stored' if fetched else 'fallback', 'ysk-http',
+                         fetch=time.perf_counter() - start, total=time.perf_counter() - start)
+        return fetched
+
+    logging.info(f"Downloading {len(http_units)} YSK files over HTTP")
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        fetched = list(executor.map(fetch, http_units))
+    browser_units += [unit for unit, unit_fetched in zip(http_units, fetched) if not unit_fetched]
+    for unit in units:
+        needs_council = filter_dict_buttons[unit.year][unit.folder_type][-1]
+        if (unit.province is None and needs_council and f'{unit.year}_{unit.folder_type}' not in council_dict
+                and unit not in browser_units):
+            browser_units.append(unit)
+    logging.info(f"{len(http_units) - sum(fetched)} of {len(http_units)} HTTP downloads fell back to the browser")
+    # Keep the queue grouped by election type, so the browsers rarely have to switch pages
+    return sorted(browser_units, key=units.index)
+
+def download_ysk_units(units, base_dir, council_dict, driver_budget=5, max_attempts=3, archive=None, telemetry=None,
+                       http_client=None, on_file=None, navigation='script'):
+    """
+    Download YSK units with a fixed number of browser worker processes that all pull from one work queue.
+
+    Every worker takes the next unit as soon as it finishes the previous one, so all browsers stay busy
+    until the queue is empty instead of waiting for the slowest chunk of an election type. Failed units go
+    back onto the queue with a backoff and may be picked up by any worker. The browsers run in supervised
+    child processes (`YskWorkerProcess`): a worker that hangs is killed with its Chrome processes and its
+    unit requeued, instead of stalling the run.
+
+    Args:
+        units (list): YskUnit tuples, see `build_ysk_units`.
+        base_dir (Path): Project root holding the year folders.
+        council_dict (dict): Receives the councilor counts by '<year>_<election type>'.
+        driver_budget (int): Number of worker processes, each with one browser, running at the same time.
+        max_attempts (int): Attempts per unit.
+        archive (PageArchive): Store every downloaded file and the councilor counts.
+        telemetry (PhaseTelemetry): Receives a timing record for every attempt.
+        http_client (YskHttpClient): Fetch units from the backend endpoints first and only open browsers for
+            the rest, see `download_ysk_units_http`.
+        on_file (callable): Called with the path of every stored file, e.g. `YskTableParser.submit` to parse
+            the files while the rest is still downloading.
+        navigation (str): 'script' opens provinces with one in-page script call, 'clicks' through the map,
+            see `YskSession`.
+
+    Returns:
+        list: Units that could not be downloaded.
+    """
+    telemetry = telemetry or PhaseTelemetry('ysk')
+    if http_client is not None:
+        units = download_ysk_units_http(http_client, units, base_dir, council_dict, archive=archive, telemetry=telemetry,
+                                        on_file=on_file)
+        if not units:
+            return []
+        driver_budget = min(driver_budget, len(units))
+    work_queue = RetryWorkQueue(units, max_attempts, base_backoff=2.0, max_backoff=30.0)
+    staging_root = base_dir / 'ysk_staging'
+    shutil.rmtree(staging_root, ignore_errors=True)
+    failed_units = []
+    browser_state = YskBrowserState()
+    # Shared with the HTTP client, so a browser download is also checked against the files fetched over HTTP
+    digest_index = http_client.digest_index if http_client is not None else YskDigestIndex()
+    lock = threading.Lock()
+    for unit in units:
+        telemetry.queued(unit_name(unit))
+    # The workers log through the handlers of this process
+    log_queue = YskWorkerProcess.context.Queue()
+    log_listener = QueueListener(log_queue, *logging.getLogger().handlers, respect_handler_level=True)
+    log_levels = {name: logger.level for name, logger in logging.root.manager.loggerDict.items()
+                  if isinstance(logger, logging.Logger) and logger.level != logging.NOTSET}
+    log_levels[None] = logging.getLogger().level
+
+    def run_worker(worker_id):
+        worker = YskWorkerProcess(worker_id, staging_root / str(worker_id), browser_state, log_queue, log_levels,
+                                  navigation, driver_path)
+        telemetry.worker_started(worker.name)
+        try:
+            work_through_queue(worker)
+        finally:
+            worker.stop()
+            telemetry.worker_stopped(worker.name)
+
+    def store_unit(worker, unit, download, councils):
+        """Take over what the child read and move an accepted file into place. Returns whether the unit is done."""
+        for key, counts in councils.items():
+            council_dict[key] = counts
+            if archive is not None:
+                archive.put('council', key, counts)
+        # The main table unit also stands for the councilor counts; when its file came over HTTP it is only
+        # here for them, so it is not done until they are read
+        council_key = f'{unit.year}_{unit.folder_type}'
+        councils_missing = (unit.province is None and filter_dict_buttons[unit.year][unit.folder_type][-1]
+                            and council_key not in council_dict)
+        if councils_missing:
+            logging.warning(f"Driver no {worker.worker_id}: Councilor counts for {council_key} are still missing.")
+        if download is None:
+            return False
+        staged_file, digest = download
+        owner = digest_index.claim(unit, digest)
+        if owner is not None:
+            logging.warning(f"Driver no {worker.worker_id}: File for {unit.province or 'the main table'} is a duplicate "
+                            f"of {unit_name(owner)}.")
+            staged_file.unlink()
+            return False
+        store_download(unit, staged_file, base_dir, archive)
+        logging.info(f"Driver no {worker.worker_id}: File for {unit.province or 'the main table'} successfully downloaded.")
+        return not councils_missing
+
+    def work_through_queue(worker):
+        while True:
+            job = work_queue.get()
+            if job is None:
                 return
+            unit, attempt = job
+            queue_wait = telemetry.dequeued(unit_name(unit))
+            unit_start = time.perf_counter()
+            slept = 0.0
+            try:
+                download, councils, slept = worker.run_unit(unit, council_dict)
+                downloaded = store_unit(worker, unit, download, councils)
+            except YskWorkerHung as e:
+                logging.error(f"Driver no {worker.worker_id}: Killed a hung worker: {e}")
+                downloaded = False
+            except Exception as e:
+                logging.error(f"Driver no {worker.worker_id}: Error while downloading {unit_name(unit)}: {e}")
+                downloaded = False
+            if downloaded:
+                work_queue.done(unit)
+                outcome = 'stored'
+                if on_file is not None:
+                    on_file(unit_target_path(unit, base_dir))
             else:
-                logging.info(f'Driver no {driver_id}: Main table downloaded. Proceeding to subtables...')
-    
-        # Scrape council data
-        scrape_council_data(driver, council_scraping_confirmation, year, folder_type, council_dict)
-    
-        # Iterate through provinces
-        for reg_num, province in province_dict.items():
-            province_xpath = f'//*[@class="city" and @il_id="{reg_num}"]'
-            select_province(driver, province_xpath, province, driver_id)
-    
-            # Download data for the province with retries
-            file_check, previous_file_content = retry_logic(
-                download_action, driver, download_button_path, 
-                unique_download_dir, province, driver_id,
-                previous_file_content, year, folder_type
-            )
-            
-            if not file_check:
-                logging.error(f"Driver no {driver_id}: Maximum retries reached for {province}. Skipping.")
-    
-            # Navigate back to the map
-            navigate_back_to_map(driver, back_button_xpath, driver_id)
-            
+                telemetry.queued(unit_name(unit), time.monotonic() + retry_backoff(attempt, work_queue.base_backoff, work_queue.max_backoff))
+                if work_queue.retry(unit, attempt):
+                    logging.info(f"{unit_name(unit)} requeued for attempt {attempt + 1}/{max_attempts}")
+                    outcome = 'retry'
+                else:
+                    telemetry.dequeued(unit_name(unit))
+                    logging.error(f"Maximum retries reached for {unit_name(unit)}. Skipping.")
+                    with lock:
+                        failed_units.append(unit)
+                    outcome = 'failed'
+            elapsed = time.perf_counter() - unit_start
+            telemetry.add_busy(worker.name, elapsed - slept)
+            telemetry.record(unit_name(unit), attempt, outcome, worker.name, queue_wait=queue_wait, sleep=slept,
+                             fetch=elapsed - slept, total=elapsed)
+
+    logging.info(f"Downloading {len(units)} YSK files with {driver_budget} browser worker processes")
+    # Resolved once here and passed to the worker processes
+    try:
+        driver_path = resolve_chromedriver_path()
     except Exception as e:
-        logging.error(f"Driver no {driver_id}: Critical error: {e}")
-        cleanup_and_retry(
-            province_dict, download_dir, driver_id, folder_type, council_dict,
-            unique_download_dir
-        )
+        logging.warning(f"ChromeDriver could not be resolved up front, the workers will try again: {e}")
+        driver_path = None
+    log_listener.start()
+    try:
+        # One supervising thread per worker process
+        with ThreadPoolExecutor(max_workers=driver_budget) as executor:
+            for future in [executor.submit(run_worker, worker_id) for worker_id in range(1, driver_budget + 1)]:
+                future.result()
+    finally:
+        log_listener.stop()
+        log_queue.close()
+    shutil.rmtree(staging_root, ignore_errors=True)
+    if failed_units:
+        logging.warning(f"{len(failed_units)} YSK files could not be downloaded: {[unit_name(unit) for unit in failed_units]}")
+    return failed_units
+
+def changed_table_rows(old_path, new_path):
+    """
+    Provinces whose row differs between two versions of a YSK main table.
+
+    Returns:
+        set: Province names, or None when the tables cannot be compared row by row (missing old file,
+        changed layout), meaning every province has to be treated as changed.
+    """
+    def read_table(path):
+        df = pd.read_html(path, thousands='.', decimal=',')[0]
+        df.columns = [unidecode(str(column)).lower() for column in df.columns]
+        if 'il adi' not in df.columns:
+            return None
+        df = df.set_index('il adi')
+        df.index = [unidecode(str(item)).lower() for item in df.index]
+        return df
+
+    if not os.path.exists(old_path):
+        return None
+    old_df, new_df = read_table(old_path), read_table(new_path)
+    if (old_df is None or new_df is None or list(old_df.columns) != list(new_df.columns)
+            or not old_df.index.is_unique or not new_df.index.is_unique):
+        return None
+    changed = set(old_df.index.symmetric_difference(new_df.index))
+    common = new_df.index.intersection(old_df.index)
+    differs = (new_df.loc[common].astype(str) != old_df.loc[common].astype(str)).any(axis=1)
+    changed.update(common[differs.to_numpy()])
+    return changed
+
+def record_ysk_fingerprints(fingerprints, folder_path, base_dir):
+    """
+    Record the digest of every downloaded YSK file of a year folder for delta mode.
+
+    Province files add their province to `fingerprints.changed` when their content differs from the
+    previous run; a changed nationwide ('genel') table adds '*', meaning every province is affected.
+    """
+    for file_path in sorted(folder_path.rglob('*.xls')):
+        name_parts = file_path.stem.split('_')
+        province = '*' if 'genel' in name_parts else name_parts[1]
+        fingerprints.record_file(file_path.relative_to(base_dir).as_posix(), file_path, keys=[province])
 
 def process_province_dict(tum_iller_plaka_dict, il_list):
     il_plaka_dict = {}
@@ -0,0 +1,72 @@
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+from src.ballot_box import ingest_ballot_box_file, ingest_ballot_boxes, rollup_keys, BallotBoxRollup
+
+fixture_dir = Path(__file__).parent / 'fixtures' / 'ballot_box'
+
+class IngestBallotBoxesTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.store_dir = Path(self.temp_dir.name) / 'ballot_box_store'
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_rollup_totals_use_the_ntv_keys(self):
+        frames = ingest_ballot_boxes(fixture_dir, self.store_dir, chunk_rows=2)['2024/belediye_meclisi']
+        columns = ['kayitli secmen sayisi', 'ak parti', 'chp']
+        self.assertEqual(frames['province'].loc[['samsun', 'tokat'], columns].values.tolist(),
+                         [[3250.0, 1320.0, 830.0], [3150.0, 1470.0, 1210.0]])
+        self.assertEqual(frames['county'].loc[['samsun_19 mayis', 'samsun_atakum', 'tokat_almus', 'tokat_merkez'], 'chp'].tolist(),
+                         [420.0, 410.0, 910.0, 300.0])
+        self.assertEqual(frames['town'].index.tolist(), ['tokat_almus_akarcay gorumlu_belde', 'tokat_merkez_cat_belde'])
+        self.assertEqual(frames['town'].loc['tokat_almus_akarcay gorumlu_belde', columns].tolist(), [1350.0, 650.0, 460.0])
+
+    def test_store_holds_every_ballot_box_and_the_rollups(self):
+        ingest_ballot_boxes(fixture_dir, self.store_dir, chunk_rows=2)
+        election_dir = self.store_dir / '2024' / 'belediye_meclisi'
+        samsun = pd.read_parquet(election_dir / 'samsun.parquet')
+        self.assertEqual(samsun['sandik no'].tolist(), ['1001', '1002', '1003'])
+        self.assertEqual(samsun['county_key'].tolist(), ['samsun_19 mayis', 'samsun_19 mayis', 'samsun_atakum'])
+        self.assertEqual(len(pd.read_parquet(election_dir / 'tokat.parquet')), 4)
+        rollup = pd.read_parquet(election_dir / 'rollup_county.parquet')
+        self.assertEqual(rollup.loc['tokat_almus', 'ak parti'], 1050.0)
+
+    def test_file_without_readable_rows_is_an_error(self):
+        source_dir = Path(self.temp_dir.name) / 'source'
+        shutil.copytree(fixture_dir, source_dir)
+        (source_dir / '2024' / 'belediye_meclisi' / 'tokat.xls').write_text(
+            '<table><tr><td>Tokat</td><td>Almus</td><td>1</td></tr><tr><td>Tokat</td><td>Almus</td><td>2</td></tr></table>',
+            encoding='utf-8')
+        with self.assertLogs(level='ERROR') as logs:
+            frames = ingest_ballot_boxes(source_dir, self.store_dir)
+        self.assertIn("no header row with 'İl Adı'", logs.output[0])
+        self.assertEqual(frames['2024/belediye_meclisi']['province'].index.tolist(), ['samsun'])
+
+    def test_rows_not_matching_the_header_are_an_error(self):
+        file_path = Path(self.temp_dir.name) / 'broken.xls'
+        file_path.write_text('<table><tr><th>İl Adı</th><th>İlçe Adı</th><th>AK PARTİ</th></tr>'
+                             '<tr><td>TOKAT</td><td>120</td></tr></table>', encoding='utf-8')
+        with self.assertRaises(ValueError):
+            ingest_ballot_box_file(file_path, self.store_dir / 'broken.parquet', BallotBoxRollup())
+        self.assertFalse((self.store_dir / 'broken.parquet').exists())
+
+class RollupKeysTest(unittest.TestCase):
+    def test_only_the_ntv_exceptions_are_respelled(self):
+        self.assertEqual(rollup_keys({'il adi': 'SAMSUN', 'ilce adi': '19 MAYIS', 'belde adi': ''}),
+                         ('samsun', 'samsun_19 mayis', None))
+        self.assertEqual(rollup_keys({'il adi': 'TOKAT', 'ilce adi': 'ALMUS', 'belde adi': 'AKARÇAY GÖRÜMLÜ'}),
+                         ('tokat', 'tokat_almus', 'tokat_almus_akarcay gorumlu_belde'))
+        # Other names with '19' in them keep the key built from the names
+        self.assertEqual(rollup_keys({'il adi': 'ANKARA', 'ilce adi': 'ÇANKAYA', 'belde adi': '19 MAYIS'}),
+                         ('ankara', 'ankara_cankaya', 'ankara_cankaya_19_mayis_belde'))
+        self.assertEqual(rollup_keys({'il adi': 'SAMSUN', 'ilce adi': 'ATAKUM', 'belde adi': 'KÖY 19'}),
+                         ('samsun', 'samsun_atakum', 'samsun_atakum_koy_19_belde'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import asyncio
+import http.server
+import threading
+import unittest
+from collections import Counter
+from pathlib import Path
+from unittest import mock
+
+from src import ntv_scraper
+from src.ntv_scraper import crawl_ntv
+from src.rate_limiter import AdaptiveRateLimiter
+
+page = (Path(__file__).parent / 'fixtures' / 'ntv_results_page.html').read_bytes()
+party_list = ['ak parti', 'chp', 'mhp']
+
+class FlakyNtvHandler(http.server.BaseHTTPRequestHandler):
+    """Cuts the first answer of every page, and every answer of /down pages, off in the middle of the body."""
+    requests = Counter()
+
+    def do_GET(self):
+        self.requests[self.path] += 1
+        cut = self.path.startswith('/down') or self.requests[self.path] == 1
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(page)))
+        self.end_headers()
+        self.wfile.write(page[:len(page) // 2] if cut else page)
+        self.close_connection = cut
+
+    def log_message(self, *args):
+        pass
+
+class CrawlNtvTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), FlakyNtvHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f'http://127.0.0.1:{cls.server.server_address[1]}'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        FlakyNtvHandler.requests.clear()
+        self.rate_limiter = AdaptiveRateLimiter(rate=100.0, burst=10, base_backoff=0.01, max_backoff=0.01, log_every=0)
+
+    def crawl(self, url_list, max_attempts=3):
+        with mock.patch.object(ntv_scraper, 'retry_backoff', return_value=0), \
+                mock.patch.object(self.rate_limiter, 'record_failure', wraps=self.rate_limiter.record_failure) as record_failure:
+            result = asyncio.run(crawl_ntv(url_list, party_list, 4, self.rate_limiter, max_attempts=max_attempts))
+        return result, record_failure.call_count
+
+    def test_network_error_is_retried(self):
+        url = f'{self.base_url}/secim/guney-belde-secim-sonuclari'
+        (data_dict, error_urls, empty_urls, render_urls), failures = self.crawl([url])
+        self.assertIn('afyonkarahisar_guney_belde_baskanlik_sonuclari', data_dict)
+        self.assertEqual((error_urls, empty_urls, render_urls), ([], [], []))
+        self.assertEqual(FlakyNtvHandler.requests['/secim/guney-belde-secim-sonuclari'], 2)
+        self.assertEqual(failures, 1)
+
+    def test_url_is_reported_after_the_last_attempt(self):
+        url = f'{self.base_url}/down/adana-secim-sonuclari'
+        (data_dict, error_urls, empty_urls, _), failures = self.crawl([url], max_attempts=3)
+        self.assertEqual((data_dict, error_urls, empty_urls), ({}, [url], []))
+        self.assertEqual(FlakyNtvHandler.requests['/down/adana-secim-sonuclari'], 3)
+        self.assertEqual(failures, 3)
+
+if __name__ == '__main__':
+    unittest.main()
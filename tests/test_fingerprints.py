@@ -0,0 +1,144 @@
+import http.server
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+from src.driver_utils import create_session
+from src.fingerprints import FingerprintStore, NotModified, file_digest, frame_digest
+from src.ntv_scraper import check_not_modified
+from src.rate_limiter import AdaptiveRateLimiter
+
+url = 'https://example.com/adana-secim-sonuclari'
+
+class FrameDigestTest(unittest.TestCase):
+    def test_digest_follows_content(self):
+        df = pd.DataFrame({'2024 ALINAN OY': [1024, 701]}, index=['ak parti', 'chp'])
+        self.assertEqual(frame_digest(df, df), frame_digest(df.copy(), df.copy()))
+        changed = df.copy()
+        changed.iloc[0, 0] = 1025
+        self.assertNotEqual(frame_digest(df, df), frame_digest(changed, df))
+
+class FingerprintStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.temp_dir.name) / 'fingerprints.json'
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def saved_store(self, digest='a' * 64, headers=None):
+        store = FingerprintStore(self.path)
+        if headers is not None:
+            store.remember_validators(url, headers)
+        store.record(url, digest, keys=['adana'])
+        store.save()
+        return FingerprintStore(self.path)
+
+    def test_new_and_changed_sources_are_reported(self):
+        store = self.saved_store()
+        self.assertFalse(store.record(url, 'a' * 64, keys=['adana']))
+        self.assertTrue(store.record(url, 'b' * 64, keys=['adana']))
+        self.assertTrue(store.record('https://example.com/ankara-secim-sonuclari', 'c' * 64, keys=['ankara']))
+        self.assertEqual(store.changed, {'adana', 'ankara'})
+        self.assertEqual(store.unchanged, {url})
+
+    def test_validators_are_sent_back_only_after_record(self):
+        store = FingerprintStore(self.path)
+        store.remember_validators(url, {'ETag': '"v1"', 'Last-Modified': 'Sun, 31 Mar 2024 20:00:00 GMT'})
+        store.save()
+        self.assertEqual(FingerprintStore(self.path).request_headers(url), {})
+        store = self.saved_store(headers={'ETag': '"v1"', 'Last-Modified': 'Sun, 31 Mar 2024 20:00:00 GMT'})
+        self.assertEqual(store.request_headers(url), {'If-None-Match': '"v1"',
+                                                      'If-Modified-Since': 'Sun, 31 Mar 2024 20:00:00 GMT'})
+
+    def test_reset_ignores_saved_fingerprints(self):
+        self.saved_store(headers={'ETag': '"v1"'})
+        store = FingerprintStore(self.path, reset=True)
+        self.assertEqual(store.request_headers(url), {})
+        self.assertTrue(store.record(url, 'a' * 64))
+
+    def test_pop_changes_makes_this_round_the_baseline(self):
+        store = FingerprintStore(None)
+        store.record(url, 'a' * 64, keys=['adana'])
+        self.assertEqual(store.pop_changes(), ({'adana'}, {url}))
+        self.assertEqual(store.pop_changes(), (set(), set()))
+        self.assertFalse(store.record(url, 'a' * 64, keys=['adana']))
+        self.assertTrue(store.record(url, 'b' * 64, keys=['adana']))
+        self.assertEqual(store.pop_changes(), ({'adana'}, {url}))
+
+    def test_record_file_uses_file_digest(self):
+        path = Path(self.temp_dir.name) / 'Adana.xls'
+        path.write_bytes(b'<table></table>')
+        store = FingerprintStore(None)
+        self.assertTrue(store.record_file('2024/Adana.xls', path, keys=['adana']))
+        self.assertEqual(store.current['2024/Adana.xls']['sha256'], file_digest(path))
+
+class StubPageHandler(http.server.BaseHTTPRequestHandler):
+    """Answers 304 when the request carries the current ETag."""
+    etag = '"v2"'
+
+    def do_HEAD(self):
+        if self.headers.get('If-None-Match') == self.etag:
+            self.send_response(304)
+        else:
+            self.send_response(200)
+            self.send_header('ETag', self.etag)
+            self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+class ConditionalHeadTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), StubPageHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.page_url = f'http://127.0.0.1:{cls.server.server_address[1]}/adana-secim-sonuclari'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.temp_dir.name) / 'fingerprints.json'
+        self.session = create_session(pool_size=1)
+        self.rate_limiter = AdaptiveRateLimiter(rate=100.0, burst=10, log_every=0)
+
+    def tearDown(self):
+        self.session.close()
+        self.temp_dir.cleanup()
+
+    def store_after_run(self, etag):
+        store = FingerprintStore(self.path)
+        store.remember_validators(self.page_url, {'ETag': etag})
+        store.record(self.page_url, 'a' * 64)
+        store.save()
+        return FingerprintStore(self.path)
+
+    def test_unchanged_page_is_not_rendered(self):
+        store = self.store_after_run('"v2"')
+        with self.assertRaises(NotModified):
+            check_not_modified(self.session, self.page_url, self.rate_limiter, store)
+        self.assertEqual(store.unchanged, {self.page_url})
+
+    def test_changed_page_keeps_the_new_validators(self):
+        store = self.store_after_run('"v1"')
+        check_not_modified(self.session, self.page_url, self.rate_limiter, store)
+        store.record(self.page_url, 'b' * 64)
+        self.assertEqual(store.current[self.page_url]['etag'], '"v2"')
+
+    def test_first_run_learns_the_validators(self):
+        store = FingerprintStore(self.path)
+        check_not_modified(self.session, self.page_url, self.rate_limiter, store)
+        store.record(self.page_url, 'a' * 64)
+        store.save()
+        self.assertEqual(FingerprintStore(self.path).request_headers(self.page_url), {'If-None-Match': '"v2"'})
+
+if __name__ == '__main__':
+    unittest.main()
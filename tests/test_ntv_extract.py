@@ -0,0 +1,77 @@
+import json
+import os
+import shutil
+import unittest
+from pathlib import Path
+
+import pandas as pd
+
+from src.ntv_scraper import (EXTRACT_RESULTS_SCRIPT, extract_app_root, frame_from_rows, parse_ntv_page,
+                             parse_server_page, read_result_tables)
+
+fixture_dir = Path(__file__).parent / 'fixtures'
+fixture_path = fixture_dir / 'ntv_results_page.html'
+# What `EXTRACT_RESULTS_SCRIPT` returns in Chrome for ntv_results_page.html
+rows_path = fixture_dir / 'ntv_results_rows.json'
+page_url = 'https://www.ntv.com.tr/secim/31-mart-2024-yerel-secim-sonuclari/guney-belde-secim-sonuclari'
+party_list = ['ak parti', 'chp', 'mhp']
+
+class ExtractResultsTest(unittest.TestCase):
+    def setUp(self):
+        self.page = fixture_path.read_text(encoding='utf-8')
+        self.rendered = json.loads(rows_path.read_text(encoding='utf-8'))
+
+    def assert_same_results(self, rendered):
+        server_prefix, server_baskan, server_meclis = parse_server_page(page_url, extract_app_root(self.page), party_list)
+        rendered_prefix, rendered_baskan, rendered_meclis = parse_ntv_page(page_url, rendered, party_list)
+        self.assertEqual(server_prefix, 'afyonkarahisar_guney_belde')
+        self.assertEqual(rendered_prefix, server_prefix)
+        pd.testing.assert_frame_equal(rendered_baskan, server_baskan)
+        pd.testing.assert_frame_equal(rendered_meclis, server_meclis)
+
+    def test_rows_build_the_tables_read_html_finds(self):
+        server_tables = read_result_tables(extract_app_root(self.page))
+        for table, server_table in zip(self.rendered['tables'], server_tables):
+            pd.testing.assert_frame_equal(frame_from_rows(table), server_table)
+
+    def test_rendered_rows_match_server_html(self):
+        self.assert_same_results(self.rendered)
+
+    def test_rows_without_foot(self):
+        # Payloads archived before the footer rows were extracted
+        rendered = {**self.rendered, 'tables': [{'head': table['head'], 'body': table['body']}
+                                                for table in self.rendered['tables']]}
+        self.assert_same_results(rendered)
+
+    def test_header_rows(self):
+        table = {'head': [['A', 'B', 'B'], ['', 'x', 'y']], 'body': [['1', '2', '3'], ['4']], 'foot': [['T', '9']]}
+        df = frame_from_rows(table)
+        self.assertEqual(list(df.columns), [('A', 'Unnamed: 0_level_1'), ('B', 'x'), ('B', 'y')])
+        self.assertEqual(df.iloc[:, 0].tolist(), ['1', '4', 'T'])
+
+    def test_server_html_skips_hidden_and_empty_tables(self):
+        _, df_baskan, df_meclis = parse_server_page(page_url, extract_app_root(self.page), party_list)
+        self.assertEqual(list(df_baskan.index), ['ak parti', 'chp', 'bagimsiz toplam oy'])
+        self.assertEqual(df_baskan.loc['bagimsiz toplam oy', '2024 ALINAN OY'], 240)
+        self.assertEqual(list(df_meclis.index), ['ak parti', 'chp', 'mhp', 'bagimsiz toplam oy'])
+        self.assertEqual(list(df_meclis.columns), ['2024 ALINAN OY', '2024 OY ORANI'])
+
+    @unittest.skipUnless(os.getenv('SCRAPER_CHROMEDRIVER_PATH') or shutil.which('chromedriver'), 'needs Chrome and ChromeDriver')
+    def test_script_in_browser_returns_the_fixture_rows(self):
+        from selenium import webdriver
+        from selenium.webdriver.chrome.service import Service
+
+        options = webdriver.ChromeOptions()
+        options.add_argument('--headless=new')
+        driver = webdriver.Chrome(service=Service(os.getenv('SCRAPER_CHROMEDRIVER_PATH') or shutil.which('chromedriver')),
+                                  options=options)
+        try:
+            driver.get(fixture_path.resolve().as_uri())
+            rendered = driver.execute_script(EXTRACT_RESULTS_SCRIPT)
+        finally:
+            driver.quit()
+        self.assertEqual(rendered, self.rendered)
+        self.assert_same_results(rendered)
+
+if __name__ == '__main__':
+    unittest.main()
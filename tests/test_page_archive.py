@@ -0,0 +1,65 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+from src.page_archive import PageArchive
+
+class PageArchiveTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name) / 'page_archive'
+        self.archive = PageArchive(self.root)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def blob_count(self):
+        return len(list((self.root / 'blobs').rglob('*.gz')))
+
+    def test_payloads_keep_their_type(self):
+        self.archive.put('ntv', 'https://example.com/adana', '<table>Adana</table>')
+        self.archive.put('ysk', '2024/Adana.xls', b'\x00\x01binary')
+        self.archive.put('meta', 'party_list', ['ak parti', 'chp'])
+        self.assertEqual(self.archive.get('ntv', 'https://example.com/adana'), '<table>Adana</table>')
+        self.assertEqual(self.archive.get('ysk', '2024/Adana.xls'), b'\x00\x01binary')
+        self.assertEqual(self.archive.get('meta', 'party_list'), ['ak parti', 'chp'])
+
+    def test_identical_content_is_stored_once(self):
+        first = self.archive.put('ntv', 'https://example.com/adana', '<table>same</table>')
+        second = self.archive.put('ntv', 'https://example.com/ankara', '<table>same</table>')
+        self.assertEqual(first, second)
+        self.assertEqual(self.blob_count(), 1)
+
+    def test_rewritten_key_keeps_last_content_after_reopen(self):
+        self.archive.put('ntv', 'https://example.com/adana', 'old')
+        self.archive.put('ntv', 'https://example.com/adana', 'new')
+        self.archive.put('ntv', 'https://example.com/adana', 'new')
+        reopened = PageArchive(self.root)
+        self.assertEqual(reopened.get('ntv', 'https://example.com/adana'), 'new')
+        self.assertEqual(reopened.keys('ntv'), ['https://example.com/adana'])
+        # Storing the same content again does not grow the index
+        self.assertEqual(len((self.root / 'index.ndjson').read_text(encoding='utf-8').splitlines()), 2)
+
+    def test_keys_are_per_kind(self):
+        self.archive.put('ntv', 'a', 'x')
+        self.archive.put('file', 'b', 'x')
+        self.assertEqual(self.archive.keys('ntv'), ['a'])
+        self.assertEqual(self.archive.keys('file'), ['b'])
+
+    def test_files_are_restored_under_their_relative_path(self):
+        project = Path(self.temp_dir.name) / 'project'
+        (project / 'SEGE Verisi').mkdir(parents=True)
+        (project / 'SEGE Verisi' / 'İl-Sege-2017.pdf').write_bytes(b'%PDF-il')
+        (project / 'SEGE Verisi' / 'İlce-Sege-2022.pdf').write_bytes(b'%PDF-ilce')
+        self.archive.put_folder('file', project / 'SEGE Verisi', project)
+        restored = Path(self.temp_dir.name) / 'restored'
+        self.assertEqual(PageArchive(self.root).restore_files('file', restored), 2)
+        self.assertEqual((restored / 'SEGE Verisi' / 'İl-Sege-2017.pdf').read_bytes(), b'%PDF-il')
+        self.assertEqual((restored / 'SEGE Verisi' / 'İlce-Sege-2022.pdf').read_bytes(), b'%PDF-ilce')
+
+    def test_missing_key_raises(self):
+        with self.assertRaises(KeyError):
+            self.archive.get('ntv', 'https://example.com/missing')
+
+if __name__ == '__main__':
+    unittest.main()
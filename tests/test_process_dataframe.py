@@ -0,0 +1,68 @@
+import unittest
+
+import numpy as np
+import pandas as pd
+from unidecode import unidecode
+
+from src.ntv_scraper import process_dataframe
+
+party_list = ['ak parti', 'chp', 'mhp', 'bagimsiz toplam oy']
+
+def process_dataframe_loop(df, party_list):
+    """The row by row version `process_dataframe` replaced, kept as the reference for its results."""
+    if not df.empty:
+        if 'OY ORANI' in df.columns:
+            df['OY ORANI'] = df['OY ORANI'].str.replace('%', '').astype(float)
+        if '2019 OY ORANI' in df.columns:
+            df['2019 OY ORANI'] = df['2019 OY ORANI'].str.replace('%', '').astype(float)
+        df.set_index('PARTİ', inplace=True)
+        if 'SIRA' in df.columns:
+            df.drop('SIRA', axis=1, inplace=True)
+        df.rename(index=lambda x: unidecode(x).lower(), inplace=True)
+        df.loc['bagimsiz toplam oy'] = 0
+        for index in list(df.index):
+            if index not in party_list:
+                df.loc['bagimsiz toplam oy', 'ALINAN OY'] += df.loc[index, 'ALINAN OY']
+                df.loc['bagimsiz toplam oy', 'OY ORANI'] += df.loc[index, 'OY ORANI']
+                if '2019 ALINAN OY' in df.columns and '2019 OY ORANI' in df.columns:
+                    df.loc['bagimsiz toplam oy', '2019 ALINAN OY'] += df.loc[index, '2019 ALINAN OY']
+                    df.loc['bagimsiz toplam oy', '2019 OY ORANI'] += df.loc[index, '2019 OY ORANI']
+                df.drop(index, inplace=True)
+        df.rename(columns={'ALINAN OY': '2024 ALINAN OY', 'OY ORANI': '2024 OY ORANI'}, inplace=True)
+    return df
+
+def results_table(with_2019=True):
+    df = pd.DataFrame({'SIRA': [1, 2, 3, 4, 5],
+                       'PARTİ': ['AK PARTİ', 'CHP', 'Ahmet Yılmaz', 'Mehmet Kaya', 'Ayşe Demir'],
+                       'ALINAN OY': [1024, 701, 140, np.nan, 35],
+                       'OY ORANI': ['%52.10', '%35.67', '%7.12', '%3.33', '%1.78']})
+    if with_2019:
+        df['2019 ALINAN OY'] = [980, 650, 200, np.nan, 15]
+        df['2019 OY ORANI'] = ['%50.30', '%33.37', '%10.27', None, '%0.77']
+    return df
+
+class ProcessDataframeTest(unittest.TestCase):
+    def assert_same_as_loop(self, df):
+        pd.testing.assert_frame_equal(process_dataframe(df.copy(), party_list), process_dataframe_loop(df.copy(), party_list),
+                                      check_dtype=False)
+
+    def test_matches_loop_with_missing_counts(self):
+        self.assert_same_as_loop(results_table())
+
+    def test_matches_loop_without_2019_columns(self):
+        self.assert_same_as_loop(results_table(with_2019=False))
+
+    def test_matches_loop_without_missing_counts(self):
+        self.assert_same_as_loop(results_table().fillna({'ALINAN OY': 0, '2019 ALINAN OY': 0, '2019 OY ORANI': '%0'}))
+
+    def test_matches_loop_without_independents(self):
+        self.assert_same_as_loop(results_table().iloc[:2])
+
+    def test_missing_count_is_not_counted_as_zero(self):
+        df = process_dataframe(results_table(), party_list)
+        self.assertTrue(np.isnan(df.loc['bagimsiz toplam oy', '2024 ALINAN OY']))
+        self.assertAlmostEqual(df.loc['bagimsiz toplam oy', '2024 OY ORANI'], 12.23)
+        self.assertEqual(list(df.index), ['ak parti', 'chp', 'bagimsiz toplam oy'])
+
+if __name__ == '__main__':
+    unittest.main()
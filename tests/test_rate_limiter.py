@@ -0,0 +1,100 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from src.rate_limiter import AdaptiveRateLimiter
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+class AdaptiveRateLimiterTest(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+        patcher = mock.patch('src.rate_limiter.time.monotonic', self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def limiter(self, **kwargs):
+        return AdaptiveRateLimiter(**{'log_every': 0, **kwargs})
+
+    def test_burst_goes_out_without_waiting_then_requests_are_spaced(self):
+        limiter = self.limiter(rate=2.0, burst=3)
+        self.assertEqual([limiter.reserve() for _ in range(3)], [0.0, 0.0, 0.0])
+        self.assertAlmostEqual(limiter.reserve(), 0.5)
+        self.assertAlmostEqual(limiter.reserve(), 1.0)
+
+    def test_tokens_refill_with_time_up_to_burst(self):
+        limiter = self.limiter(rate=2.0, burst=2)
+        limiter.reserve()
+        limiter.reserve()
+        self.clock.now += 10
+        self.assertEqual([limiter.reserve() for _ in range(2)], [0.0, 0.0])
+        self.assertAlmostEqual(limiter.reserve(), 0.5)
+
+    def test_successes_raise_rate_up_to_max(self):
+        limiter = self.limiter(rate=1.0, max_rate=1.2, increase_step=0.1)
+        limiter.record_success()
+        self.assertAlmostEqual(limiter.rate, 1.1)
+        for _ in range(5):
+            limiter.record_success()
+        self.assertAlmostEqual(limiter.rate, 1.2)
+
+    def test_failures_divide_rate_down_to_min(self):
+        limiter = self.limiter(rate=4.0, min_rate=0.5, decrease_factor=2.0)
+        limiter.record_failure()
+        self.assertAlmostEqual(limiter.rate, 2.0)
+        for _ in range(5):
+            limiter.record_failure()
+        self.assertAlmostEqual(limiter.rate, 0.5)
+
+    def test_consecutive_failures_double_the_pause_up_to_max(self):
+        limiter = self.limiter(burst=100, base_backoff=2.0, max_backoff=5.0)
+        limiter.record_failure()
+        self.assertAlmostEqual(limiter.reserve(), 2.0)
+        limiter.record_failure()
+        self.assertAlmostEqual(limiter.reserve(), 4.0)
+        limiter.record_failure()
+        self.assertAlmostEqual(limiter.reserve(), 5.0)
+        self.clock.now += 5
+        self.assertEqual(limiter.reserve(), 0.0)
+
+    def test_success_resets_the_pause_growth(self):
+        limiter = self.limiter(burst=100, base_backoff=2.0)
+        limiter.record_failure()
+        limiter.record_failure()
+        limiter.record_success()
+        self.clock.now += 10
+        limiter.record_failure()
+        self.assertAlmostEqual(limiter.reserve(), 2.0)
+
+    def test_error_rate_covers_the_recent_window(self):
+        limiter = self.limiter(window=4)
+        self.assertEqual(limiter.error_rate, 0.0)
+        for outcome in (False, False, True, True, True, False):
+            limiter.record_success() if outcome else limiter.record_failure()
+        self.assertAlmostEqual(limiter.error_rate, 0.25)
+        self.assertEqual(limiter.stats()['total_outcomes'], 6)
+
+    def test_current_delay_includes_the_pause(self):
+        limiter = self.limiter(rate=2.0, decrease_factor=1.0, base_backoff=3.0)
+        self.assertAlmostEqual(limiter.current_delay, 0.5)
+        limiter.record_failure()
+        self.assertAlmostEqual(limiter.current_delay, 3.5)
+
+    def test_outcomes_are_logged_every_n(self):
+        limiter = self.limiter(log_every=2)
+        with self.assertLogs(level='INFO') as logs:
+            for _ in range(4):
+                limiter.record_success()
+        self.assertEqual(len(logs.records), 2)
+
+    def test_async_acquire_without_waiting(self):
+        limiter = self.limiter(burst=1)
+        self.assertEqual(asyncio.run(limiter.acquire_async()), 0.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from src.result_sink import ResultSink, iter_records, load_results
+
+def result_frame(votes):
+    df = pd.DataFrame({'2024 ALINAN OY': votes, '2024 OY ORANI': [v / sum(votes) * 100 for v in votes]},
+                      index=pd.Index(['ak parti', 'chp', 'bagimsiz toplam oy'][:len(votes)], name='PARTİ'))
+    return df
+
+class ResultSinkTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.temp_dir.name) / 'results' / 'ntv_results.ndjson'
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_round_trip_keeps_index_and_dtypes(self):
+        df_baskan, df_meclis = result_frame([1024, 701, 240]), result_frame([1100, 690])
+        df_baskan.loc['bagimsiz toplam oy', '2024 ALINAN OY'] = np.nan
+        with ResultSink(self.path) as sink:
+            sink.write('https://example.com/adana-secim-sonuclari', 'adana', df_baskan, df_meclis)
+        results = load_results(self.path)
+        self.assertEqual(list(results), ['adana_baskanlik_sonuclari', 'adana_meclis_sonuclari'])
+        pd.testing.assert_frame_equal(results['adana_baskanlik_sonuclari'], df_baskan)
+        pd.testing.assert_frame_equal(results['adana_meclis_sonuclari'], df_meclis)
+
+    def test_page_written_twice_keeps_last_result(self):
+        with ResultSink(self.path) as sink:
+            sink.write('https://example.com/adana-secim-sonuclari', 'adana', result_frame([1, 2]), result_frame([3, 4]))
+            sink.write('https://example.com/adana-secim-sonuclari', 'adana', result_frame([5, 6]), result_frame([7, 8]))
+        results = load_results(self.path)
+        self.assertEqual(results['adana_baskanlik_sonuclari']['2024 ALINAN OY'].tolist(), [5, 6])
+        self.assertEqual(results['adana_meclis_sonuclari']['2024 ALINAN OY'].tolist(), [7, 8])
+
+    def test_resume_keeps_previous_results_and_skips_cut_line(self):
+        with ResultSink(self.path) as sink:
+            sink.write('https://example.com/adana-secim-sonuclari', 'adana', result_frame([1, 2]), result_frame([3, 4]))
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write('{"url": "https://example.com/ankara-secim-sonuclari", "key_pre')
+        with self.assertLogs(level='WARNING'):
+            records = list(iter_records(self.path))
+        self.assertEqual([record['url'] for record in records], ['https://example.com/adana-secim-sonuclari'])
+        with ResultSink(self.path, resume=True) as sink:
+            self.assertEqual(sink.completed_urls(), {'https://example.com/adana-secim-sonuclari'})
+            sink.write('https://example.com/ankara-secim-sonuclari', 'ankara', result_frame([5, 6]), result_frame([7, 8]))
+        with self.assertLogs(level='WARNING'):
+            results = load_results(self.path)
+        self.assertEqual(sorted(results), ['adana_baskanlik_sonuclari', 'adana_meclis_sonuclari',
+                                           'ankara_baskanlik_sonuclari', 'ankara_meclis_sonuclari'])
+
+    def test_new_sink_starts_empty(self):
+        with ResultSink(self.path) as sink:
+            sink.write('https://example.com/adana-secim-sonuclari', 'adana', result_frame([1, 2]), result_frame([3, 4]))
+        with ResultSink(self.path) as sink:
+            self.assertEqual(sink.completed_urls(), set())
+        self.assertEqual(load_results(self.path), {})
+
+    def test_missing_file_has_no_results(self):
+        self.assertEqual(load_results(self.path), {})
+
+if __name__ == '__main__':
+    unittest.main()
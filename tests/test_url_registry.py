@@ -0,0 +1,78 @@
+import unittest
+from unittest import mock
+
+from src import ntv_scraper
+from src.ntv_scraper import build_url_registry, get_key_prefix
+
+base_url = 'https://www.ntv.com.tr/secim/31-mart-2024-yerel-secim-sonuclari'
+
+def result_url(slug):
+    return f'{base_url}/{slug}-secim-sonuclari'
+
+sitemap_urls = [result_url(slug) for slug in (
+    'zonguldak-eregli', 'adana', 'konya', 'samsun', 'tokat', 'zonguldak', 'adana-seyhan', 'konya-eregli',
+    'samsun-19-mayis', 'tokat-almus', 'seyhan-yenikoy-belde', 'eregli-akhuyuk-belde', 'eregli-yazlik-belde',
+    'almus-akarcay-gorumlu-belde', 'kayseri-talas')] + [f'{base_url}/canli-yayin', 'https://www.ntv.com.tr/gundem']
+
+class BuildUrlRegistryTest(unittest.TestCase):
+    def setUp(self):
+        with self.assertLogs(level='WARNING') as logs:
+            self.registry = build_url_registry(sitemap_urls, town_provinces={('eregli', 'akhuyuk'): {'konya'}})
+        self.warnings = [record.getMessage() for record in logs.records]
+
+    def test_levels_come_in_province_county_town_order(self):
+        levels = [record.level for record in self.registry.values()]
+        self.assertEqual(levels, ['il'] * 5 + ['ilce'] * 5 + ['belde'] * 4)
+        self.assertNotIn(f'{base_url}/canli-yayin', self.registry)
+
+    def test_province_and_county_records(self):
+        self.assertEqual(self.registry[result_url('adana')].key_prefix, 'adana')
+        county = self.registry[result_url('adana-seyhan')]
+        self.assertEqual((county.province, county.county, county.key_prefix), ('adana', 'seyhan', 'adana_seyhan'))
+
+    def test_town_province_comes_from_its_county(self):
+        town = self.registry[result_url('seyhan-yenikoy-belde')]
+        self.assertEqual((town.province, town.county, town.town), ('adana', 'seyhan', 'yenikoy'))
+        self.assertEqual(town.key_prefix, 'adana_seyhan_yenikoy_belde')
+
+    def test_county_name_in_several_provinces_needs_the_town_lookup(self):
+        self.assertEqual(self.registry[result_url('eregli-akhuyuk-belde')].key_prefix, 'konya_eregli_akhuyuk_belde')
+        unresolved = self.registry[result_url('eregli-yazlik-belde')]
+        self.assertIsNone(unresolved.province)
+        self.assertIsNone(unresolved.key_prefix)
+        self.assertTrue(any('eregli-yazlik-belde' in message for message in self.warnings))
+
+    def test_special_key_prefixes(self):
+        self.assertEqual(self.registry[result_url('samsun-19-mayis')].key_prefix, 'samsun_19 mayis')
+        self.assertEqual(self.registry[result_url('almus-akarcay-gorumlu-belde')].key_prefix,
+                         'tokat_almus_akarcay gorumlu_belde')
+
+    def test_unknown_province_is_reported(self):
+        self.assertNotIn(result_url('kayseri-talas'), self.registry)
+        self.assertTrue(any('kayseri-talas' in message for message in self.warnings))
+
+    def test_get_key_prefix_reads_the_registry_before_the_page(self):
+        with mock.patch.dict(ntv_scraper.url_registry, self.registry, clear=True):
+            self.assertEqual(get_key_prefix(result_url('seyhan-yenikoy-belde'), None), 'adana_seyhan_yenikoy_belde')
+            # Unresolved towns fall back to the province link of the page
+            content = {'tables': [], 'province_link': 'Konya'}
+            self.assertEqual(get_key_prefix(result_url('eregli-yazlik-belde'), content), 'konya_eregli_yazlik_belde')
+
+class SharedTownNameTest(unittest.TestCase):
+    def test_town_pair_in_several_provinces_is_left_to_the_page(self):
+        urls = [result_url(slug) for slug in ('mus', 'tokat', 'mus-merkez', 'tokat-merkez', 'merkez-yesilova-belde',
+                                              'merkez-cat-belde')]
+        town_provinces = {('merkez', 'yesilova'): {'mus', 'tokat'}, ('merkez', 'cat'): {'tokat'}}
+        with self.assertLogs(level='WARNING') as logs:
+            registry = build_url_registry(urls, town_provinces)
+        self.assertEqual(registry[result_url('merkez-cat-belde')].key_prefix, 'tokat_merkez_cat_belde')
+        shared = registry[result_url('merkez-yesilova-belde')]
+        self.assertIsNone(shared.province)
+        self.assertIsNone(shared.key_prefix)
+        self.assertTrue(any("several provinces: ['mus', 'tokat']" in message for message in logs.output))
+        with mock.patch.dict(ntv_scraper.url_registry, registry, clear=True):
+            content = {'tables': [], 'province_link': 'Muş'}
+            self.assertEqual(get_key_prefix(result_url('merkez-yesilova-belde'), content), 'mus_merkez_yesilova_belde')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import threading
+import time
+import unittest
+
+from src.work_queue import RetryWorkQueue, retry_backoff
+
+class RetryBackoffTest(unittest.TestCase):
+    def test_doubles_per_attempt_up_to_max(self):
+        self.assertEqual([retry_backoff(attempt, 5.0, 60.0) for attempt in range(1, 6)], [5.0, 10.0, 20.0, 40.0, 60.0])
+
+class RetryWorkQueueTest(unittest.TestCase):
+    def test_items_come_out_in_order_and_queue_ends_when_done(self):
+        work_queue = RetryWorkQueue(['a', 'b'])
+        self.assertEqual(work_queue.get(), ('a', 1))
+        self.assertEqual(work_queue.get(), ('b', 1))
+        work_queue.done('a')
+        work_queue.done('b')
+        self.assertIsNone(work_queue.get())
+
+    def test_empty_queue_ends_right_away(self):
+        self.assertIsNone(RetryWorkQueue([]).get())
+
+    def test_retried_item_comes_back_after_backoff_with_next_attempt(self):
+        work_queue = RetryWorkQueue(['a'], base_backoff=0.05)
+        item, attempt = work_queue.get()
+        start = time.monotonic()
+        self.assertTrue(work_queue.retry(item, attempt))
+        self.assertEqual(work_queue.get(), ('a', 2))
+        self.assertGreaterEqual(time.monotonic() - start, 0.04)
+
+    def test_ready_items_are_not_held_up_by_a_retry(self):
+        work_queue = RetryWorkQueue(['a', 'b'], base_backoff=30.0)
+        work_queue.retry(*work_queue.get())
+        self.assertEqual(work_queue.get(), ('b', 1))
+
+    def test_item_out_of_attempts_is_finished(self):
+        work_queue = RetryWorkQueue(['a'], max_attempts=2, base_backoff=0.0)
+        self.assertTrue(work_queue.retry(*work_queue.get()))
+        self.assertFalse(work_queue.retry(*work_queue.get()))
+        self.assertIsNone(work_queue.get())
+
+    def test_no_retry_items_are_finished_on_first_failure(self):
+        work_queue = RetryWorkQueue(['a'], no_retry=['a'])
+        self.assertFalse(work_queue.retry(*work_queue.get()))
+        self.assertIsNone(work_queue.get())
+
+    def test_waiting_worker_wakes_up_for_retry_and_for_the_end(self):
+        work_queue = RetryWorkQueue(['a'], base_backoff=0.0)
+        item, attempt = work_queue.get()
+        results = []
+        waiter = threading.Thread(target=lambda: results.extend([work_queue.get(), work_queue.get()]))
+        waiter.start()
+        time.sleep(0.05)
+        work_queue.retry(item, attempt)
+        # The waiting worker takes the retried item; finishing it lets its next get return None
+        time.sleep(0.05)
+        work_queue.done('a')
+        waiter.join(timeout=2)
+        self.assertFalse(waiter.is_alive())
+        self.assertEqual(results, [('a', 2), None])
+
+if __name__ == '__main__':
+    unittest.main()
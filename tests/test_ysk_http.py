@@ -0,0 +1,89 @@
+import http.server
+import tempfile
+import threading
+import unittest
+from pathlib import Path
+
+from src.ysk_scraper import YskHttpClient, YskUnit, build_ysk_units, download_ysk_units_http, unit_target_path
+
+def result_table(name):
+    return (f'<table><tr><th rowspan="2">İl Adı</th><th colspan="2">Oy</th></tr><tr><th>A</th><th>B</th></tr>'
+            f'<tr><td>{name}</td><td>1</td><td>2</td></tr></table>').encode('utf-8')
+
+class StubYskHandler(http.server.BaseHTTPRequestHandler):
+    """Backend stand-in: one result table per path, with a few broken answers."""
+    def do_GET(self):
+        status, body = 200, result_table(self.path)
+        if self.path.endswith('/34'):
+            body = b'<table><tr><td>Sonuc bulunamadi</td></tr></table>'
+        elif self.path.endswith('/35'):
+            status, body = 500, b'error'
+        elif self.path.endswith('/16'):
+            # The site sometimes serves the table of another province again
+            body = result_table('/api/7/ilce/1')
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+class YskHttpClientTest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), StubYskHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.base_dir = Path(self.temp_dir.name)
+        self.client = YskHttpClient({'base_url': f'http://127.0.0.1:{self.server.server_address[1]}/',
+                                     'main_table': '/api/{election_id}/il',
+                                     'province_table': 'api/{election_id}/ilce/{reg_num}',
+                                     'election_ids': {'2024': {'belediye_baskanligi': 7, 'belediye_meclisi': 8}}})
+
+    def tearDown(self):
+        self.client.close()
+        self.temp_dir.cleanup()
+
+    def test_url_for_fills_templates_and_skips_unconfigured_units(self):
+        base_url = self.client.base_url
+        self.assertEqual(self.client.url_for(YskUnit('2024', 'belediye_baskanligi', 1, None, None)), f'{base_url}/api/7/il')
+        self.assertEqual(self.client.url_for(YskUnit('2024', 'belediye_meclisi', 2, 6, 'ankara')), f'{base_url}/api/8/ilce/6')
+        self.assertIsNone(self.client.url_for(YskUnit('2019', 'belediye_baskanligi', 1, 1, 'adana')))
+        self.assertIsNone(YskHttpClient({'base_url': base_url}).url_for(YskUnit('2024', 'belediye_baskanligi', 1, 1, 'adana')))
+
+    def test_invalid_responses_fall_back_to_the_browser(self):
+        units = build_ysk_units(['2019', '2024'], {'belediye_baskanligi': {1: 'adana', 16: 'bursa', 34: 'istanbul', 35: 'izmir'},
+                                                   'belediye_meclisi': {6: 'ankara'}}, chunk_count=2)
+        stored = []
+        # One worker, so adana is fetched before bursa and keeps the table both of them return
+        with self.assertLogs(level='WARNING'):
+            browser_units = download_ysk_units_http(self.client, units, self.base_dir, {}, workers=1, on_file=stored.append)
+
+        http_units = [unit for unit in units if unit.year == '2024']
+        fetched = [unit for unit in http_units if unit.province in (None, 'adana', 'ankara')]
+        self.assertEqual(sorted(stored), sorted(unit_target_path(unit, self.base_dir) for unit in fetched))
+        for unit in fetched:
+            self.assertIn(b'rowspan="2"', unit_target_path(unit, self.base_dir).read_bytes())
+        self.assertEqual(sorted(self.base_dir.rglob('*.xls')), sorted(stored))
+        # 2019 has no election ids, bursa is a duplicate of adana, istanbul is empty and izmir failed. The
+        # council main table was downloaded but goes to the browser as well, for its councilor counts.
+        expected = [unit for unit in units if unit.year == '2019'] + [
+            unit for unit in http_units if unit.province in ('bursa', 'istanbul', 'izmir')
+            or (unit.province is None and unit.folder_type == 'belediye_meclisi')]
+        self.assertEqual(browser_units, sorted(expected, key=units.index))
+
+    def test_known_council_counts_keep_the_main_table_off_the_browser(self):
+        units = build_ysk_units(['2024'], {'belediye_meclisi': {6: 'ankara'}}, chunk_count=1)
+        council_dict = {'2024_belediye_meclisi': {'ak parti': 10}}
+        self.assertEqual(download_ysk_units_http(self.client, units, self.base_dir, council_dict), [])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,64 @@
+import os
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from src import data_processing
+from src.data_processing import YskTableParser
+
+def table_html(votes):
+    return (f'<table><tr><th>İL ADI</th><th>AK PARTİ</th></tr>'
+            f'<tr><td>ADANA</td><td>{votes}</td></tr></table>')
+
+class YskTableParserTest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.temp_dir.name) / '2024_adana_belediye_baskanligi_sonuclari.xls'
+        self.path.write_text(table_html('1.024'), encoding='utf-8')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def read_counting(self, parser):
+        with mock.patch.object(data_processing, 'read_ysk_table', wraps=data_processing.read_ysk_table) as read:
+            table = parser.read(self.path)
+        return table, read.call_count
+
+    def test_kept_table_is_read_once(self):
+        parser = YskTableParser(workers=1, processes=False, keep=True)
+        try:
+            first, first_reads = self.read_counting(parser)
+            # `excel_to_df_ysk` changes the table it gets in place
+            first.drop(columns=first.columns[0], inplace=True)
+            second, second_reads = self.read_counting(parser)
+        finally:
+            parser.close()
+        self.assertEqual((first_reads, second_reads), (1, 0))
+        self.assertEqual(second.iloc[0].tolist(), ['ADANA', 1024])
+
+    def test_changed_file_is_read_again(self):
+        parser = YskTableParser(workers=1, processes=False, keep=True)
+        try:
+            self.read_counting(parser)
+            self.path.write_text(table_html('2.048'), encoding='utf-8')
+            stat = self.path.stat()
+            os.utime(self.path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+            table, reads = self.read_counting(parser)
+        finally:
+            parser.close()
+        self.assertEqual(reads, 1)
+        self.assertEqual(table.iloc[0].tolist(), ['ADANA', 2048])
+
+    def test_table_is_handed_out_once_by_default(self):
+        parser = YskTableParser(workers=1, processes=False)
+        try:
+            parser.submit(self.path)
+            _, first_reads = self.read_counting(parser)
+            _, second_reads = self.read_counting(parser)
+        finally:
+            parser.close()
+        self.assertEqual((first_reads, second_reads), (0, 1))
+
+if __name__ == '__main__':
+    unittest.main()